@@ -0,0 +1,26 @@
+"""LLM client setup for the orca agent."""
+
+import importlib
+
+from prometheus_swarm.clients import setup_client as _setup_client
+from prometheus_swarm.clients.base_client import Client
+
+# Tool groups defined by the orca agent on top of the framework's tools
+ORCA_TOOL_GROUPS = ["classifier_operations"]
+
+
+def setup_client(client: str, model: str = None) -> Client:
+    """Configure and return an LLM client with the orca agent's tools.
+
+    Args:
+        client: The client type to use ("openai", "anthropic", "xai", etc.)
+        model: Optional model to use (overrides client's default model)
+
+    Returns:
+        Client: Configured client instance with tools loaded
+    """
+    client = _setup_client(client, model)
+    for group in ORCA_TOOL_GROUPS:
+        definitions = importlib.import_module(f"src.tools.{group}.definitions")
+        client.tools.update(definitions.DEFINITIONS)
+    return client
@@ -1,7 +1,7 @@
 """Task service module."""
 
 from flask import jsonify
-from prometheus_swarm.clients import setup_client
+from src.clients import setup_client
 from src.workflows.repoClassifier.workflow import RepoClassifierWorkflow
 from prometheus_swarm.utils.logging import logger
 from dotenv import load_dotenv
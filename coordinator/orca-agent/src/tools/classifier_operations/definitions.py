@@ -0,0 +1,42 @@
+"""Repository classifier tool definitions."""
+
+from prometheus_swarm.tools.repo_operations.Types import (
+    Language,
+    RepoType,
+    TestFramework,
+)
+from src.tools.classifier_operations.implementations import (
+    classify_repository_metadata,
+)
+
+DEFINITIONS = {
+    "classify_repository_metadata": {
+        "name": "classify_repository_metadata",
+        "description": "Classify the type, primary language and test framework "
+        "of a repository in one call",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "repo_type": {
+                    "type": "string",
+                    "description": "The repository type",
+                    "enum": RepoType.to_string_list(),
+                },
+                "language": {
+                    "type": "string",
+                    "description": "The primary language",
+                    "enum": Language.to_string_list(),
+                },
+                "test_framework": {
+                    "type": "string",
+                    "description": "The test framework",
+                    "enum": TestFramework.to_string_list(),
+                },
+            },
+            "required": ["repo_type", "language", "test_framework"],
+            "additionalProperties": False,
+        },
+        "final_tool": True,
+        "function": classify_repository_metadata,
+    },
+}
@@ -0,0 +1,41 @@
+"""Repository classifier tool implementations."""
+
+from typing import Any, Dict
+
+from prometheus_swarm.tools.repo_operations.implementations import (
+    classify_language,
+    classify_repository,
+    classify_test_framework,
+)
+
+
+def classify_repository_metadata(
+    repo_type: str, language: str, test_framework: str, **kwargs
+) -> Dict[str, Any]:
+    """
+    Classify the type, language and test framework of a repository at once.
+
+    Args:
+        repo_type: The repository type (one of the RepoType enum values)
+        language: The language (one of the Language enum values)
+        test_framework: The test framework (one of the TestFramework enum values)
+
+    Returns:
+        A dictionary with the tool execution result containing repo_type,
+        language and test_framework
+    """
+    data = {}
+    for result in [
+        classify_repository(repo_type),
+        classify_language(language),
+        classify_test_framework(test_framework),
+    ]:
+        if not result["success"]:
+            return {"success": False, "message": result["message"], "data": None}
+        data.update(result["data"])
+
+    return {
+        "success": True,
+        "message": "Classified repository type, language and test framework",
+        "data": data,
+    }
@@ -5,7 +5,7 @@ import argparse
 from dotenv import load_dotenv
 from src.workflows.repoClassifier.workflow import RepoClassifierWorkflow
 from src.workflows.repoClassifier.prompts import PROMPTS
-from prometheus_swarm.clients import setup_client
+from src.clients import setup_client
 
 # Load environment variables
 load_dotenv()
@@ -34,6 +34,16 @@ class TestFrameworkClassificationPhase(WorkflowPhase):
             name="Test Framework Classification",
         )   
 
+class CombinedClassificationPhase(WorkflowPhase):
+    def __init__(self, workflow: Workflow, conversation_id: str = None):
+        super().__init__(
+            workflow=workflow,
+            prompt_name="classify_repository_metadata",
+            available_tools=["read_file", "list_files", "classify_repository_metadata"],
+            conversation_id=conversation_id,
+            name="Combined Classification",
+        )
+
 class ReadmeGenerationPhase(WorkflowPhase):
     def __init__(self, workflow: Workflow, conversation_id: str = None):
         super().__init__(
@@ -0,0 +1,523 @@
+"""Heuristic repository classification from file listings and manifests."""
+
+import configparser
+import json
+import os
+import re
+import tomllib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+# Source file extensions and their language
+EXTENSIONS = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
+    ".cjs": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".java": "java",
+    ".c": "c",
+    ".h": "c",
+    ".cpp": "cpp",
+    ".cc": "cpp",
+    ".cxx": "cpp",
+    ".hpp": "cpp",
+    ".go": "go",
+    ".rs": "rust",
+    ".rb": "ruby",
+    ".php": "php",
+    ".swift": "swift",
+    ".kt": "kotlin",
+    ".kts": "kotlin",
+    ".scala": "scala",
+    ".r": "r",
+    ".sh": "shell",
+    ".bash": "shell",
+}
+
+# Top-level manifests and the languages they point to
+MANIFESTS = {
+    "package.json": ["javascript", "typescript"],
+    "pyproject.toml": ["python"],
+    "setup.py": ["python"],
+    "setup.cfg": ["python"],
+    "requirements.txt": ["python"],
+    "Pipfile": ["python"],
+    "Cargo.toml": ["rust"],
+    "go.mod": ["go"],
+    "pom.xml": ["java", "kotlin", "scala"],
+    "build.gradle": ["java", "kotlin"],
+    "build.gradle.kts": ["kotlin", "java"],
+    "Gemfile": ["ruby"],
+    "composer.json": ["php"],
+    "Package.swift": ["swift"],
+    "build.sbt": ["scala"],
+    "DESCRIPTION": ["r"],
+    "CMakeLists.txt": ["c", "cpp"],
+}
+
+# Other top-level files whose content is a useful signal
+EXTRA_FILES = ["tox.ini", "pytest.ini", "requirements-dev.txt", "dev-requirements.txt"]
+
+# Dependencies that suggest a repository type, matched against the names
+# the manifests declare as dependencies. Libraries depend on these too, so a
+# dependency alone stays below the confidence threshold; a type gets its
+# confidence only when the repository's structure agrees.
+REPO_TYPE_SIGNALS = {
+    "mobile_app": (
+        0.85,
+        [
+            "react-native",
+            "expo",
+            "@ionic/core",
+            "@ionic/angular",
+            "@ionic/react",
+            "@ionic/vue",
+            "@capacitor/core",
+        ],
+    ),
+    "web_app": (
+        0.8,
+        ["react", "next", "vue", "nuxt", "svelte", "@angular/core", "gatsby"],
+    ),
+    "api_service": (
+        0.8,
+        [
+            "express",
+            "fastify",
+            "koa",
+            "@nestjs/core",
+            "flask",
+            "fastapi",
+            "django",
+            "gin-gonic",
+            "labstack/echo",
+            "actix-web",
+            "axum",
+            "spring-boot-starter-web",
+            "spring-boot-starter-webflux",
+        ],
+    ),
+    "cli_tool": (0.8, ["click", "typer", "commander", "yargs", "spf13/cobra", "clap"]),
+    "data_science": (
+        0.75,
+        ["pandas", "scikit-learn", "torch", "tensorflow", "keras", "jupyter"],
+    ),
+}
+DEPENDENCY_CONFIDENCE = 0.55
+
+# Files that show a repository is the type its dependencies suggest. Declared
+# executables count for cli_tool too.
+REPO_TYPE_STRUCTURE = {
+    "mobile_app": r"^(app\.json$|ios/|android/)",
+    "web_app": (
+        r"^(src/)?(pages|app)/|^(next|nuxt|vite|svelte|gatsby)\.config\."
+        r"|^angular\.json$|^(public/)?index\.html$"
+    ),
+    "api_service": (
+        r"^(src/)?(app|main|server|wsgi|asgi)\.(py|js|mjs|ts)$|^manage\.py$"
+        r"|^(cmd/[^/]+/)?main\.go$|^src/main\.rs$|^Procfile$"
+    ),
+    "cli_tool": r"^(cmd|bin)/|^src/main\.rs$",
+    "data_science": r"\.ipynb$",
+}
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.7
+
+
+@dataclass
+class Classification:
+    value: Optional[str]
+    confidence: float
+    evidence: List[str] = field(default_factory=list)
+
+
+class RepoSnapshot:
+    """The file list of a checkout plus the manifests read from it."""
+
+    def __init__(self, files: List[str], read_file: Callable[[str], Optional[str]]):
+        self.files = files
+        self.top_level = {f for f in files if "/" not in f}
+        self.manifests: Dict[str, str] = {}
+        for name in list(MANIFESTS) + EXTRA_FILES:
+            if name in self.top_level:
+                content = read_file(name)
+                if content is not None:
+                    self.manifests[name] = content
+
+    def has(self, *names) -> bool:
+        return any(name in self.top_level for name in names)
+
+    def matching(self, pattern: str) -> List[str]:
+        regex = re.compile(pattern)
+        return [f for f in self.files if regex.search(f)]
+
+    def mentions(self, word: str, manifests: Optional[List[str]] = None) -> bool:
+        """Whether a manifest mentions word, as a whole word."""
+        regex = re.compile(rf"(?<![\w@/.-]){re.escape(word)}(?![\w-])", re.IGNORECASE)
+        for name, content in self.manifests.items():
+            if manifests is None or name in manifests:
+                if regex.search(content):
+                    return True
+        return False
+
+    def package_json(self) -> dict:
+        try:
+            return json.loads(self.manifests.get("package.json", "{}"))
+        except ValueError:
+            return {}
+
+    def _toml(self, name: str) -> dict:
+        try:
+            return tomllib.loads(self.manifests.get(name, ""))
+        except tomllib.TOMLDecodeError:
+            return {}
+
+    def peer_dependencies(self) -> Set[str]:
+        """Names of the package.json peerDependencies."""
+        return set(self.package_json().get("peerDependencies") or {})
+
+    def dependencies(self) -> Set[str]:
+        """Names of the dependencies the manifests declare.
+
+        Only dependency lists are read, never descriptions, scripts or other
+        free text. Python names are normalized (lowercase, dashes). Peer
+        dependencies are left out, including the development copies of them
+        that libraries install.
+        """
+        names = set()
+        package = self.package_json()
+        for key in ("dependencies", "devDependencies"):
+            names.update(package.get(key) or {})
+        composer = {}
+        if "composer.json" in self.manifests:
+            try:
+                composer = json.loads(self.manifests["composer.json"])
+            except ValueError:
+                pass
+        for key in ("require", "require-dev"):
+            names.update(composer.get(key) or {})
+
+        python = []
+        for name in (
+            "requirements.txt",
+            "requirements-dev.txt",
+            "dev-requirements.txt",
+        ):
+            python += self.manifests.get(name, "").splitlines()
+        pyproject = self._toml("pyproject.toml")
+        project = pyproject.get("project", {})
+        python += project.get("dependencies", [])
+        for extra in project.get("optional-dependencies", {}).values():
+            python += extra
+        for group in pyproject.get("dependency-groups", {}).values():
+            python += [item for item in group if isinstance(item, str)]
+        poetry = pyproject.get("tool", {}).get("poetry", {})
+        python += list(poetry.get("dependencies", {}))
+        python += list(poetry.get("dev-dependencies", {}))
+        for group in poetry.get("group", {}).values():
+            python += list(group.get("dependencies", {}))
+        pipfile = self._toml("Pipfile")
+        python += list(pipfile.get("packages", {}))
+        python += list(pipfile.get("dev-packages", {}))
+        match = re.search(
+            r"install_requires\s*=\s*\[([^\]]*)\]", self.manifests.get("setup.py", "")
+        )
+        if match:
+            python += re.findall(r"""["']([^"']+)["']""", match.group(1))
+        setup_cfg = configparser.ConfigParser(interpolation=None)
+        try:
+            setup_cfg.read_string(self.manifests.get("setup.cfg", ""))
+            python += setup_cfg.get(
+                "options", "install_requires", fallback=""
+            ).splitlines()
+        except configparser.Error:
+            pass
+        for requirement in python:
+            match = re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)", requirement)
+            if match and not requirement.lstrip().startswith("-"):
+                names.add(re.sub(r"[._-]+", "-", match.group(1)).lower())
+
+        cargo = self._toml("Cargo.toml")
+        for key in ("dependencies", "dev-dependencies", "build-dependencies"):
+            names.update(cargo.get(key, {}))
+        # Go modules, Ruby gems and Maven coordinates (group:artifact)
+        names.update(
+            re.findall(
+                r"^\s*(?:require\s+)?([\w.-]+\.[\w.-]+/\S+)\s+v",
+                self.manifests.get("go.mod", ""),
+                re.M,
+            )
+        )
+        names.update(
+            re.findall(
+                r"""^\s*gem\s+["']([^"']+)""", self.manifests.get("Gemfile", ""), re.M
+            )
+        )
+        for dependency in re.findall(
+            r"<dependency>(.*?)</dependency>", self.manifests.get("pom.xml", ""), re.S
+        ):
+            group = re.search(r"<groupId>([^<]+)</groupId>", dependency)
+            artifact = re.search(r"<artifactId>([^<]+)</artifactId>", dependency)
+            if artifact:
+                names.add(f"{group.group(1) if group else ''}:{artifact.group(1)}")
+        for name in ("build.gradle", "build.gradle.kts"):
+            names.update(
+                f"{group}:{artifact}"
+                for group, artifact in re.findall(
+                    r"""["']([\w.-]+):([\w.-]+)(?::[^"']*)?["']""",
+                    self.manifests.get(name, ""),
+                )
+            )
+        return names - self.peer_dependencies()
+
+    def declares_executables(self) -> bool:
+        """Whether a manifest installs command-line executables."""
+        pyproject = self._toml("pyproject.toml")
+        return bool(
+            self.package_json().get("bin")
+            or pyproject.get("project", {}).get("scripts")
+            or pyproject.get("tool", {}).get("poetry", {}).get("scripts")
+            or "console_scripts" in self.manifests.get("setup.py", "")
+            or "console_scripts" in self.manifests.get("setup.cfg", "")
+        )
+
+
+def _depends_on(name: str, signal: str) -> bool:
+    """Whether a dependency name is the signal, or for Go modules and Maven
+    coordinates, contains it as whole path segments."""
+    if name == signal:
+        return True
+    # Scoped npm packages like @storybook/react are not react
+    if name.startswith("@"):
+        return False
+    return f"/{signal}/" in f"/{name.replace(':', '/')}/"
+
+
+def classify_language(repo: RepoSnapshot) -> Classification:
+    counts = Counter()
+    for f in repo.files:
+        language = EXTENSIONS.get(os.path.splitext(f)[1].lower())
+        if language:
+            counts[language] += 1
+    # Headers belong to C++ when there is any C++ source
+    if counts["cpp"] and counts["c"]:
+        headers = len(repo.matching(r"\.h$"))
+        counts["cpp"] += headers
+        counts["c"] -= headers
+    counts = +counts
+
+    manifest_languages = {
+        language
+        for name in repo.manifests
+        if name in MANIFESTS
+        for language in MANIFESTS[name]
+    }
+    if not counts:
+        if not manifest_languages:
+            return Classification("none", 0.5, ["no source files"])
+        return Classification(None, 0.0, ["manifests but no source files"])
+
+    # Shell scripts rarely are the primary language of a repository that has
+    # anything else
+    ranked = counts.most_common()
+    language, count = ranked[0]
+    if language == "shell" and len(ranked) > 1:
+        language, count = ranked[1]
+
+    share = count / sum(counts.values())
+    evidence = [f"{count} of {sum(counts.values())} source files are {language}"]
+    confidence = 0.6 * share
+    if language in manifest_languages:
+        confidence += 0.4
+        evidence.append("a manifest agrees")
+    return Classification(language, round(confidence, 2), evidence)
+
+
+def _python_test_framework(repo: RepoSnapshot, read_file) -> Optional[Classification]:
+    if (
+        repo.has("pytest.ini", "conftest.py")
+        or repo.matching(r"(^|/)conftest\.py$")
+        or "[tool.pytest" in repo.manifests.get("pyproject.toml", "")
+        or "[tool:pytest]" in repo.manifests.get("setup.cfg", "")
+        or repo.mentions("pytest")
+    ):
+        return Classification("pytest", 0.95, ["pytest configuration or dependency"])
+
+    test_files = repo.matching(r"(^|/)(test_[^/]*|[^/]*_test)\.py$")
+    if not test_files:
+        return None
+    for path in test_files[:5]:
+        content = read_file(path) or ""
+        if re.search(r"^\s*(import unittest|from unittest)", content, re.M):
+            return Classification("unittest", 0.85, [f"{path} imports unittest"])
+    return Classification("pytest", 0.7, ["test files without unittest imports"])
+
+
+def classify_test_framework(
+    repo: RepoSnapshot, language: Optional[str], read_file
+) -> Classification:
+    found = []
+    package = repo.package_json()
+    js_packages = {
+        **package.get("dependencies", {}),
+        **package.get("devDependencies", {}),
+    }
+    js_scripts = " ".join(package.get("scripts", {}).values())
+
+    if (
+        repo.matching(r"(^|/)jest\.config\.")
+        or "jest" in js_packages
+        or "jest" in js_scripts
+    ):
+        found.append(Classification("jest", 0.95, ["jest configuration or dependency"]))
+    if repo.matching(r"(^|/)\.mocharc") or "mocha" in js_packages:
+        found.append(
+            Classification("mocha", 0.95, ["mocha configuration or dependency"])
+        )
+    if repo.matching(r"(^|/)vitest\.config\.") or "vitest" in js_packages:
+        found.append(
+            Classification("other", 0.9, ["vitest configuration or dependency"])
+        )
+    if repo.matching(r"_test\.go$"):
+        found.append(Classification("go_testing", 0.95, ["Go test files"]))
+    java_builds = ["pom.xml", "build.gradle", "build.gradle.kts"]
+    if repo.mentions("kotest", java_builds) or repo.mentions("io.kotest", java_builds):
+        found.append(Classification("kotest", 0.95, ["kotest dependency"]))
+    elif repo.mentions("testng", java_builds) or repo.mentions(
+        "org.testng", java_builds
+    ):
+        found.append(Classification("testng", 0.95, ["testng dependency"]))
+    elif repo.mentions("junit", java_builds) or repo.mentions(
+        "junit-jupiter", java_builds
+    ):
+        found.append(Classification("junit", 0.95, ["junit dependency"]))
+    if (
+        repo.has(".rspec")
+        or repo.matching(r"_spec\.rb$")
+        or repo.mentions("rspec", ["Gemfile"])
+    ):
+        found.append(Classification("rspec", 0.95, ["rspec configuration or specs"]))
+    if repo.has("phpunit.xml", "phpunit.xml.dist") or repo.mentions("phpunit/phpunit"):
+        found.append(
+            Classification("phpunit", 0.95, ["phpunit configuration or dependency"])
+        )
+    if repo.mentions("XCTest") or repo.matching(r"Tests/.*\.swift$"):
+        found.append(Classification("xctest", 0.9, ["XCTest targets"]))
+    python = _python_test_framework(repo, read_file)
+    if python:
+        found.append(python)
+    if language == "rust" and (
+        repo.matching(r"^tests/.*\.rs$") or repo.has("Cargo.toml")
+    ):
+        # Rust's built-in test harness has no value of its own
+        found.append(Classification("other", 0.75, ["Rust built-in tests"]))
+
+    if not found:
+        has_tests = repo.matching(r"(^|/)(tests?|spec|__tests__)/")
+        if has_tests:
+            return Classification(None, 0.0, ["test files of an unknown framework"])
+        return Classification("none", 0.8, ["no test files or configuration"])
+
+    found.sort(key=lambda c: c.confidence, reverse=True)
+    best = found[0]
+    if len({c.value for c in found}) > 1:
+        # Several frameworks, e.g. a Python backend and a JS frontend
+        return Classification(
+            best.value,
+            min(best.confidence, 0.6),
+            best.evidence + [f"also found {', '.join(c.value for c in found[1:])}"],
+        )
+    return best
+
+
+def classify_repo_type(repo: RepoSnapshot, language: Optional[str]) -> Classification:
+    if language == "none":
+        return Classification("none", 0.6, ["no source files"])
+
+    found = []
+    dependencies = repo.dependencies()
+    executables = repo.declares_executables()
+    for repo_type, (confidence, signals) in REPO_TYPE_SIGNALS.items():
+        matches = [
+            signal
+            for signal in signals
+            if any(_depends_on(name, signal) for name in dependencies)
+        ]
+        if not matches:
+            continue
+        evidence = [f"depends on {', '.join(matches)}"]
+        structure = repo.matching(REPO_TYPE_STRUCTURE[repo_type])
+        if structure:
+            evidence.append(f"has {structure[0]}")
+        elif repo_type == "cli_tool" and executables:
+            evidence.append("declares executables")
+        else:
+            confidence = DEPENDENCY_CONFIDENCE
+        found.append(Classification(repo_type, confidence, evidence))
+
+    if repo.has("AndroidManifest.xml", "pubspec.yaml") or repo.matching(
+        r"\.xcodeproj/"
+    ):
+        found.append(Classification("mobile_app", 0.85, ["mobile project files"]))
+    notebooks = repo.matching(r"\.ipynb$")
+    if notebooks and len(notebooks) * 3 >= len(repo.files):
+        found.append(
+            Classification("data_science", 0.8, [f"{len(notebooks)} notebooks"])
+        )
+    if executables:
+        found.append(Classification("cli_tool", 0.6, ["declares executables"]))
+    if repo.peer_dependencies():
+        found.append(Classification("library", 0.75, ["declares peerDependencies"]))
+
+    if not found:
+        if repo.manifests:
+            return Classification(
+                "library", 0.6, ["package manifest without app dependencies"]
+            )
+        return Classification(None, 0.0, ["no manifest"])
+
+    # Keep the strongest signal per type
+    by_type = {}
+    for c in sorted(found, key=lambda c: c.confidence):
+        by_type[c.value] = c
+    # Mobile apps are built with web frameworks (React Native, Ionic)
+    if "mobile_app" in by_type:
+        by_type.pop("web_app", None)
+    ranked = sorted(by_type.values(), key=lambda c: c.confidence, reverse=True)
+    best = ranked[0]
+    if len(ranked) > 1:
+        # e.g. a full-stack app depends on both web and API frameworks
+        return Classification(
+            best.value,
+            min(best.confidence, 0.5),
+            best.evidence
+            + [f"also looks like {', '.join(c.value for c in ranked[1:])}"],
+        )
+    return best
+
+
+def preclassify(
+    files: List[str], read_file: Callable[[str], Optional[str]]
+) -> Dict[str, Classification]:
+    """Classify a repository without the model.
+
+    Args:
+        files: Paths of the files in the checkout, relative to its root
+        read_file: Returns the content of a file, or None if it can't be read
+
+    Returns:
+        Dict[str, Classification]: Classifications of repo_type, language and
+        test_framework. A value is None when there is nothing to go on;
+        confidences range from 0 to 1.
+    """
+    repo = RepoSnapshot(files, read_file)
+    language = classify_language(repo)
+    return {
+        "repo_type": classify_repo_type(repo, language.value),
+        "language": language,
+        "test_framework": classify_test_framework(repo, language.value, read_file),
+    }
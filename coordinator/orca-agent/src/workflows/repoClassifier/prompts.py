@@ -69,4 +69,18 @@ PROMPTS = {
         "- None: If no test framework is detected\n"
         "- Other: If it doesn't fit into any of the above categories\n"
     ),
+    "classify_repository_metadata": (
+        "Analyze the repository and identify its type, its primary programming language "
+        "and its test framework.\n"
+        "Use the `classify_repository_metadata` tool to report all three at once.\n"
+        "Repository types: library, web_app, api_service, mobile_app, tutorial, template, "
+        "cli_tool, framework, data_science, none (not programming related), other\n"
+        "Languages: python, javascript, typescript, java, c, cpp, go, rust, ruby, php, swift, "
+        "kotlin, scala, r, shell, none (not programming related), other\n"
+        "Test frameworks: pytest, unittest, jest, mocha, junit, testng, go_testing, rspec, "
+        "phpunit, xctest, kotest, none (no test framework detected), other\n\n"
+        "A quick scan of the file list and the manifests suggests the following; "
+        "confirm or correct it by looking at the repository:\n"
+        "{preclassification}\n"
+    ),
 }
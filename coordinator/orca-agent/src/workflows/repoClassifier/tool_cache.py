@@ -0,0 +1,106 @@
+"""Shared results of read-only tool calls for one workflow run."""
+
+import contextlib
+import copy
+import json
+import os
+import threading
+
+# Tools whose result only depends on their arguments and the checkout
+CACHED_TOOLS = ["read_file", "list_files"]
+
+
+class ToolReadCache:
+    """read_file and list_files results shared by the phases of a workflow.
+
+    The classification phases only read the checkout, so the same call
+    returns the same result in every phase. While installed on a client,
+    successful results are kept and returned to later calls with the same
+    arguments and working directory instead of reading the files again.
+
+    Only the tool's declared parameters make up the key. Calls from the
+    model also carry the whole workflow context, which changes between
+    phases, while direct calls such as preclassify's carry none.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached_result(self, key):
+        # Expects the lock to be held
+        if key in self._results:
+            self.hits += 1
+            return copy.deepcopy(self._results[key])
+        return None
+
+    def _wrap(self, tool_name, function, parameters=None):
+        def cached(**kwargs):
+            arguments = kwargs
+            if parameters is not None:
+                arguments = {k: v for k, v in kwargs.items() if k in parameters}
+            key = (
+                tool_name,
+                os.getcwd(),
+                json.dumps(arguments, sort_keys=True, default=str),
+            )
+            with self._lock:
+                result = self._cached_result(key)
+                if result is not None:
+                    return result
+                # Concurrent phases often ask for the same file at once;
+                # only the first call reads it, the others wait for it
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    self._in_flight[key] = threading.Event()
+
+            if in_flight is not None:
+                in_flight.wait()
+                with self._lock:
+                    result = self._cached_result(key)
+                if result is not None:
+                    return result
+
+            with self._lock:
+                self.misses += 1
+            try:
+                result = function(**kwargs)
+                if isinstance(result, dict) and result.get("success"):
+                    with self._lock:
+                        self._results[key] = copy.deepcopy(result)
+                return result
+            finally:
+                if in_flight is None:
+                    with self._lock:
+                        self._in_flight.pop(key).set()
+
+        return cached
+
+    @contextlib.contextmanager
+    def installed(self, client):
+        """Send the client's read-only tool calls through the cache."""
+        originals = {}
+        for tool_name in CACHED_TOOLS:
+            if tool_name in client.tools:
+                tool = client.tools[tool_name]
+                originals[tool_name] = tool
+                parameters = (tool.get("parameters") or {}).get("properties")
+                client.tools[tool_name] = {
+                    **tool,
+                    "function": self._wrap(tool_name, tool["function"], parameters),
+                }
+        try:
+            yield self
+        finally:
+            client.tools.update(originals)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._results),
+            }
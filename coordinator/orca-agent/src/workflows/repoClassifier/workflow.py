@@ -2,16 +2,29 @@
 
 import os
 import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from github import Github
 from prometheus_swarm.workflows.base import Workflow
 from prometheus_swarm.utils.logging import log_key_value, log_error
 from src.workflows.repoClassifier import phases
+from src.workflows.repoClassifier.tool_cache import ToolReadCache
+from src.workflows.repoClassifier.preclassifier import (
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    preclassify,
+)
 from prometheus_swarm.workflows.utils import (
     check_required_env_vars,
     cleanup_repository,
     validate_github_auth,
-    setup_repository
 )
+from src.workspace import lazy_reads, setup_partial_repository
+
+# Metadata key and the phase that classifies it
+CLASSIFICATIONS = [
+    ("repo_type", phases.RepoClassificationPhase),
+    ("language", phases.LanguageClassificationPhase),
+    ("test_framework", phases.TestFrameworkClassificationPhase),
+]
 
 
 class Task:
@@ -44,6 +57,7 @@ class RepoClassifierWorkflow(Workflow):
         client,
         prompts,
         repo_url,
+        concurrent_phases=None,
     ):
         # Extract owner and repo name from URL
         # URL format: https://github.com/owner/repo
@@ -59,6 +73,18 @@ class RepoClassifierWorkflow(Workflow):
             repo_name=repo_name,
         )
         self._cleanup_required = False
+        # Run the classification phases at the same time instead of one
+        # after another; defaults to the CLASSIFIER_CONCURRENT_PHASES env var
+        if concurrent_phases is None:
+            concurrent_phases = (
+                os.getenv("CLASSIFIER_CONCURRENT_PHASES", "false").lower() == "true"
+            )
+        self.concurrent_phases = concurrent_phases
+        # Heuristic classifications at least this confident are used without
+        # asking the model; above 1 the model is always asked
+        self.confidence_threshold = float(
+            os.getenv("CLASSIFIER_CONFIDENCE_THRESHOLD", DEFAULT_CONFIDENCE_THRESHOLD)
+        )
 
     @contextlib.contextmanager
     def managed_workflow(self):
@@ -97,8 +123,9 @@ class RepoClassifierWorkflow(Workflow):
                 self.context["base"] = "main" 
                 
 
-            # Set up repository directory
-            setup_result = setup_repository(self.context["repo_url"], github_token=os.getenv("GITHUB_TOKEN"), github_username=os.getenv("GITHUB_USERNAME"))
+            # Set up repository directory; classification needs the file
+            # list and a few files, which are fetched on demand
+            setup_result = setup_partial_repository(self.context["repo_url"], github_token=os.getenv("GITHUB_TOKEN"), github_username=os.getenv("GITHUB_USERNAME"))
             if not setup_result["success"]:
                 raise Exception(f"Failed to set up repository: {setup_result['message']}")
             self.context["github_token"] = os.getenv("GITHUB_TOKEN")
@@ -147,8 +174,30 @@ class RepoClassifierWorkflow(Workflow):
         # Add any additional cleanup steps here
         pass
 
+    def preclassify(self):
+        """Classify the checkout from its file list and manifests.
+
+        Files are read through the client's tools, so the model phases get
+        the same reads from the tool read cache.
+        """
+        list_files = self.client.tools["list_files"]["function"]
+        read_file = self.client.tools["read_file"]["function"]
+
+        listing = list_files(directory=".")
+        files = listing["data"]["files"] if listing.get("success") else []
+
+        def read(path):
+            result = read_file(file_path=path)
+            return result["data"]["content"] if result.get("success") else None
+
+        return preclassify(files, read)
+
     def run(self):
-        with self.managed_workflow():
+        # The phases read the same files, so they share one tool read cache
+        tool_cache = ToolReadCache()
+        with self.managed_workflow(), lazy_reads(self.client), tool_cache.installed(
+            self.client
+        ):
             repoMetadata = {}
             max_retries = 3
             
@@ -173,18 +222,62 @@ class RepoClassifierWorkflow(Workflow):
                             raise
                 return result
             
+            # Helper function to classify with one phase per key
+            def classify_separately(keys):
+                phase_classes = [(key, phase_class) for key, phase_class in CLASSIFICATIONS if key in keys]
+                if self.concurrent_phases:
+                    # The phases only read the checkout, so they can share it
+                    with ThreadPoolExecutor(max_workers=len(phase_classes)) as executor:
+                        futures = {
+                            key: executor.submit(retry_classification, phase_class)
+                            for key, phase_class in phase_classes
+                        }
+                        results = {key: future.result() for key, future in futures.items()}
+                else:
+                    results = {
+                        key: retry_classification(phase_class)
+                        for key, phase_class in phase_classes
+                    }
+                return {key: extract_value(results[key], key) for key in results}
+
             try:
-                # Get repository type with retry
-                repo_type_result = retry_classification(phases.RepoClassificationPhase)
-                repoMetadata["repo_type"] = extract_value(repo_type_result, "repo_type")
-                
-                # Get language with retry
-                language_result = retry_classification(phases.LanguageClassificationPhase)
-                repoMetadata["language"] = extract_value(language_result, "language")
-                
-                # Get test framework with retry
-                test_framework_result = retry_classification(phases.TestFrameworkClassificationPhase)
-                repoMetadata["test_framework"] = extract_value(test_framework_result, "test_framework")
+                # Answer from the file list and manifests where that is
+                # clear enough, and ask the model about the rest
+                preclassification = self.preclassify()
+                uncertain = []
+                for key, _ in CLASSIFICATIONS:
+                    classification = preclassification[key]
+                    log_key_value(
+                        f"Preclassified {key}",
+                        f"{classification.value} ({classification.confidence}): "
+                        + "; ".join(classification.evidence),
+                    )
+                    if classification.value and classification.confidence >= self.confidence_threshold:
+                        repoMetadata[key] = classification.value
+                    else:
+                        uncertain.append(key)
+
+                if uncertain:
+                    # One call for all uncertain keys, with the guesses as hints
+                    self.context["preclassification"] = "\n".join(
+                        f"- {key}: {preclassification[key].value or 'unknown'} "
+                        f"(confidence {preclassification[key].confidence})"
+                        for key, _ in CLASSIFICATIONS
+                    )
+                    try:
+                        combined_result = retry_classification(phases.CombinedClassificationPhase)
+                    except Exception as e:
+                        log_error(e, "Combined classification failed")
+                        combined_result = {}
+                    for key in uncertain:
+                        repoMetadata[key] = extract_value(combined_result, key)
+
+                    # Fall back to one phase per key for what is still missing
+                    missing = [key for key in uncertain if not repoMetadata[key]]
+                    if missing:
+                        repoMetadata.update(classify_separately(missing))
+                repoMetadata = {key: repoMetadata[key] for key, _ in CLASSIFICATIONS}
+                log_key_value("Tool read cache", tool_cache.stats())
                 
                 # Check if all classifications were successful
                 success = all([
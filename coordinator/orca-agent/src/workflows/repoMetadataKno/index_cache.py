@@ -0,0 +1,311 @@
+"""kno indexes kept across workflow runs, keyed by repository and commit."""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Updating an index relies on kno_sdk internals: index_repo's chunking
+# helpers and skip lists below, and the Chroma collection of its vector store.
+# kno-sdk is pinned exactly for that; check an upgrade with
+# `python -m testing.check_kno_index_cache`.
+from kno_sdk import EmbeddingMethod, index_repo, load_index
+from kno_sdk.constant import BINARY_EXTS, TOKEN_LIMIT
+from kno_sdk.embedding import _extract_semantic_chunks, _fallback_line_chunks
+from prometheus_swarm.utils.logging import log_error, log_key_value
+
+DEFAULT_CACHE_DIR = os.path.join(Path.home(), ".cache", "orca-agent", "kno-indexes")
+DEFAULT_MAX_BYTES = 10 * 1024**3
+
+# Files index_repo leaves out, copied from kno-sdk 1.4.10; files changed
+# since the cached commit are filtered the same way when the index is updated
+SKIP_DIRS = {
+    ".git",
+    "node_modules",
+    "build",
+    "dist",
+    "target",
+    ".vscode",
+    ".kno",
+    ".github",
+    ".venv",
+}
+SKIP_FILES = {"package-lock.json", "yarn.lock", ".prettierignore"}
+MAX_FILE_BYTES = 2_000_000
+
+META_FILE = "meta.json"
+
+
+def _git(repo_path, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo_path), *args],
+        capture_output=True,
+        check=True,
+    ).stdout
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(root, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _rename_collection(persist_dir, old_name, new_name):
+    """Rename the Chroma collection of an index.
+
+    load_index opens the collection named after the checkout directory,
+    which differs between clones of the same repository.
+    """
+    if old_name == new_name:
+        return
+    import chromadb
+
+    client = chromadb.PersistentClient(path=str(persist_dir))
+    client.get_collection(old_name).modify(name=new_name)
+
+
+class KnoIndexCache:
+    """kno indexes of repositories, stored outside their throwaway clones.
+
+    index_repo embeds every file of a checkout, which takes minutes, and
+    the index is lost with the clone. Built indexes are copied to the cache
+    directory under the repository and the commit they were built from:
+
+    - the same commit is restored from the cache without embedding anything;
+    - a descendant of a cached commit starts from the index of the closest
+      cached ancestor, re-embedding only the files changed since its commit;
+    - anything else is indexed in full.
+
+    The least recently used indexes are evicted once the cache is larger
+    than its size limit. Settings come from environment variables:
+    KNO_INDEX_CACHE_DIR and KNO_INDEX_CACHE_MAX_BYTES.
+    """
+
+    # One cache directory is shared by all the workflows of a process
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir=None, max_bytes=None, embedding=EmbeddingMethod.SBERT):
+        self.cache_dir = Path(
+            cache_dir or os.environ.get("KNO_INDEX_CACHE_DIR", DEFAULT_CACHE_DIR)
+        )
+        self.max_bytes = int(
+            max_bytes or os.environ.get("KNO_INDEX_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.embedding = EmbeddingMethod(embedding)
+
+    def _repo_dir(self, repo_key):
+        return self.cache_dir / repo_key.replace("/", "__")
+
+    def _entry_dir(self, repo_key, sha):
+        return self._repo_dir(repo_key) / f"{sha}-{self.embedding.value}"
+
+    def _entries(self):
+        """Metadata of every cached index, with the path of its entry."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for meta_path in self.cache_dir.glob(f"*/*/{META_FILE}"):
+            try:
+                meta = json.loads(meta_path.read_text())
+            except (OSError, ValueError):
+                continue
+            meta["path"] = meta_path.parent
+            entries.append(meta)
+        return entries
+
+    def _touch(self, entry_dir):
+        meta_path = entry_dir / META_FILE
+        meta = json.loads(meta_path.read_text())
+        meta["lastUsed"] = time.time()
+        meta_path.write_text(json.dumps(meta))
+
+    def _latest_index_dir(self, repo_path):
+        """The newest index directory index_repo wrote in a checkout."""
+        prefix = f"embedding_{self.embedding.value}_"
+        candidates = [
+            d
+            for d in (repo_path / ".kno").glob(f"{prefix}*")
+            if d.is_dir() and d.name[len(prefix) :].split("_")[0].isdigit()
+        ]
+        return max(candidates, key=lambda d: int(d.name[len(prefix) :].split("_")[0]))
+
+    def _restore(self, entry_dir, repo_path, sha):
+        """Copy a cached index into a checkout, where load_index looks for it."""
+        meta = json.loads((entry_dir / META_FILE).read_text())
+        target = (
+            repo_path
+            / ".kno"
+            / f"embedding_{self.embedding.value}_{int(time.time() * 1000)}_{sha[:7]}"
+        )
+        shutil.copytree(entry_dir / "index", target)
+        _rename_collection(target, meta["collection"], repo_path.name)
+        return load_index(repo_path, self.embedding)
+
+    def _store(self, repo_path, repo_key, sha):
+        """Copy the index just built in a checkout into the cache."""
+        entry_dir = self._entry_dir(repo_key, sha)
+        if entry_dir.exists():
+            return
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=entry_dir.parent))
+        try:
+            shutil.copytree(self._latest_index_dir(repo_path), staging / "index")
+            now = time.time()
+            meta = {
+                "repo": repo_key,
+                "sha": sha,
+                "embedding": self.embedding.value,
+                "collection": repo_path.name,
+                "size": _dir_size(staging),
+                "created": now,
+                "lastUsed": now,
+            }
+            (staging / META_FILE).write_text(json.dumps(meta))
+            # Another process may have stored the same commit meanwhile
+            os.rename(staging, entry_dir)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not entry_dir.exists():
+                raise
+        self._evict(keep=entry_dir)
+
+    def _evict(self, keep=None):
+        """Remove the least recently used indexes until the cache fits."""
+        entries = sorted(self._entries(), key=lambda e: e.get("lastUsed", 0))
+        total = sum(e.get("size", 0) for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry["path"] == keep:
+                continue
+            log_key_value("Evicting kno index", f"{entry['repo']}@{entry['sha']}")
+            shutil.rmtree(entry["path"], ignore_errors=True)
+            total -= entry.get("size", 0)
+
+    def _base_entry(self, repo_path, repo_key, sha):
+        """The cached index of the closest ancestor of sha, if any."""
+        best, best_distance = None, None
+        for entry in self._entries():
+            if entry["repo"] != repo_key or entry["embedding"] != self.embedding.value:
+                continue
+            try:
+                _git(repo_path, "merge-base", "--is-ancestor", entry["sha"], sha)
+                distance = int(
+                    _git(repo_path, "rev-list", "--count", f"{entry['sha']}..{sha}")
+                )
+            except (OSError, subprocess.CalledProcessError):
+                # Not an ancestor, or not in this clone's history
+                continue
+            if best_distance is None or distance < best_distance:
+                best, best_distance = entry, distance
+        return best
+
+    def _changed_files(self, repo_path, base_sha, sha):
+        output = _git(
+            repo_path, "diff", "--name-only", "--no-renames", "-z", base_sha, sha
+        )
+        return [
+            path.decode("utf-8", "surrogateescape")
+            for path in output.split(b"\0")
+            if path
+        ]
+
+    def _chunks(self, repo_path, relpath):
+        """Chunks of a file the way index_repo splits it, or [] to skip it."""
+        path = repo_path / relpath
+        if any(part in SKIP_DIRS for part in Path(relpath).parts[:-1]):
+            return []
+        if path.name in SKIP_FILES or "." not in path.name:
+            return []
+        try:
+            if not path.is_file() or path.stat().st_size > MAX_FILE_BYTES:
+                return []
+            if path.suffix.lower() in BINARY_EXTS:
+                return []
+            content = path.read_text(errors="ignore")
+        except OSError:
+            return []
+        chunks = _extract_semantic_chunks(path, content) or _fallback_line_chunks(
+            path, content
+        )
+        return [chunk[:TOKEN_LIMIT] for chunk in chunks]
+
+    def _update(self, index, repo_path, changed):
+        """Re-embed the changed files of a restored index."""
+        collection = index.vector_store._collection
+        collection.delete(where={"source": {"$in": changed}})
+        texts, metas = [], []
+        for relpath in changed:
+            for chunk in self._chunks(repo_path, relpath):
+                texts.append(chunk)
+                metas.append({"source": relpath})
+        if texts:
+            index.vector_store.add_texts(texts=texts, metadatas=metas)
+        return len(texts)
+
+    def get_index(self, repo_path, repo_key):
+        """Get the kno index of a checkout, building only what the cache lacks.
+
+        Args:
+            repo_path: Path of the checkout
+            repo_key: Identifies the repository across clones, e.g. owner/name
+
+        Returns:
+            RepoIndex: The index, loaded from the checkout's .kno directory
+        """
+        repo_path = Path(repo_path)
+        sha = _git(repo_path, "rev-parse", "HEAD").decode().strip()
+        entry_dir = self._entry_dir(repo_key, sha)
+
+        with self._lock:
+            if (entry_dir / META_FILE).exists():
+                try:
+                    index = self._restore(entry_dir, repo_path, sha)
+                    self._touch(entry_dir)
+                    log_key_value("kno index cache hit", f"{repo_key}@{sha}")
+                    return index
+                except Exception as e:
+                    log_error(e, "Failed to restore cached kno index, rebuilding")
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    shutil.rmtree(repo_path / ".kno", ignore_errors=True)
+
+            base = self._base_entry(repo_path, repo_key, sha)
+
+        index = None
+        if base is not None:
+            try:
+                changed = self._changed_files(repo_path, base["sha"], sha)
+                index = self._restore(base["path"], repo_path, sha)
+                self._touch(base["path"])
+                if changed:
+                    chunks = self._update(index, repo_path, changed)
+                    log_key_value(
+                        "kno index updated",
+                        f"{repo_key}@{sha}: {len(changed)} changed files, "
+                        f"{chunks} chunks from {base['sha'][:7]}",
+                    )
+            except Exception as e:
+                log_error(e, "Failed to update cached kno index, indexing in full")
+                shutil.rmtree(repo_path / ".kno", ignore_errors=True)
+                index = None
+
+        if index is None:
+            log_key_value("kno index cache miss", f"{repo_key}@{sha}")
+            index = index_repo(repo_path, self.embedding)
+
+        try:
+            with self._lock:
+                self._store(repo_path, repo_key, sha)
+        except Exception as e:
+            # The index works without the cache
+            log_error(e, "Failed to cache kno index")
+        return index
@@ -1,66 +1,180 @@
+import codecs
+import fnmatch
 import os
-from pygments.lexers import guess_lexer_for_filename
-from pygments.util import ClassNotFound
+import subprocess
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from pygments.lexers import get_all_lexers, guess_lexer_for_filename
+from pygments.util import ClassNotFound
+
+# Bytes read from each file to detect binary content and, for file names
+# several lexers claim, to guess the language
+SNIFF_BYTES = 8192
+
+BINARY_EXTENSIONS = {".pyc", ".so", ".dll", ".exe", ".bin"}
+
+
+@lru_cache(maxsize=1)
+def _filename_table():
+    """Map file name patterns to the names of the lexers that claim them.
+
+    Returns:
+        tuple: Lexer names by extension ("*.py" -> ".py"), by exact file
+        name ("Makefile"), and a list of (pattern, name) for the patterns
+        that need fnmatch
+    """
+    extensions = defaultdict(list)
+    filenames = defaultdict(list)
+    patterns = []
+    for name, _, lexer_filenames, _ in get_all_lexers(plugins=False):
+        for pattern in lexer_filenames:
+            wildcard = any(c in pattern for c in "*?[")
+            if pattern.startswith("*.") and not any(c in pattern[1:] for c in "*?["):
+                extensions[pattern[1:]].append(name)
+            elif not wildcard:
+                filenames[pattern].append(name)
+            else:
+                patterns.append((pattern, name))
+    return dict(extensions), dict(filenames), patterns
+
+
+def _candidate_lexers(filename):
+    """Names of the lexers whose file name patterns match filename."""
+    extensions, filenames, patterns = _filename_table()
+    candidates = list(filenames.get(filename, []))
+    # Every suffix, so "*.ts" and "*.d.ts" both match "index.d.ts"
+    dot = filename.find(".", 1)
+    while dot != -1:
+        candidates.extend(extensions.get(filename[dot:], []))
+        dot = filename.find(".", dot + 1)
+    for pattern, name in patterns:
+        if fnmatch.fnmatchcase(filename, pattern):
+            candidates.append(name)
+    return list(dict.fromkeys(candidates))
+
+
+def _is_binary(head):
+    """Whether the first bytes of a file look binary (NUL bytes or not UTF-8)."""
+    if b"\0" in head:
+        return True
+    try:
+        # Not final: the head may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return False
+    except UnicodeDecodeError:
+        return True
+
 
 class Linguist:
-    def __init__(self):
+    """Language statistics of a project, by the share of bytes in each language.
+
+    Files are mapped to languages by name through a table built from the
+    pygments lexers; only names that several lexers claim (such as *.h) are
+    guessed from their first bytes. Binary files are detected from their
+    first bytes and sizes come from stat, so no file is read in full. In a
+    git checkout only the files git knows about and doesn't ignore are
+    counted, and files are scanned by a thread pool.
+    """
+
+    def __init__(self, workers=None):
         self.language_stats = defaultdict(int)
         self.total_bytes = 0
-    
-    def _is_binary(self, filepath):
-        """Check if a file is binary."""
-        try:
-            with open(filepath, 'tr') as check_file:
-                check_file.read()
-                return False
-        except UnicodeDecodeError:
-            return True
-    
-    def _should_analyze(self, filepath):
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+
+    def _should_analyze(self, relpath):
         """Determine if a file should be analyzed."""
         # Skip hidden files and directories
-        if any(part.startswith('.') for part in filepath.split(os.sep)):
+        if any(part.startswith(".") for part in relpath.split("/")):
             return False
-            
+
         # Skip common binary file extensions
-        binary_extensions = {'.pyc', '.so', '.dll', '.exe', '.bin'}
-        if os.path.splitext(filepath)[1].lower() in binary_extensions:
+        if os.path.splitext(relpath)[1].lower() in BINARY_EXTENSIONS:
             return False
-            
-        # Skip binary files
-        if self._is_binary(filepath):
-            return False
-            
+
         return True
-    
+
+    def _list_files(self, project_path):
+        """Files of the project relative to it, respecting .gitignore in a
+        git checkout."""
+        try:
+            output = subprocess.run(
+                [
+                    "git",
+                    "-C",
+                    project_path,
+                    "ls-files",
+                    "-z",
+                    "--cached",
+                    "--others",
+                    "--exclude-standard",
+                ],
+                capture_output=True,
+                check=True,
+            ).stdout
+            return [
+                path.decode("utf-8", "surrogateescape")
+                for path in output.split(b"\0")
+                if path
+            ]
+        except (OSError, subprocess.CalledProcessError):
+            files = []
+            for root, dirs, filenames in os.walk(project_path):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                rel_root = os.path.relpath(root, project_path)
+                for filename in filenames:
+                    path = filename if rel_root == "." else f"{rel_root}/{filename}"
+                    files.append(path.replace(os.sep, "/"))
+            return files
+
+    def _analyze_file(self, project_path, relpath):
+        """Get the language and size of a file, or None to skip it."""
+        filename = os.path.basename(relpath)
+        candidates = _candidate_lexers(filename)
+        if not candidates:
+            return None
+
+        filepath = os.path.join(project_path, relpath)
+        try:
+            if not os.path.isfile(filepath):
+                # Deleted but still tracked, or a submodule
+                return None
+            size = os.stat(filepath).st_size
+            with open(filepath, "rb") as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return None
+        if _is_binary(head):
+            return None
+
+        if len(candidates) == 1:
+            return candidates[0], size
+        try:
+            text = codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+            return guess_lexer_for_filename(filename, text).name, size
+        except ClassNotFound:
+            return None
+
     def analyze_project(self, project_path):
         """Analyze a project directory and return language statistics."""
-        for root, _, files in os.walk(project_path):
-            for file in files:
-                filepath = os.path.join(root, file)
-                
-                if not self._should_analyze(filepath):
-                    continue
-                    
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        file_size = len(content.encode('utf-8'))
-                        
-                        try:
-                            lexer = guess_lexer_for_filename(filepath, content)
-                            self.language_stats[lexer.name] += file_size
-                            self.total_bytes += file_size
-                        except ClassNotFound:
-                            continue
-                except (IOError, UnicodeDecodeError):
-                    continue
-        
+        project_path = str(project_path)
+        files = [f for f in self._list_files(project_path) if self._should_analyze(f)]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(
+                lambda relpath: self._analyze_file(project_path, relpath), files
+            )
+            for result in results:
+                if result:
+                    language, size = result
+                    self.language_stats[language] += size
+                    self.total_bytes += size
+
         # Convert byte counts to percentages
         if self.total_bytes > 0:
             return {
                 lang: (bytes_count / self.total_bytes) * 100
                 for lang, bytes_count in self.language_stats.items()
             }
-        return {} 
\ No newline at end of file
+        return {}
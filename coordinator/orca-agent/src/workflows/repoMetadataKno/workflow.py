@@ -14,7 +14,8 @@ from prometheus_swarm.workflows.utils import (
     setup_repository
 )
 from .linguist import Linguist
-from kno_sdk import index_repo, load_index, agent_query
+from .index_cache import KnoIndexCache
+from kno_sdk import agent_query
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -105,7 +106,8 @@ class RepoMetadataKnoWorkflow(Workflow):
                 
 
             # Set up repository directory
-            setup_result = setup_repository(self.context["repo_url"], github_token=os.getenv("GITHUB_TOKEN"), github_username=os.getenv("GITHUB_USERNAME"))
+            # Nothing is pushed, so the repository is cloned without a fork
+            setup_result = setup_repository(self.context["repo_url"], github_token=os.getenv("GITHUB_TOKEN"), github_username=os.getenv("GITHUB_USERNAME"), skip_fork=True)
             if not setup_result["success"]:
                 raise Exception(f"Failed to set up repository: {setup_result['message']}")
             self.context["github_token"] = os.getenv("GITHUB_TOKEN")
@@ -159,7 +161,10 @@ class RepoMetadataKnoWorkflow(Workflow):
             linguist = Linguist()
             languages = linguist.analyze_project(self.context["repo_path"])
          
-            index = index_repo(Path(self.context["repo_path"]))
+            index = KnoIndexCache().get_index(
+                Path(self.context["repo_path"]),
+                f"{self.context['repo_owner']}/{self.context['repo_name']}",
+            )
             system_prompt = """
             You are a senior code-analysis agent working on the repository below.
 
@@ -236,7 +241,6 @@ class RepoMetadataKnoWorkflow(Workflow):
                 }}
             """
 
-            index = load_index(Path(self.context["repo_path"]))
             print("loaded index", index)
             resp = agent_query(
                 repo_index=index,
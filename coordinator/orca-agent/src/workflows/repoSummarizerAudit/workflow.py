@@ -8,10 +8,10 @@ from src.workflows.repoSummarizerAudit import phases
 from prometheus_swarm.workflows.utils import (
     check_required_env_vars,
     validate_github_auth,
-    setup_repository,
     cleanup_repository,
     get_current_files,
 )
+from src.workspace import fetch_partial, lazy_reads, setup_partial_repository
 
 
 class Task:
@@ -70,8 +70,9 @@ class repoSummarizerAuditWorkflow(Workflow):
         check_required_env_vars(["GITHUB_TOKEN", "GITHUB_USERNAME"])
         validate_github_auth(os.getenv("GITHUB_TOKEN"), os.getenv("GITHUB_USERNAME"))
         self.context["repo_url"] = f"https://github.com/{self.context['repo_owner']}/{self.context['repo_name']}"
-        # Set up repository directory
-        setup_result = setup_repository(self.context["repo_url"], github_token=os.getenv("GITHUB_TOKEN"), github_username=os.getenv("GITHUB_USERNAME"))
+        # Set up repository directory; the audit reads a few files, so they
+        # are fetched on demand
+        setup_result = setup_partial_repository(self.context["repo_url"], github_token=os.getenv("GITHUB_TOKEN"), github_username=os.getenv("GITHUB_USERNAME"))
         if not setup_result["success"]:
             raise Exception(f"Failed to set up repository: {setup_result['message']}")
             
@@ -93,7 +94,7 @@ class repoSummarizerAuditWorkflow(Workflow):
         os.system(
             f"git remote add pr_source https://github.com/{pr.head.repo.full_name}"
         )
-        os.system(f"git fetch pr_source {pr.head.ref}")
+        fetch_partial("pr_source", pr.head.ref)
         os.system("git checkout FETCH_HEAD")
 
         # Get current files for context
@@ -120,7 +121,8 @@ class repoSummarizerAuditWorkflow(Workflow):
             self.setup()
             # ==================== Generate issues ====================
             check_readme_file_phase = phases.CheckReadmeFilePhase(workflow=self)
-            check_readme_file_result = check_readme_file_phase.execute()
+            with lazy_reads(self.client):
+                check_readme_file_result = check_readme_file_phase.execute()
             # Check Issue Generation Result
             if not check_readme_file_result or not check_readme_file_result.get(
                 "success"
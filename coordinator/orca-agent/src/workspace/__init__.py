@@ -0,0 +1,15 @@
+"""Workspace package."""
+
+from .partial_clone import (
+    fetch_partial,
+    lazy_reads,
+    read_blob,
+    setup_partial_repository,
+)
+
+__all__ = [
+    "fetch_partial",
+    "lazy_reads",
+    "read_blob",
+    "setup_partial_repository",
+]
@@ -0,0 +1,166 @@
+"""Partial clones with sparse checkouts, for read-only workflows that read a
+few files."""
+
+import contextlib
+import os
+import subprocess
+import uuid
+from typing import List, Optional
+
+from git import Repo
+from prometheus_swarm.utils.logging import log_error, log_key_value
+from prometheus_swarm.workflows.utils import _setup_git_user_config
+
+DEFAULT_WORKSPACE_DIR = "./repos"
+
+# Only trees and commits are cloned; file contents are fetched when needed
+BLOB_FILTER = "blob:none"
+
+
+def _allocate_path(workspace_dir: str) -> str:
+    """Create a new, uniquely named workspace directory."""
+    os.makedirs(workspace_dir, exist_ok=True)
+    path = os.path.join(workspace_dir, f"repo_{uuid.uuid4().hex}")
+    os.mkdir(path)
+    return path
+
+
+def setup_partial_repository(
+    repo_url: str,
+    github_token: str = None,
+    github_username: str = None,
+    sparse_dirs: Optional[List[str]] = None,
+) -> dict:
+    """Set up a read-only repository like setup_repository, without downloading
+    its files.
+
+    The repository is cloned directly rather than through a fork, as nothing
+    is pushed from it.
+
+    The clone has every commit and tree but no file contents, and only the
+    top-level files (plus sparse_dirs) are checked out, which fetches just
+    their contents. Other files are still listed by git ls-files and can be
+    read with read_blob, which fetches them one at a time.
+
+    Args:
+        repo_url: URL of the repository (e.g., https://github.com/owner/repo)
+        github_token: Optional GitHub token for authentication
+        github_username: Optional GitHub username for Git config
+        sparse_dirs: Optional directories to check out in full
+
+    Returns:
+        dict: Result with success status, repository details, and paths, in
+        the format of setup_repository. The fork fields describe the
+        repository itself.
+    """
+    try:
+        parts = repo_url.strip("/").split("/")
+        repo_owner, repo_name = parts[-2:]
+        clone_url = repo_url
+
+        repo_path = _allocate_path(
+            os.path.abspath(os.environ.get("WORKSPACE_DIR", DEFAULT_WORKSPACE_DIR))
+        )
+        original_dir = os.getcwd()
+
+        if github_token and "github.com" in clone_url:
+            auth_url = clone_url.replace("https://", f"https://{github_token}@")
+        else:
+            auth_url = clone_url
+
+        log_key_value("Cloning repository (partial)", clone_url)
+        log_key_value("Clone path", repo_path)
+        repo = Repo.clone_from(
+            auth_url, repo_path, multi_options=[f"--filter={BLOB_FILTER}", "--sparse"]
+        )
+        if sparse_dirs:
+            repo.git.sparse_checkout("add", *sparse_dirs)
+
+        if github_username:
+            _setup_git_user_config(repo, github_username)
+
+        return {
+            "success": True,
+            "message": "Successfully set up repository",
+            "data": {
+                "clone_path": repo_path,
+                "original_dir": original_dir,
+                "repo": repo,
+                "fork_url": clone_url,
+                "fork_owner": repo_owner,
+                "fork_name": repo_name,
+            },
+        }
+    except Exception as e:
+        log_error(e, "Repository setup failed")
+        return {
+            "success": False,
+            "message": "Failed to set up repository",
+            "data": None,
+            "error": str(e),
+        }
+
+
+def fetch_partial(remote: str, ref: str, repo_path: str = "."):
+    """Fetch a ref without file contents, which are then fetched from remote
+    when they are checked out or read."""
+    subprocess.run(
+        ["git", "-C", repo_path, "fetch", f"--filter={BLOB_FILTER}", remote, ref],
+        check=True,
+    )
+
+
+def read_blob(file_path: str, repo_path: str = ".") -> Optional[str]:
+    """Read a file of HEAD from git, fetching its content if needed.
+
+    Args:
+        file_path: Path of the file, relative to repo_path
+        repo_path: Directory in the checkout
+
+    Returns:
+        Optional[str]: The content, or None if HEAD has no such text file
+    """
+    result = subprocess.run(
+        ["git", "-C", repo_path, "cat-file", "blob", f"HEAD:./{file_path}"],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        return result.stdout.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+@contextlib.contextmanager
+def lazy_reads(client):
+    """Let the client's read_file tool read files left out of a sparse checkout.
+
+    Files that aren't on disk are read from git instead, so only the files
+    the model asks for are fetched.
+    """
+    tool = client.tools.get("read_file")
+    if tool is None:
+        yield
+        return
+
+    read_file = tool["function"]
+
+    def lazy_read_file(file_path: str, **kwargs):
+        result = read_file(file_path=file_path, **kwargs)
+        if result.get("success"):
+            return result
+        content = read_blob(file_path.lstrip("/"))
+        if content is None:
+            return result
+        return {
+            "success": True,
+            "message": f"Successfully read file {file_path}",
+            "data": {"content": content},
+        }
+
+    client.tools["read_file"] = {**tool, "function": lazy_read_file}
+    try:
+        yield
+    finally:
+        client.tools["read_file"] = tool
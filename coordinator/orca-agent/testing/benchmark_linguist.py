@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark Linguist on a large synthetic git checkout.
+
+The tree mixes source files of several languages, ambiguous headers,
+documentation, binary files and a git-ignored node_modules directory. The
+legacy column is the previous implementation (every file read in full twice
+and passed to guess_lexer_for_filename, ignored trees included), kept here
+for comparison.
+
+Run from the orca-agent directory:
+
+    python -m testing.benchmark_linguist --files 20000 --ignored 20000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+
+from pygments.lexers import guess_lexer_for_filename
+from pygments.util import ClassNotFound
+
+from src.workflows.repoMetadataKno.linguist import Linguist
+
+SOURCES = {
+    ".py": "import os\n\n\ndef handler(event):\n    return os.path.join('a', event)\n",
+    ".ts": "export function handler(event: string): string {\n  return event;\n}\n",
+    ".js": "module.exports = function handler(event) {\n  return event;\n};\n",
+    ".go": "package main\n\nfunc handler(event string) string {\n\treturn event\n}\n",
+    ".h": "#include <stdio.h>\n\nint handler(const char *event);\n",
+    ".md": "# Handler\n\nReturns the event.\n",
+    ".json": '{"name": "handler", "version": "1.0.0"}\n',
+}
+
+
+def make_tree(root, files, ignored, lines):
+    """Write the synthetic checkout."""
+    rng = random.Random(0)
+    extensions = list(SOURCES)
+    for i in range(files):
+        directory = os.path.join(root, "src", f"pkg{i % 100}", f"mod{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        if i % 50 == 0:
+            with open(os.path.join(directory, f"asset{i}.png"), "wb") as f:
+                f.write(os.urandom(64 * 1024))
+            continue
+        extension = rng.choice(extensions)
+        with open(os.path.join(directory, f"file{i}{extension}"), "w") as f:
+            f.write(SOURCES[extension] * rng.randint(1, lines))
+
+    for i in range(ignored):
+        directory = os.path.join(root, "node_modules", f"dep{i % 200}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"index{i}.js"), "w") as f:
+            f.write(SOURCES[".js"] * rng.randint(1, lines))
+
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("node_modules/\n")
+    subprocess.run(["git", "init", "-q", root], check=True)
+
+
+def legacy_analyze(project_path):
+    """The previous Linguist.analyze_project."""
+    language_stats = defaultdict(int)
+    total_bytes = 0
+    for dirpath, _, filenames in os.walk(project_path):
+        for filename in filenames:
+            filepath = os.path.join(dirpath, filename)
+            if any(part.startswith(".") for part in filepath.split(os.sep)):
+                continue
+            if os.path.splitext(filepath)[1].lower() in {
+                ".pyc",
+                ".so",
+                ".dll",
+                ".exe",
+                ".bin",
+            }:
+                continue
+            try:
+                with open(filepath, "tr") as check_file:
+                    check_file.read()
+            except UnicodeDecodeError:
+                continue
+            try:
+                with open(filepath, "r", encoding="utf-8") as f:
+                    content = f.read()
+                    file_size = len(content.encode("utf-8"))
+                    try:
+                        lexer = guess_lexer_for_filename(filepath, content)
+                        language_stats[lexer.name] += file_size
+                        total_bytes += file_size
+                    except ClassNotFound:
+                        continue
+            except (IOError, UnicodeDecodeError):
+                continue
+    return {lang: (count / total_bytes) * 100 for lang, count in language_stats.items()}
+
+
+def top(stats, n=4):
+    ranked = sorted(stats.items(), key=lambda item: item[1], reverse=True)[:n]
+    return ", ".join(f"{lang} {share:.1f}%" for lang, share in ranked)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000, help="Tracked files")
+    parser.add_argument(
+        "--ignored", type=int, default=20000, help="Files in node_modules"
+    )
+    parser.add_argument(
+        "--lines", type=int, default=200, help="Maximum repeats of each snippet"
+    )
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="linguist-benchmark-")
+    try:
+        start = time.perf_counter()
+        make_tree(root, args.files, args.ignored, args.lines)
+        print(f"Tree written in {time.perf_counter() - start:.1f}s: {root}")
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            stats = legacy_analyze(root)
+            print(f"{'legacy':>8} {time.perf_counter() - start:>8.2f}s  {top(stats)}")
+
+        start = time.perf_counter()
+        stats = Linguist().analyze_project(root)
+        print(f"{'current':>8} {time.perf_counter() - start:>8.2f}s  {top(stats)}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
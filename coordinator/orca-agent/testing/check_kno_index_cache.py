@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Check that an incrementally updated kno index matches a full index_repo.
+
+KnoIndexCache updates a cached index by re-chunking only the files changed
+since its commit, with kno_sdk's private chunking helpers and a copy of
+index_repo's skip lists. This builds a small repository with two commits,
+caches the index of the first, updates it to the second and compares its
+chunks with those of index_repo run on the second commit. Run it after
+upgrading kno-sdk; any difference means index_cache.py must follow the new
+version.
+
+Run from the orca-agent directory:
+
+    python -m testing.check_kno_index_cache
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from kno_sdk import EmbeddingMethod, index_repo
+
+from src.workflows.repoMetadataKno.index_cache import KnoIndexCache
+
+REPO_KEY = "check/kno-index-cache"
+
+BASE_FILES = {
+    "src/app.py": (
+        "import os\n\n\n"
+        "def handler(event):\n    return os.path.join('a', event)\n\n\n"
+        "class Service:\n    def run(self):\n        return handler('run')\n"
+    ),
+    "src/util.ts": "export function util(value: string): string {\n  return value;\n}\n",
+    "src/removed.py": "def removed():\n    return None\n",
+    "src/old_name.js": "module.exports = function moved() {\n  return 1;\n};\n",
+    "README.md": "# Check\n\nA repository for checking kno indexes.\n",
+    "docs/guide.md": "# Guide\n\nNothing changes here.\n",
+    "build/out.js": "module.exports = 'built';\n",
+    "package-lock.json": '{"lockfileVersion": 3}\n',
+    "Makefile": "all:\n\techo all\n",
+}
+
+# The second commit; None deletes a file
+CHANGES = {
+    "src/app.py": (
+        "import os\n\n\n"
+        "def handler(event):\n    return os.path.join('b', event)\n\n\n"
+        "def added(event):\n    return handler(event) * 2\n"
+    ),
+    "src/removed.py": None,
+    "src/old_name.js": None,
+    "lib/new_name.js": "module.exports = function moved() {\n  return 1;\n};\n",
+    "src/new.py": "def new():\n    return 'new'\n",
+    "README.md": "# Check\n\nA repository for checking kno indexes, updated.\n",
+    "build/more.js": "module.exports = 'built again';\n",
+    "node_modules/dep/index.js": "module.exports = {};\n",
+    "yarn.lock": "# yarn lockfile v1\n",
+}
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def write_files(repo, files):
+    for relpath, content in files.items():
+        path = repo / relpath
+        if content is None:
+            path.unlink()
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def make_repo(repo):
+    """Write the repository and return the shas of its two commits."""
+    repo.mkdir(parents=True)
+    git(repo, "init", "-q")
+    git(repo, "config", "user.email", "check@example.com")
+    git(repo, "config", "user.name", "check")
+    shas = []
+    for files in (BASE_FILES, CHANGES):
+        write_files(repo, files)
+        git(repo, "add", "-A")
+        git(repo, "commit", "-q", "-m", f"Commit {len(shas) + 1}")
+        shas.append(git(repo, "rev-parse", "HEAD"))
+    return shas
+
+
+def checkout(origin, path, sha):
+    """Clone the repository at a commit, the way workflows check it out."""
+    subprocess.run(
+        ["git", "clone", "-q", str(origin), str(path)], capture_output=True, check=True
+    )
+    git(path, "checkout", "-q", "--detach", sha)
+    return path
+
+
+def chunks(index, checkouts):
+    """The (source, chunk) pairs of an index.
+
+    Line chunks start with the path of the file in the checkout it was
+    indexed in, which differs between clones, so checkout paths are replaced
+    with a placeholder.
+    """
+    stored = index.vector_store._collection.get(include=["documents", "metadatas"])
+    result = Counter()
+    for meta, document in zip(stored["metadatas"], stored["documents"]):
+        for checkout_path in checkouts:
+            document = document.replace(str(checkout_path), "<checkout>")
+        result[(meta["source"], document)] += 1
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--embedding",
+        default=EmbeddingMethod.SBERT.value,
+        choices=[method.value for method in EmbeddingMethod],
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the temporary directory"
+    )
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="kno-index-cache-check-"))
+    try:
+        base_sha, sha = make_repo(root / "origin")
+        cache = KnoIndexCache(cache_dir=root / "cache", embedding=args.embedding)
+
+        base_repo = checkout(root / "origin", root / "base" / "repo", base_sha)
+        repo = checkout(root / "origin", root / "incremental" / "repo", sha)
+        full_repo = checkout(root / "origin", root / "full" / "repo", sha)
+        checkouts = [base_repo, repo, full_repo]
+
+        cache.get_index(base_repo, REPO_KEY)
+        base = cache._base_entry(repo, REPO_KEY, sha)
+        if base is None or base["sha"] != base_sha:
+            print("The first commit's index was not cached")
+            sys.exit(1)
+        incremental = chunks(cache.get_index(repo, REPO_KEY), checkouts)
+
+        full = chunks(index_repo(full_repo, EmbeddingMethod(args.embedding)), checkouts)
+
+        print(f"{sum(full.values())} chunks in {len({s for s, _ in full})} files")
+        if incremental == full:
+            print("The updated index matches index_repo")
+            return
+        for label, difference in (
+            ("only in the updated index", incremental - full),
+            ("only in index_repo", full - incremental),
+        ):
+            for source, document in sorted(difference):
+                print(f"{label}: {source}: {document[:60]!r}")
+        sys.exit(1)
+    finally:
+        if args.keep:
+            print(f"Kept {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Tests for the heuristic repository classification.
+
+Run from the orca-agent directory:
+
+    python -m pytest tests/test_preclassifier.py
+"""
+
+import json
+
+from src.workflows.repoClassifier.preclassifier import (
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    preclassify,
+)
+
+
+def classify(files):
+    """Preclassify a checkout given as a dict of path to content."""
+    return preclassify(list(files), files.get)
+
+
+def confident(classification):
+    return classification.confidence >= DEFAULT_CONFIDENCE_THRESHOLD
+
+
+def package_json(**fields):
+    return json.dumps({"name": "package", "version": "1.0.0", **fields})
+
+
+def test_python_library_using_click_is_not_a_confident_cli_tool():
+    repo_type = classify(
+        {
+            "requirements.txt": "click>=8\nrequests\n",
+            "setup.py": "from setuptools import setup\nsetup(name='lib')\n",
+            "lib/__init__.py": "import click\n",
+            "lib/core.py": "",
+        }
+    )["repo_type"]
+
+    assert not confident(repo_type)
+
+
+def test_react_component_library_is_a_library():
+    repo_type = classify(
+        {
+            "package.json": package_json(
+                peerDependencies={"react": "^18", "react-dom": "^18"},
+                devDependencies={"react": "^18", "@storybook/react": "^8"},
+            ),
+            "src/Button.tsx": "",
+            "src/index.ts": "",
+        }
+    )["repo_type"]
+
+    assert repo_type.value == "library"
+    assert "web_app" not in " ".join(repo_type.evidence)
+
+
+def test_description_mentioning_a_framework_is_not_a_dependency():
+    repo_type = classify(
+        {
+            "package.json": package_json(
+                description="Runs the next job in the queue",
+                scripts={"start": "node next.js"},
+                dependencies={"lodash": "^4"},
+            ),
+            "index.js": "",
+        }
+    )["repo_type"]
+
+    assert repo_type.value != "web_app"
+    assert not confident(repo_type)
+
+
+def test_framework_dependency_alone_is_not_confident():
+    repo_type = classify(
+        {
+            "pyproject.toml": '[project]\nname = "lib"\ndependencies = ["flask"]\n',
+            "lib/extension.py": "",
+        }
+    )["repo_type"]
+
+    assert repo_type.value == "api_service"
+    assert not confident(repo_type)
+
+
+def test_next_app_with_pages_is_a_web_app():
+    repo_type = classify(
+        {
+            "package.json": package_json(dependencies={"next": "14", "react": "18"}),
+            "pages/index.tsx": "",
+            "next.config.js": "",
+        }
+    )["repo_type"]
+
+    assert repo_type.value == "web_app"
+    assert confident(repo_type)
+
+
+def test_flask_app_with_entrypoint_is_an_api_service():
+    repo_type = classify(
+        {
+            "requirements.txt": "Flask==3.0\ngunicorn\n",
+            "app.py": "",
+        }
+    )["repo_type"]
+
+    assert repo_type.value == "api_service"
+    assert confident(repo_type)
+
+
+def test_click_tool_with_scripts_is_a_cli_tool():
+    repo_type = classify(
+        {
+            "pyproject.toml": (
+                '[project]\nname = "tool"\ndependencies = ["click"]\n\n'
+                '[project.scripts]\ntool = "tool.cli:main"\n'
+            ),
+            "tool/cli.py": "",
+        }
+    )["repo_type"]
+
+    assert repo_type.value == "cli_tool"
+    assert confident(repo_type)
+
+
+def test_go_module_dependencies_match_by_path():
+    repo_type = classify(
+        {
+            "go.mod": (
+                "module example.com/service\n\n"
+                "require (\n\tgithub.com/gin-gonic/gin v1.9.1\n)\n"
+            ),
+            "main.go": "",
+        }
+    )["repo_type"]
+
+    assert repo_type.value == "api_service"
+    assert confident(repo_type)
@@ -0,0 +1,26 @@
+"""LLM client setup for the planner."""
+
+import importlib
+
+from prometheus_swarm.clients import setup_client as _setup_client
+from prometheus_swarm.clients.base_client import Client
+
+# Tool groups defined by the planner on top of the framework's tools
+PLANNER_TOOL_GROUPS = ["planner_operations"]
+
+
+def setup_client(client: str, model: str = None) -> Client:
+    """Configure and return an LLM client with the planner's tools.
+
+    Args:
+        client: The client type to use ("openai", "anthropic", "xai", etc.)
+        model: Optional model to use (overrides client's default model)
+
+    Returns:
+        Client: Configured client instance with tools loaded
+    """
+    client = _setup_client(client, model)
+    for group in PLANNER_TOOL_GROUPS:
+        definitions = importlib.import_module(f"src.tools.{group}.definitions")
+        client.tools.update(definitions.DEFINITIONS)
+    return client
@@ -2,12 +2,13 @@ from src.server.create_app import create_app
 import os
 from flask import request, jsonify
 from prometheus_swarm.utils.logging import logger
-from prometheus_swarm.clients import setup_client
+from src.clients import setup_client
 from src.workflows.todocreator.workflow import TodoCreatorWorkflow
 from src.workflows.todocreator.prompts import PROMPTS
+from src.workflows.todocreator.utils import ensure_indexes
 from prometheus_swarm.utils.logging import log_error
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor
+from src.server.plan_queue import PlanQueue
 
 # from src.workflows.audit.workflow import AuditWorkflow
 # from src.workflows.audit.prompts import PROMPTS as AUDIT_PROMPTS
@@ -17,7 +18,9 @@ from concurrent.futures import ThreadPoolExecutor
 load_dotenv()
 
 app = create_app()
-executor = ThreadPoolExecutor(max_workers=2)
+
+if not ensure_indexes():
+    logger.warning("MongoDB indexes not created on startup, retrying on first use")
 
 
 def audit_issues_and_tasks(future):
@@ -58,7 +61,9 @@ def audit_issues_and_tasks(future):
     pass
 
 
-def create_todos(source_url: str, fork_url: str, issue_spec: dict, bounty_id: str):
+def create_todos(
+    source_url: str, fork_url: str, issue_spec: dict, bounty_id: str, checkpoint=None
+):
     """Run the workflow in a background thread"""
     try:
         workflow = TodoCreatorWorkflow(
@@ -69,7 +74,7 @@ def create_todos(source_url: str, fork_url: str, issue_spec: dict, bounty_id: st
             issue_spec=issue_spec,
             bounty_id=bounty_id,
         )
-        result = workflow.run()
+        result = workflow.run(checkpoint=checkpoint)
         if not result or not result.get("success"):
             log_error(
                 Exception(result.get("error", "No result")), "Task creation failed"
@@ -91,6 +96,20 @@ def create_todos(source_url: str, fork_url: str, issue_spec: dict, bounty_id: st
         return {"success": False, "error": str(e)}
 
 
+def run_plan_job(job: dict, checkpoint):
+    return create_todos(
+        source_url=job["sourceUrl"],
+        fork_url=job["forkUrl"],
+        issue_spec=job["issueSpec"],
+        bounty_id=job["bountyId"],
+        checkpoint=checkpoint,
+    )
+
+
+plan_queue = PlanQueue(run_plan_job)
+plan_queue.start()
+
+
 @app.post("/create-plan")
 def create_plan():
     try:
@@ -105,18 +124,30 @@ def create_plan():
         if any(data.get(field) is None for field in required_fields):
             return jsonify({"error": "Missing data"}), 401
 
-        # Submit task to background executor
-        future = executor.submit(
-            create_todos,
+        # Queue the plan; a bounty that already has a plan job gets that job
+        job, queued = plan_queue.submit(
+            bounty_id=data["bountyId"],
             source_url=data["sourceUrl"],
             fork_url=data["forkUrl"],
             issue_spec=data["issueSpec"],
-            bounty_id=data["bountyId"],
         )
-        future.add_done_callback(audit_issues_and_tasks)
+        if not queued:
+            return jsonify(
+                {
+                    "success": True,
+                    "message": f"Plan already {job['status']}",
+                    "job": job,
+                }
+            )
 
         return (
-            jsonify({"success": True, "message": "Task submitted for processing"}),
+            jsonify(
+                {
+                    "success": True,
+                    "message": "Task submitted for processing",
+                    "job": job,
+                }
+            ),
             202,
         )  # 202 Accepted indicates the request was accepted for processing
     except Exception as e:
@@ -124,6 +155,20 @@ def create_plan():
         return jsonify({"error": str(e)}), 500
 
 
+@app.get("/plan-jobs/<bounty_id>")
+def get_plan_job(bounty_id):
+    """Status and progress of the plan job of a bounty."""
+    try:
+        job = plan_queue.get(bounty_id)
+        if job is None:
+            return jsonify({"error": "Plan job not found"}), 404
+        return jsonify({"success": True, "job": job})
+    except Exception as e:
+        logger.error(f"Failed to get plan job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    # The reloader's parent process would run plan jobs too
+    app.run(host="0.0.0.0", port=port, debug=True, use_reloader=False)
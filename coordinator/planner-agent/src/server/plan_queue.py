@@ -0,0 +1,306 @@
+"""Durable queue of plan jobs, stored in MongoDB."""
+
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Callable, Optional, Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from prometheus_swarm.utils.logging import log_error, log_key_value
+from src.workflows.todocreator.utils import get_collection
+
+DEFAULT_WORKERS = 2
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_POLL_SECONDS = 5
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Fields left out of status responses; they are only needed to resume a job
+CHECKPOINT_FIELDS = {"issues": 0, "plans": 0}
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+def _jobs():
+    return get_collection("planjobs")
+
+
+class PlanCheckpoint:
+    """The generated issues and finished issue plans of a running job.
+
+    TodoCreatorWorkflow.run() reads these when a job is resumed, so issues
+    are not generated again and finished issues are not planned again, and
+    saves them as they are produced. Writes only apply while this process
+    holds the job's lease.
+    """
+
+    def __init__(self, job: dict, owner: str):
+        self.bounty_id = job["bountyId"]
+        self.owner = owner
+        self._issues = job.get("issues")
+        self._plans = job.get("plans") or {}
+
+    def _update(self, update: dict):
+        update.setdefault("$set", {})["updatedAt"] = datetime.utcnow()
+        result = _jobs().update_one(
+            {"bountyId": self.bounty_id, "owner": self.owner}, update
+        )
+        if not result.matched_count:
+            log_key_value("Plan job lease lost", self.bounty_id)
+
+    def issues(self) -> Optional[list]:
+        """Get the saved issues, or None if they haven't been generated yet."""
+        return self._issues
+
+    def save_issues(self, issues: list):
+        self._issues = issues
+        self._update({"$set": {"issues": issues, "progress.issuesTotal": len(issues)}})
+
+    def plans(self) -> dict:
+        """Get the saved plan_tasks results by issue UUID."""
+        return dict(self._plans)
+
+    def save_plan(self, issue_uuid: str, plan_result: dict):
+        """Save the plan_tasks result of an issue. Safe to call from any thread."""
+        self._update(
+            {
+                "$set": {f"plans.{issue_uuid}": plan_result},
+                "$inc": {
+                    "progress.issuesDone": 1,
+                    "progress.tasksDone": len(plan_result["data"]["tasks"]),
+                },
+            }
+        )
+
+
+class PlanQueue:
+    """Plan jobs stored in MongoDB and run by a pool of worker threads.
+
+    There is one job per bounty: submitting a bounty again returns the
+    existing job, unless it failed, in which case it is queued again and
+    resumes from its checkpoint. A running job holds a lease that is
+    renewed while it runs; jobs whose lease expired because their process
+    died are picked up again by any queue, also resuming from the
+    checkpoint. Jobs are given up after PLANNER_JOB_MAX_ATTEMPTS tries.
+
+    Settings come from environment variables: PLANNER_JOB_WORKERS,
+    PLANNER_JOB_LEASE_SECONDS, PLANNER_JOB_POLL_SECONDS and
+    PLANNER_JOB_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, run_job: Callable[[dict, PlanCheckpoint], dict]):
+        """Initialize the queue.
+
+        Args:
+            run_job: Runs a job document with its checkpoint and returns a
+                result with "success" and, on failure, "error"
+        """
+        self.run_job = run_job
+        self.workers = int(os.environ.get("PLANNER_JOB_WORKERS", DEFAULT_WORKERS))
+        self.lease_seconds = float(
+            os.environ.get("PLANNER_JOB_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+        )
+        self.poll_seconds = float(
+            os.environ.get("PLANNER_JOB_POLL_SECONDS", DEFAULT_POLL_SECONDS)
+        )
+        self.max_attempts = int(
+            os.environ.get("PLANNER_JOB_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+        )
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads and the lease heartbeat."""
+        for i in range(self.workers):
+            self._threads.append(
+                threading.Thread(target=self._work, name=f"plan-job-{i}", daemon=True)
+            )
+        self._threads.append(
+            threading.Thread(target=self._heartbeat, name="plan-lease", daemon=True)
+        )
+        for thread in self._threads:
+            thread.start()
+        log_key_value("Plan job workers", self.workers)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def submit(
+        self, bounty_id: str, source_url: str, fork_url: str, issue_spec
+    ) -> Tuple[dict, bool]:
+        """Queue a plan job for a bounty.
+
+        Returns:
+            Tuple[dict, bool]: The job, and whether it was queued by this call
+        """
+        now = datetime.utcnow()
+        job = {
+            "bountyId": bounty_id,
+            "sourceUrl": source_url,
+            "forkUrl": fork_url,
+            "issueSpec": issue_spec,
+            "status": JobStatus.QUEUED.value,
+            "attempts": 0,
+            "progress": {"issuesTotal": None, "issuesDone": 0, "tasksDone": 0},
+            "error": None,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        try:
+            _jobs().insert_one(job)
+            queued = True
+        except DuplicateKeyError:
+            # A failed job is resumed; any other one is left alone
+            job = _jobs().find_one_and_update(
+                {"bountyId": bounty_id, "status": JobStatus.FAILED.value},
+                {
+                    "$set": {
+                        "status": JobStatus.QUEUED.value,
+                        "attempts": 0,
+                        "error": None,
+                        "updatedAt": now,
+                    }
+                },
+                projection=CHECKPOINT_FIELDS,
+                return_document=ReturnDocument.AFTER,
+            )
+            queued = job is not None
+            if not queued:
+                job = self.get(bounty_id)
+
+        if queued:
+            self._wake.set()
+        job.pop("_id", None)
+        return job, queued
+
+    def get(self, bounty_id: str) -> Optional[dict]:
+        """Get the status and progress of a bounty's job."""
+        return _jobs().find_one(
+            {"bountyId": bounty_id}, {"_id": 0, **CHECKPOINT_FIELDS}
+        )
+
+    def _claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return _jobs().find_one_and_update(
+            {
+                "$or": [
+                    {"status": JobStatus.QUEUED.value},
+                    {
+                        "status": JobStatus.RUNNING.value,
+                        "leaseExpiresAt": {"$lt": now},
+                    },
+                ]
+            },
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING.value,
+                    "owner": self.owner,
+                    "leaseExpiresAt": now + timedelta(seconds=self.lease_seconds),
+                    "startedAt": now,
+                    "updatedAt": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("createdAt", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _finish(self, bounty_id: str, status: JobStatus, error: Optional[str] = None):
+        update = {
+            "$set": {
+                "status": status.value,
+                "error": error,
+                "finishedAt": datetime.utcnow(),
+                "updatedAt": datetime.utcnow(),
+            },
+            "$unset": {"leaseExpiresAt": ""},
+        }
+        if status == JobStatus.COMPLETED:
+            # The plan is saved; the checkpoint is no longer needed
+            update["$unset"].update({"issues": "", "plans": ""})
+        _jobs().update_one({"bountyId": bounty_id, "owner": self.owner}, update)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except PyMongoError as e:
+                log_error(e, "Failed to claim plan job")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+
+            try:
+                self._process(job)
+            except PyMongoError as e:
+                log_error(e, f"Failed to update plan job {job['bountyId']}")
+
+    def _process(self, job: dict):
+        bounty_id = job["bountyId"]
+        if job["attempts"] > self.max_attempts:
+            self._finish(
+                bounty_id,
+                JobStatus.FAILED,
+                f"Gave up after {self.max_attempts} attempts",
+            )
+            return
+
+        log_key_value("Running plan job", f"{bounty_id} (attempt {job['attempts']})")
+        with self._running_lock:
+            self._running.add(bounty_id)
+        try:
+            result = self.run_job(job, PlanCheckpoint(job, self.owner))
+        except Exception as e:
+            log_error(e, f"Plan job {bounty_id} failed")
+            result = {"success": False, "error": str(e)}
+        finally:
+            with self._running_lock:
+                self._running.discard(bounty_id)
+
+        if result and result.get("success"):
+            self._finish(bounty_id, JobStatus.COMPLETED)
+        else:
+            self._finish(
+                bounty_id,
+                JobStatus.FAILED,
+                (result or {}).get("error") or "No result",
+            )
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._running_lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                _jobs().update_many(
+                    {
+                        "bountyId": {"$in": running},
+                        "owner": self.owner,
+                        "status": JobStatus.RUNNING.value,
+                    },
+                    {
+                        "$set": {
+                            "leaseExpiresAt": datetime.utcnow()
+                            + timedelta(seconds=self.lease_seconds)
+                        }
+                    },
+                )
+            except PyMongoError as e:
+                log_error(e, "Failed to renew plan job leases")
@@ -0,0 +1,37 @@
+from src.tools.planner_operations.implementations import create_dependency_graph
+
+DEFINITIONS = {
+    "create_dependency_graph": {
+        "name": "create_dependency_graph",
+        "description": "Create the task dependencies for all given tasks at once.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "dependencies": {
+                    "type": "array",
+                    "description": "One entry for every task to link",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "task_uuid": {
+                                "type": "string",
+                                "description": "UUID of the task",
+                            },
+                            "dependency_tasks": {
+                                "type": "array",
+                                "description": "UUIDs of the tasks this task depends on",
+                                "items": {"type": "string"},
+                            },
+                        },
+                        "required": ["task_uuid", "dependency_tasks"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["dependencies"],
+            "additionalProperties": False,
+        },
+        "final_tool": True,
+        "function": create_dependency_graph,
+    },
+}
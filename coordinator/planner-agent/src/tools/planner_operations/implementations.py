@@ -0,0 +1,36 @@
+"""Planner tools that are not part of the framework."""
+
+from typing import Any, Dict, List
+
+
+def create_dependency_graph(dependencies: List[Dict[str, Any]], **kwargs) -> dict:
+    """Create the task dependencies for a set of tasks at once.
+
+    Args:
+        dependencies: List of dictionaries, each containing:
+            - task_uuid: UUID of the task
+            - dependency_tasks: List of UUIDs of the tasks it depends on
+
+    Returns:
+        dict: Result of the operation containing:
+            - success: Whether the operation succeeded
+            - message: Success/error message
+            - data: Dictionary of task UUID to list of dependency task UUIDs
+    """
+    try:
+        graph = {
+            entry["task_uuid"]: list(entry.get("dependency_tasks") or [])
+            for entry in dependencies
+        }
+        return {
+            "success": True,
+            "message": f"Successfully created dependencies for {len(graph)} tasks",
+            "data": graph,
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": f"Failed to create dependency graph: {str(e)}",
+            "data": None,
+        }
@@ -6,7 +6,7 @@ import argparse
 from dotenv import load_dotenv
 from src.workflows.todocreator.workflow import TodoCreatorWorkflow
 from src.workflows.todocreator.prompts import PROMPTS
-from prometheus_swarm.clients import setup_client
+from src.clients import setup_client
 
 # Load environment variables
 load_dotenv()
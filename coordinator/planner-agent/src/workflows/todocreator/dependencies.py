@@ -0,0 +1,112 @@
+"""Validation of task dependency graphs."""
+
+from typing import Dict, List, Set, Tuple
+
+
+def find_cycles(graph: Dict[str, List[str]]) -> Set[str]:
+    """Get the tasks that are part of a dependency cycle.
+
+    Args:
+        graph: Task UUID to the UUIDs it depends on. Dependencies that are not
+            keys of the graph are ignored.
+
+    Returns:
+        Set[str]: UUIDs of the tasks on a cycle
+    """
+    # Iterative Tarjan's strongly connected components
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    cyclic = set()
+    counter = 0
+
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, dependencies = work[-1]
+            for dependency in dependencies:
+                if dependency not in graph:
+                    continue
+                if dependency not in index:
+                    index[dependency] = lowlink[dependency] = counter
+                    counter += 1
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+                    work.append((dependency, iter(graph[dependency])))
+                    break
+                if dependency in on_stack:
+                    lowlink[node] = min(lowlink[node], index[dependency])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph[node]:
+                        cyclic.update(component)
+    return cyclic
+
+
+def validate_dependency_graph(
+    task_uuids: List[str], graph: Dict[str, List[str]]
+) -> Tuple[Dict[str, List[str]], Set[str]]:
+    """Check a dependency graph for missing tasks, dangling UUIDs and cycles.
+
+    Args:
+        task_uuids: UUIDs of all tasks of the issue
+        graph: Task UUID to the UUIDs it depends on, as produced by the model
+
+    Returns:
+        Tuple[Dict[str, List[str]], Set[str]]: The graph restricted to the
+        given tasks, and the UUIDs of the tasks whose dependencies are
+        missing, point to unknown tasks or form a cycle
+    """
+    known = set(task_uuids)
+    graph = {
+        task_uuid: list(dict.fromkeys(graph[task_uuid]))
+        for task_uuid in task_uuids
+        if isinstance(graph.get(task_uuid), list)
+    }
+
+    invalid = known - set(graph)
+    for task_uuid, dependencies in graph.items():
+        if any(dependency not in known for dependency in dependencies):
+            invalid.add(task_uuid)
+    invalid |= find_cycles(graph)
+    return graph, invalid
+
+
+def break_invalid_dependencies(
+    task_uuids: List[str], graph: Dict[str, List[str]]
+) -> Dict[str, List[str]]:
+    """Make a dependency graph valid by dropping what can't be trusted.
+
+    Unknown dependencies are removed, and tasks still on a cycle lose their
+    dependencies.
+    """
+    known = set(task_uuids)
+    graph = {
+        task_uuid: [
+            dependency
+            for dependency in graph.get(task_uuid) or []
+            if dependency in known and dependency != task_uuid
+        ]
+        for task_uuid in task_uuids
+    }
+    for task_uuid in find_cycles(graph):
+        graph[task_uuid] = []
+    return graph
@@ -1,16 +1,50 @@
 from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
+import threading
 
 load_dotenv()
 
+DEFAULT_MAX_POOL_SIZE = 10
+DEFAULT_SERVER_SELECTION_TIMEOUT_MS = 10000
+
 
 class MongoConnection:
-    def __init__(self, mongo_uri: str = os.getenv("MONGODB_URI")):
-        self.client = MongoClient(mongo_uri)
+    """MongoDB client that is only created when it is first used.
+
+    Importing modules that hold a MongoConnection therefore doesn't need a
+    reachable server. Pool settings come from the MONGODB_MAX_POOL_SIZE and
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS env vars.
+    """
+
+    def __init__(self, mongo_uri: str = None):
+        self.mongo_uri = mongo_uri
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> MongoClient:
+        with self._lock:
+            if self._client is None:
+                self._client = MongoClient(
+                    self.mongo_uri or os.getenv("MONGODB_URI"),
+                    maxPoolSize=int(
+                        os.getenv("MONGODB_MAX_POOL_SIZE", DEFAULT_MAX_POOL_SIZE)
+                    ),
+                    serverSelectionTimeoutMS=int(
+                        os.getenv(
+                            "MONGODB_SERVER_SELECTION_TIMEOUT_MS",
+                            DEFAULT_SERVER_SELECTION_TIMEOUT_MS,
+                        )
+                    ),
+                )
+            return self._client
 
     def get_database(self, db_name: str):
         return self.client[db_name]
 
     def close(self):
-        self.client.close()
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
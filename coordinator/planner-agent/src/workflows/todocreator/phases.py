@@ -57,6 +57,20 @@ class TaskRegenerationPhase(WorkflowPhase):
         )
 
 
+class TaskDependencyGraphPhase(WorkflowPhase):
+    def __init__(self, workflow: Workflow, conversation_id: str = None):
+        super().__init__(
+            workflow=workflow,
+            prompt_name="dependency_graph",
+            available_tools=[
+                "read_file",
+                "create_dependency_graph",
+            ],
+            conversation_id=conversation_id,
+            name="Task Dependency Graph",
+        )
+
+
 # TODO: Implement Task Dependency Phase
 class TaskDependencyPhase(WorkflowPhase):
     def __init__(self, workflow: Workflow, conversation_id: str = None):
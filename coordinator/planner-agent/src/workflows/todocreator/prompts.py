@@ -89,6 +89,16 @@ PROMPTS = {
         "- Performance: [Measurable performance criteria if applicable]\n"
         "---\n"
     ),
+    "dependency_graph": (
+        "Review the following subtasks and determine which of them depend on other subtasks.\n"
+        "Subtasks:\n{subtasks}\n\n"
+        "Tasks to link:\n{target_tasks}\n\n"
+        "For every task to link, list the UUIDs of the subtasks that must be completed before it.\n"
+        "Only use UUIDs from the subtasks list. A task must not depend on itself, "
+        "and the dependencies must not form a cycle.\n"
+        "Use an empty list for tasks without dependencies.\n"
+        "Call create_dependency_graph once with an entry for every task to link.\n"
+    ),
     "dependency_tasks": (
         "Review the following given target task and determine if it depends on any other tasks.\n"
         "TargetTask: {target_task}\n"
@@ -1,16 +1,84 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Iterator, List, Optional
+import threading
 import uuid
 from datetime import datetime
-from pymongo.errors import ConnectionFailure, PyMongoError
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import ConnectionFailure, OperationFailure, PyMongoError
 from .mongo_connection import MongoConnection
 from enum import Enum
 
+DB_NAME = "builder247"
+DEFAULT_PAGE_SIZE = 500
+
+# Indexes for the lookups the middle server and the task queries below make.
+# The todo lookups by bounty or issue are paginated by uuid, so their indexes
+# end in uuid. uuid is unique, so that writing a plan again (see PlanBatch)
+# can't duplicate it. The systemprompts index matches the unique index from
+# the middle server's schema.
+INDEXES = {
+    "todos": [
+        ("uuid", {"unique": True}),
+        ([("bountyId", ASCENDING), ("uuid", ASCENDING)], {}),
+        ([("issueUuid", ASCENDING), ("uuid", ASCENDING)], {}),
+    ],
+    "issues": [("uuid", {"unique": True}), ("bountyId", {})],
+    "systemprompts": [("bountyId", {"unique": True})],
+    # Plan job queue of the planner server: one job per bounty, claimed
+    # oldest first by status
+    "planjobs": [
+        ("bountyId", {"unique": True}),
+        ([("status", ASCENDING), ("createdAt", ASCENDING)], {}),
+    ],
+}
+
+# Fields returned by the task queries unless a projection is given
+TASK_SUMMARY_PROJECTION = {"_id": 0, "uuid": 1, "title": 1}
+
 mongo_conn = MongoConnection()
-db = mongo_conn.get_database("builder247")
-todos_collection = db["todos"]
-issues_collection = db["issues"]
-system_prompts_collection = db["systemprompts"]
+_indexes_created = False
+_indexes_lock = threading.Lock()
+
+
+def _ensure_indexes(db):
+    """Create the INDEXES once per process."""
+    global _indexes_created
+    with _indexes_lock:
+        if _indexes_created:
+            return
+        for collection_name, indexes in INDEXES.items():
+            for key, options in indexes:
+                try:
+                    db[collection_name].create_index(key, **options)
+                except OperationFailure as e:
+                    # An existing index with other options is good enough
+                    print(f"Could not create index {collection_name}.{key}: {e}")
+        _indexes_created = True
+
+
+def ensure_indexes() -> bool:
+    """Connect and create the INDEXES, e.g. on startup.
+
+    Returns:
+        bool: Whether MongoDB could be reached. If not, the indexes are
+        created on the first use of a collection instead.
+    """
+    try:
+        _ensure_indexes(mongo_conn.get_database(DB_NAME))
+        return True
+    except ConnectionFailure:
+        print("MongoDB connection failed")
+        return False
+    except PyMongoError as e:
+        print(f"MongoDB error: {e}")
+        return False
+
+
+def get_collection(name: str):
+    """Get a collection, connecting and creating indexes on first use."""
+    db = mongo_conn.get_database(DB_NAME)
+    _ensure_indexes(db)
+    return db[name]
 
 
 class TodoStatus(str, Enum):
@@ -131,7 +199,7 @@ class IssueModel(BaseModel):
 def insert_task_to_mongodb(task: TaskModel) -> bool:
     try:
         # Insert the task
-        result = todos_collection.insert_one(task.to_dict())
+        result = get_collection("todos").insert_one(task.to_dict())
 
         # Check if the insertion was successful
         return result.acknowledged
@@ -147,13 +215,93 @@ def insert_task_to_mongodb(task: TaskModel) -> bool:
         return False
 
 
-def get_all_tasks_title_uuid_from_mongodb() -> List[dict]:
+def _task_filter(bounty_id: Optional[str], issue_uuid: Optional[str]) -> dict:
+    if bounty_id is None and issue_uuid is None:
+        raise ValueError("A bounty ID or an issue UUID is required")
+    query = {}
+    if bounty_id is not None:
+        query["bountyId"] = bounty_id
+    if issue_uuid is not None:
+        query["issueUuid"] = issue_uuid
+    return query
+
+
+def iter_tasks(
+    bounty_id: Optional[str] = None,
+    issue_uuid: Optional[str] = None,
+    projection: Optional[dict] = None,
+    batch_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[dict]:
+    """Stream the tasks of a bounty or an issue, ordered by UUID.
+
+    Tasks are fetched from the server batch_size at a time as the iterator
+    is consumed, so memory use doesn't grow with the number of tasks.
+
+    Args:
+        bounty_id: Only tasks of this bounty
+        issue_uuid: Only tasks of this issue
+        projection: Fields to return. Defaults to TASK_SUMMARY_PROJECTION.
+        batch_size: Tasks per round trip to the server
+
+    Returns:
+        Iterator[dict]: Task documents
+    """
+    cursor = (
+        get_collection("todos")
+        .find(
+            _task_filter(bounty_id, issue_uuid),
+            projection or TASK_SUMMARY_PROJECTION,
+        )
+        .sort("uuid", ASCENDING)
+        .batch_size(batch_size)
+    )
     try:
-        # Get all tasks from MongoDB
-        tasks = todos_collection.find({}, {"_id": 0, "title": 1, "uuid": 1})
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def get_tasks_page(
+    bounty_id: Optional[str] = None,
+    issue_uuid: Optional[str] = None,
+    after_uuid: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    projection: Optional[dict] = None,
+) -> List[dict]:
+    """Get one page of the tasks of a bounty or an issue, ordered by UUID.
+
+    Pages are keyed by the last UUID of the previous page rather than an
+    offset, so every page is a range scan on the index.
+
+    Args:
+        bounty_id: Only tasks of this bounty
+        issue_uuid: Only tasks of this issue
+        after_uuid: UUID of the last task of the previous page
+        limit: Maximum number of tasks in the page
+        projection: Fields to return, including uuid. Defaults to
+            TASK_SUMMARY_PROJECTION.
+
+    Returns:
+        List[dict]: Task documents, empty after the last page
+    """
+    query = _task_filter(bounty_id, issue_uuid)
+    if after_uuid is not None:
+        query["uuid"] = {"$gt": after_uuid}
+    return list(
+        get_collection("todos")
+        .find(query, projection or TASK_SUMMARY_PROJECTION)
+        .sort("uuid", ASCENDING)
+        .limit(limit)
+    )
 
-        # Convert cursor to list of dictionaries with only 'uuid' and 'title'
-        return [{"uuid": task["uuid"], "title": task["title"]} for task in tasks]
+
+def get_all_tasks_title_uuid_from_mongodb(bounty_id: str) -> List[dict]:
+    """Get the UUID and title of every task of a bounty."""
+    try:
+        return [
+            {"uuid": task["uuid"], "title": task["title"]}
+            for task in iter_tasks(bounty_id=bounty_id)
+        ]
     except Exception as e:
         print(f"An error occurred: {e}")
         return []
@@ -162,7 +310,7 @@ def get_all_tasks_title_uuid_from_mongodb() -> List[dict]:
 def insert_issue_to_mongodb(issue: IssueModel) -> bool:
     try:
         # Insert the issue
-        result = issues_collection.insert_one(issue.to_dict())
+        result = get_collection("issues").insert_one(issue.to_dict())
 
         # Check if the insertion was successful
         return result.acknowledged
@@ -196,7 +344,7 @@ def insert_system_prompt_to_mongodb(system_prompt: SystemPromptModel) -> bool:
     """Insert system prompt into MongoDB."""
     try:
         # Insert the system prompt
-        result = system_prompts_collection.insert_one(system_prompt.to_dict())
+        result = get_collection("systemprompts").insert_one(system_prompt.to_dict())
 
         # Check if the insertion was successful
         return result.acknowledged
@@ -211,6 +359,99 @@ def insert_system_prompt_to_mongodb(system_prompt: SystemPromptModel) -> bool:
         return False
 
 
+def _supports_transactions(client) -> bool:
+    """Transactions need a replica set member or mongos."""
+    try:
+        hello = client.admin.command("hello")
+    except Exception:
+        return False
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+
+class PlanBatch:
+    """The issues, todos and system prompt of a plan, written in one batch."""
+
+    def __init__(self):
+        self.issues: List[IssueModel] = []
+        self.tasks: List[TaskModel] = []
+        self.system_prompts: List[SystemPromptModel] = []
+
+    def add_issue(self, issue: IssueModel):
+        self.issues.append(issue)
+
+    def add_task(self, task: TaskModel):
+        self.tasks.append(task)
+
+    def add_system_prompt(self, system_prompt: SystemPromptModel):
+        self.system_prompts.append(system_prompt)
+
+    def _write(self, collections, session=None):
+        # Upserts that only insert, so that writing a batch again (e.g. a
+        # resumed plan job) leaves the documents of the first write as they
+        # are instead of duplicating them
+        for name, models in (("issues", self.issues), ("todos", self.tasks)):
+            if models:
+                collections[name].bulk_write(
+                    [
+                        UpdateOne(
+                            {"uuid": model.uuid},
+                            {"$setOnInsert": model.to_dict()},
+                            upsert=True,
+                        )
+                        for model in models
+                    ],
+                    ordered=True,
+                    session=session,
+                )
+        for system_prompt in self.system_prompts:
+            # Keep an existing prompt for the bounty, as a plain insert into
+            # the unique bountyId index would (but without failing the batch)
+            collections["systemprompts"].update_one(
+                {"bountyId": system_prompt.bountyId},
+                {"$setOnInsert": system_prompt.to_dict()},
+                upsert=True,
+                session=session,
+            )
+
+    def write(self) -> bool:
+        """Write the batch with one ordered bulk_write per collection.
+
+        Issues are written before todos, which are written before the system
+        prompt. Documents are inserted by uuid unless they exist, so writing
+        the same plan again doesn't duplicate it. When the server supports
+        transactions all of it is written in one transaction; otherwise
+        writing stops at the first error. The batch is emptied once it has
+        been written.
+
+        Returns:
+            bool: Whether everything was written
+        """
+        if not (self.issues or self.tasks or self.system_prompts):
+            return True
+        try:
+            collections = {
+                name: get_collection(name)
+                for name in ["issues", "todos", "systemprompts"]
+            }
+            client = mongo_conn.client
+            if _supports_transactions(client):
+                with client.start_session() as session:
+                    session.with_transaction(
+                        lambda session: self._write(collections, session)
+                    )
+            else:
+                self._write(collections)
+
+            self.issues, self.tasks, self.system_prompts = [], [], []
+            return True
+        except ConnectionFailure:
+            print("MongoDB connection failed")
+            return False
+        except PyMongoError as e:
+            print(f"MongoDB error: {e}")
+            return False
+
+
 if __name__ == "__main__":
     task = TaskModel(
         title="Test Task",
@@ -1,11 +1,17 @@
 """Task decomposition workflow implementation."""
 
+import copy
 import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from github import Github
 from prometheus_swarm.workflows.base import Workflow
 from prometheus_swarm.utils.logging import log_key_value, log_error
 from src.workflows.todocreator import phases
+from src.workflows.todocreator.dependencies import (
+    break_invalid_dependencies,
+    validate_dependency_graph,
+)
 from prometheus_swarm.workflows.utils import (
     check_required_env_vars,
     cleanup_repository,
@@ -15,13 +21,16 @@ from prometheus_swarm.workflows.utils import (
 )
 from src.workflows.todocreator.utils import (
     TaskModel,
-    insert_task_to_mongodb,
     IssueModel,
-    insert_issue_to_mongodb,
     SystemPromptModel,
-    insert_system_prompt_to_mongodb,
+    PlanBatch,
 )
 
+# Issues planned at the same time; 1 plans them one after another
+DEFAULT_ISSUE_WORKERS = 4
+# Tasks linked per dependency graph call
+DEFAULT_DEPENDENCY_CHUNK_SIZE = 30
+
 
 class Task:
     def __init__(self, title: str, description: str, acceptance_criteria: list[str]):
@@ -76,6 +85,8 @@ class TodoCreatorWorkflow(Workflow):
             bounty_id=bounty_id,
         )
         self.issue_spec = issue_spec
+        # Issues, todos and the system prompt, written together by run()
+        self.plan_batch = PlanBatch()
 
     def setup(self):
         """Set up repository and workspace."""
@@ -120,45 +131,82 @@ class TodoCreatorWorkflow(Workflow):
         # Make sure we're not in the repo directory before cleaning up
         cleanup_repository(self.original_dir, self.context.get("repo_path", ""))
 
-    def run(self):
-        generate_issues_result = self.generate_issues()
-        tasks = []
-        for issue in generate_issues_result["data"]["issues"]:
-            self.context["feature_spec"] = issue
-            task_result = self.generate_tasks(issue["uuid"])
-            if task_result:
-                tasks.append(task_result["data"]["tasks"])
-
-        # Generate a single system prompt for all issues and tasks
-        system_prompt_result = self.generate_system_prompts(
-            generate_issues_result["data"]["issues"], tasks
-        )
+    def run(self, checkpoint=None):
+        """Plan the issue spec and save the plan.
+
+        Args:
+            checkpoint: Optional store for the generated issues and the
+                finished issue plans (see src.server.plan_queue.PlanCheckpoint).
+                Work found in it is reused instead of being done again, and
+                new work is saved to it as it finishes.
+        """
+        # One workspace serves every issue: the planning phases only read the
+        # repository, so it is set up once and removed at the end
+        self.setup()
+        try:
+            issues = checkpoint.issues() if checkpoint else None
+            if issues is None:
+                generate_issues_result = self.generate_issues()
+                if not generate_issues_result or not generate_issues_result.get(
+                    "success"
+                ):
+                    return {
+                        "success": False,
+                        "message": "Issue generation failed",
+                        "error": "Issue generation failed",
+                        "data": None,
+                    }
+                issues = generate_issues_result["data"]["issues"]
+                if checkpoint:
+                    checkpoint.save_issues(issues)
+            else:
+                log_key_value("Resuming plan", f"{len(issues)} issues")
+                self.add_issues(issues)
+            plans = self.plan_issues(issues, checkpoint)
+
+            # Save in issue order, whatever order the plans finished in
+            tasks = []
+            for issue, plan in zip(issues, plans):
+                task_result = self.save_tasks(issue["uuid"], plan)
+                if task_result and task_result.get("success"):
+                    tasks.append(task_result["data"]["tasks"])
+
+            # Generate a single system prompt for all issues and tasks
+            system_prompt_result = self.generate_system_prompts(issues, tasks)
+
+            if not self.plan_batch.write():
+                return {
+                    "success": False,
+                    "message": "Failed to save the plan to MongoDB",
+                    "data": None,
+                }
 
-        return {
-            "success": True,
-            "message": "Issue generation workflow completed",
-            "data": {
-                "issues": generate_issues_result["data"]["issues"],
-                "tasks": [
-                    [task.to_dict() for task in task_list] for task_list in tasks
-                ],
-                "system_prompt": (
-                    system_prompt_result["data"]["prompt"]
-                    if system_prompt_result
-                    else None
-                ),
-                "issue_spec": self.issue_spec,
-                "repo_owner": self.context["repo_owner"],
-                "repo_name": self.context["repo_name"],
-            },
-        }
+            return {
+                "success": True,
+                "message": "Issue generation workflow completed",
+                "data": {
+                    "issues": issues,
+                    "tasks": [
+                        [task.to_dict() for task in task_list] for task_list in tasks
+                    ],
+                    "system_prompt": (
+                        system_prompt_result["data"]["prompt"]
+                        if system_prompt_result
+                        else None
+                    ),
+                    "issue_spec": self.issue_spec,
+                    "repo_owner": self.context["repo_owner"],
+                    "repo_name": self.context["repo_name"],
+                },
+            }
+        finally:
+            self.cleanup()
 
     def generate_issues(self):
-        """Execute the issue generation workflow."""
+        """Execute the issue generation workflow. Expects setup() to have run."""
 
         issues = []
         try:
-            self.setup()
             # ==================== Generate issues ====================
             generate_issues_phase = phases.IssueGenerationPhase(workflow=self)
             generate_issues_result = generate_issues_phase.execute()
@@ -170,23 +218,7 @@ class TodoCreatorWorkflow(Workflow):
                 )
                 return None
 
-            # TODO: save it to db
-            previous_issue_uuid = None
-            for issue in generate_issues_result["data"]["issues"]:
-                issue_model = IssueModel(
-                    title=issue["title"],
-                    description=issue["description"],
-                    repoOwner=self.context["repo_owner"],
-                    repoName=self.context["repo_name"],
-                    uuid=issue["uuid"],
-                    bountyId=self.context["bounty_id"],
-                    forkOwner=self.context["fork_owner"],
-                    forkUrl=self.context["fork_url"],
-                    predecessorUuid=previous_issue_uuid,
-                )
-                insert_issue_to_mongodb(issue_model)
-                previous_issue_uuid = issue["uuid"]
-                # print("Issue inserted to MongoDB")
+            self.add_issues(generate_issues_result["data"]["issues"])
             return generate_issues_result
         except Exception as e:
             log_error(e, "Issue generation workflow failed")
@@ -197,11 +229,77 @@ class TodoCreatorWorkflow(Workflow):
                 "data": {"issues": issues},
             }
 
+    def add_issues(self, issues):
+        """Add generated issues to the plan batch, each following the previous one."""
+        previous_issue_uuid = None
+        for issue in issues:
+            issue_model = IssueModel(
+                title=issue["title"],
+                description=issue["description"],
+                repoOwner=self.context["repo_owner"],
+                repoName=self.context["repo_name"],
+                uuid=issue["uuid"],
+                bountyId=self.context["bounty_id"],
+                forkOwner=self.context["fork_owner"],
+                forkUrl=self.context["fork_url"],
+                predecessorUuid=previous_issue_uuid,
+            )
+            self.plan_batch.add_issue(issue_model)
+            previous_issue_uuid = issue["uuid"]
+
+    def issue_workflow(self, issue) -> "TodoCreatorWorkflow":
+        """Get a copy of the workflow for planning one issue.
+
+        The copy shares the client and the repository, but has its own
+        context, so issues can be planned at the same time.
+        """
+        workflow = copy.copy(self)
+        workflow.context = {**self.context, "feature_spec": issue}
+        return workflow
+
+    def plan_issues(self, issues, checkpoint=None):
+        """Plan the tasks of every issue, PLANNER_ISSUE_WORKERS at a time.
+
+        Issues with a plan in the checkpoint are not planned again; new
+        successful plans are saved to it.
+
+        Returns:
+            list: plan_tasks results, in the order of issues
+        """
+        done = checkpoint.plans() if checkpoint else {}
+
+        def plan(issue):
+            if issue["uuid"] in done:
+                return done[issue["uuid"]]
+            plan_result = self.issue_workflow(issue).plan_tasks()
+            if checkpoint and plan_result and plan_result.get("success"):
+                checkpoint.save_plan(issue["uuid"], plan_result)
+            return plan_result
+
+        workers = min(
+            int(os.environ.get("PLANNER_ISSUE_WORKERS", DEFAULT_ISSUE_WORKERS)),
+            len(issues) - len(done),
+        )
+        if workers <= 1:
+            return [plan(issue) for issue in issues]
+
+        log_key_value("Planning issues concurrently", f"{workers} workers")
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="planner"
+        ) as executor:
+            return list(executor.map(plan, issues))
+
     def generate_tasks(self, issue_uuid):
-        """Execute the task decomposition workflow."""
-        tasks = []
+        """Plan and save the tasks of the issue in context["feature_spec"].
+
+        Expects setup() to have run.
+        """
+        return self.save_tasks(issue_uuid, self.plan_tasks())
+
+    def plan_tasks(self):
+        """Decompose the issue in context["feature_spec"] into validated tasks
+        with dependencies. Nothing is saved."""
         try:
-            self.setup()
             # ==================== Decompose feature into tasks ====================
             decompose_phase = phases.TaskDecompositionPhase(workflow=self)
             decomposition_result = decompose_phase.execute()
@@ -290,31 +388,101 @@ class TodoCreatorWorkflow(Workflow):
             # save the regenerated tasks in the context, prepare for the dependency phase
             self.context["subtasks"] = tasks_data
             # ==================== Dependency Phase ====================
-            # # TODO: Refine the Dependency Phase
+            self.link_dependencies(tasks_data)
+
+            return {
+                "success": True,
+                "data": {
+                    "tasks": tasks_data,
+                    "decisions": decisions,
+                    "task_count": task_count,
+                },
+            }
+
+        except Exception as e:
+            log_error(e, "Task decomposition workflow failed")
+            return {
+                "success": False,
+                "message": f"Task decomposition workflow failed: {str(e)}",
+                "data": None,
+            }
+
+    def link_dependencies(self, tasks_data):
+        """Set dependency_tasks on every task.
+
+        The whole dependency graph is created in one model call per
+        PLANNER_DEPENDENCY_CHUNK_SIZE tasks. Tasks whose dependencies are
+        missing, unknown or part of a cycle are asked for again one by one,
+        and whatever is still invalid after that is dropped.
+        """
+        task_uuids = [task["uuid"] for task in tasks_data]
+        chunk_size = int(
+            os.environ.get(
+                "PLANNER_DEPENDENCY_CHUNK_SIZE", DEFAULT_DEPENDENCY_CHUNK_SIZE
+            )
+        )
+
+        graph = {}
+        for start in range(0, len(tasks_data), chunk_size):
+            self.context["target_tasks"] = tasks_data[start : start + chunk_size]
+            dependency_phase = phases.TaskDependencyGraphPhase(workflow=self)
+            dependency_result = dependency_phase.execute()
+            if dependency_result is None or not dependency_result.get("success"):
+                log_error(
+                    Exception(
+                        dependency_result.get("error", "No result")
+                        if dependency_result
+                        else "No results returned from phase"
+                    ),
+                    "Task dependency graph failed, falling back to single tasks",
+                )
+                continue
+            graph.update(dependency_result["data"])
+
+        graph, invalid = validate_dependency_graph(task_uuids, graph)
+        if invalid:
+            log_key_value("Tasks with invalid dependencies", len(invalid))
             for task in tasks_data:
-                self.context["target_task"] = task
-                dependency_phase = phases.TaskDependencyPhase(workflow=self)
-                dependency_result = dependency_phase.execute()
-                if dependency_result is None or not dependency_result.get("success"):
-                    log_error(
-                        Exception(
-                            dependency_result.get("error", "No result")
-                            if dependency_result
-                            else "No results returned from phase"
-                        ),
-                        "Task dependency failed, continuing with empty dependencies",
-                    )
-                    task["dependency_tasks"] = []
-                    continue
-                # save the dependency tasks in the context, prepare for the MongoDB insertion phase
-                try:
-                    task["dependency_tasks"] = dependency_result["data"][task["uuid"]]
-                except Exception as e:
-                    log_error(e, "Task dependency failed for task: " + task["title"])
-                    task["dependency_tasks"] = []
+                if task["uuid"] in invalid:
+                    graph[task["uuid"]] = self.task_dependencies(task)
+
+        graph = break_invalid_dependencies(task_uuids, graph)
+        for task in tasks_data:
+            task["dependency_tasks"] = graph[task["uuid"]]
+
+    def task_dependencies(self, task):
+        """Get the dependencies of a single task, or [] if that fails."""
+        self.context["target_task"] = task
+        dependency_phase = phases.TaskDependencyPhase(workflow=self)
+        dependency_result = dependency_phase.execute()
+        if dependency_result is None or not dependency_result.get("success"):
+            log_error(
+                Exception(
+                    dependency_result.get("error", "No result")
+                    if dependency_result
+                    else "No results returned from phase"
+                ),
+                "Task dependency failed, continuing with empty dependencies",
+            )
+            return []
+        try:
+            return dependency_result["data"][task["uuid"]]
+        except Exception as e:
+            log_error(e, "Task dependency failed for task: " + task["title"])
+            return []
 
+    def save_tasks(self, issue_uuid, plan_result):
+        """Insert the approved tasks of a plan_tasks result into MongoDB."""
+        if not plan_result or not plan_result.get("success"):
+            return plan_result
+
+        tasks = []
+        tasks_data = plan_result["data"]["tasks"]
+        decisions = plan_result["data"]["decisions"]
+        task_count = plan_result["data"]["task_count"]
+        try:
             # ==================== MongoDB Insertion Phase ====================
-            # Insert into MongoDB
+            # Add to the plan batch, written to MongoDB by run()
             for task in tasks_data:
                 try:
                     # Check if task UUID exists in decisions and has a decision value
@@ -332,7 +500,7 @@ class TodoCreatorWorkflow(Workflow):
                             issueUuid=issue_uuid,
                             bountyId=self.context["bounty_id"],
                         )
-                        insert_task_to_mongodb(task_model)
+                        self.plan_batch.add_task(task_model)
                 except Exception as e:
                     log_error(
                         e,
@@ -355,8 +523,6 @@ class TodoCreatorWorkflow(Workflow):
                 "message": f"Task decomposition workflow failed: {str(e)}",
                 "data": None,
             }
-        finally:
-            self.cleanup()
 
     def generate_system_prompts(self, issues, tasks):
         """Execute the system prompt generation workflow."""
@@ -377,16 +543,16 @@ class TodoCreatorWorkflow(Workflow):
                 )
                 return None
 
-            # Insert system prompt into MongoDB
+            # Add system prompt to the plan batch
             try:
                 system_prompt_model = SystemPromptModel(
                     prompt=system_prompt_result["data"]["prompt"],
                     bountyId=self.context["bounty_id"],
                 )
-                insert_system_prompt_to_mongodb(system_prompt_model)
+                self.plan_batch.add_system_prompt(system_prompt_model)
             except Exception as e:
-                log_error(e, "Failed to insert system prompt into MongoDB")
-                # Continue even if MongoDB insertion fails
+                log_error(e, "Failed to add system prompt to the plan")
+                # Continue without the system prompt
                 pass
 
             return system_prompt_result
@@ -0,0 +1,251 @@
+"""Tests for PlanBatch and the lazy MongoDB connection, against mongomock.
+
+Run from the planner-agent directory:
+
+    python -m pytest tests/test_plan_batch.py
+"""
+
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+from src.workflows.todocreator import utils
+from src.workflows.todocreator.mongo_connection import MongoConnection
+
+
+@pytest.fixture(autouse=True)
+def mongomock_sort_compat(monkeypatch):
+    """Let mongomock take the sort argument pymongo 4.9+ passes to updates."""
+    add_update = BulkOperationBuilder.add_update
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    monkeypatch.setattr(BulkOperationBuilder, "add_update", add_update_without_sort)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A mongomock client behind the module's MongoConnection."""
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(utils, "mongo_conn", MongoConnection())
+    utils.mongo_conn._client = client
+    monkeypatch.setattr(utils, "_indexes_created", False)
+    return client
+
+
+@pytest.fixture
+def db(client):
+    return client[utils.DB_NAME]
+
+
+class FakeSession:
+    """A session whose with_transaction runs the callback like the server
+    would, undoing its writes when it raises."""
+
+    def __init__(self, db):
+        self.db = db
+        self.transactions = 0
+        self.aborted = 0
+        # Collections written in this session
+        self.writes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def with_transaction(self, callback):
+        self.transactions += 1
+        before = {
+            name: {doc["_id"] for doc in self.db[name].find({}, {"_id": 1})}
+            for name in ["issues", "todos", "systemprompts"]
+        }
+        try:
+            return callback(self)
+        except Exception:
+            self.aborted += 1
+            for name, ids in before.items():
+                self.db[name].delete_many({"_id": {"$nin": list(ids)}})
+            raise
+
+
+@pytest.fixture
+def session(client, db, monkeypatch):
+    """Run writes in FakeSession transactions."""
+    session = FakeSession(db)
+    monkeypatch.setattr(utils, "_supports_transactions", lambda client: True)
+    monkeypatch.setattr(client, "start_session", lambda: session, raising=False)
+
+    # mongomock refuses sessions, so record them and write without one
+    collection_class = type(db.todos)
+    for method in ["bulk_write", "update_one"]:
+        write = getattr(collection_class, method)
+
+        def write_in_session(self, *args, session=None, _write=write, **kwargs):
+            if session is not None:
+                session.writes.append(self.name)
+            return _write(self, *args, **kwargs)
+
+        monkeypatch.setattr(collection_class, method, write_in_session)
+    return session
+
+
+def make_batch(issue_count=2, tasks_per_issue=3):
+    batch = utils.PlanBatch()
+    for i in range(issue_count):
+        issue = utils.IssueModel(
+            uuid=f"issue-{i}",
+            title=f"Issue {i}",
+            description="Description",
+            forkOwner="fork-owner",
+            forkUrl="https://github.com/fork-owner/repo",
+            repoOwner="owner",
+            repoName="repo",
+            bountyId="bounty",
+        )
+        batch.add_issue(issue)
+        for j in range(tasks_per_issue):
+            batch.add_task(
+                utils.TaskModel(
+                    uuid=f"task-{i}-{j}",
+                    title=f"Task {i}.{j}",
+                    description="Description",
+                    acceptanceCriteria="Criteria",
+                    repoOwner="owner",
+                    repoName="repo",
+                    issueUuid=issue.uuid,
+                    bountyId="bounty",
+                )
+            )
+    batch.add_system_prompt(utils.SystemPromptModel(prompt="Prompt", bountyId="bounty"))
+    return batch
+
+
+def uuids(collection):
+    return [doc["uuid"] for doc in collection.find({}, {"uuid": 1}).sort("_id", 1)]
+
+
+def test_write_without_transactions(db):
+    batch = make_batch()
+
+    assert batch.write()
+
+    assert uuids(db.issues) == ["issue-0", "issue-1"]
+    assert uuids(db.todos) == [f"task-{i}-{j}" for i in range(2) for j in range(3)]
+    assert db.systemprompts.count_documents({"bountyId": "bounty"}) == 1
+    assert (batch.issues, batch.tasks, batch.system_prompts) == ([], [], [])
+
+
+def test_write_in_one_transaction(db, session):
+    assert make_batch().write()
+
+    assert session.transactions == 1
+    assert session.writes == ["issues", "todos", "systemprompts"]
+    assert db.issues.count_documents({}) == 2
+    assert db.todos.count_documents({}) == 6
+
+
+def test_write_again_does_not_duplicate(db):
+    assert make_batch().write()
+    db.todos.update_one({"uuid": "task-0-0"}, {"$set": {"status": "in_progress"}})
+
+    assert make_batch().write()
+
+    assert db.issues.count_documents({}) == 2
+    assert db.todos.count_documents({}) == 6
+    assert db.todos.find_one({"uuid": "task-0-0"})["status"] == "in_progress"
+
+
+def test_empty_batch_does_not_connect(monkeypatch):
+    monkeypatch.setattr(utils, "mongo_conn", MongoConnection("mongodb://unused"))
+
+    assert utils.PlanBatch().write()
+    assert utils.mongo_conn._client is None
+
+
+def fail_todos(db, monkeypatch):
+    """Make the todo writes fail."""
+    collection_class = type(db.todos)
+    bulk_write = collection_class.bulk_write
+
+    def failing_bulk_write(self, *args, **kwargs):
+        if self.name == "todos":
+            raise PyMongoError("todo write failed")
+        return bulk_write(self, *args, **kwargs)
+
+    monkeypatch.setattr(collection_class, "bulk_write", failing_bulk_write)
+
+
+def test_error_stops_the_write_without_transactions(db, monkeypatch):
+    fail_todos(db, monkeypatch)
+    batch = make_batch()
+
+    assert not batch.write()
+
+    # Issues come first in the ordered write, the system prompt last
+    assert db.issues.count_documents({}) == 2
+    assert db.todos.count_documents({}) == 0
+    assert db.systemprompts.count_documents({}) == 0
+    # The batch is kept so that it can be written again
+    assert len(batch.tasks) == 6
+
+
+def test_error_rolls_back_the_transaction(db, session, monkeypatch):
+    fail_todos(db, monkeypatch)
+    batch = make_batch()
+
+    assert not batch.write()
+
+    assert session.aborted == 1
+    assert db.issues.count_documents({}) == 0
+    assert db.systemprompts.count_documents({}) == 0
+    assert len(batch.issues) == 2
+
+
+def test_indexes_are_created_on_first_use(client, db):
+    assert db.list_collection_names() == []
+
+    utils.get_collection("todos")
+
+    todo_indexes = db.todos.index_information()
+    assert todo_indexes["uuid_1"]["unique"]
+    assert "bountyId_1_uuid_1" in todo_indexes
+    assert "issueUuid_1_uuid_1" in todo_indexes
+    assert db.issues.index_information()["uuid_1"]["unique"]
+    assert db.systemprompts.index_information()["bountyId_1"]["unique"]
+
+
+def test_indexes_are_created_once(client, db, monkeypatch):
+    utils.get_collection("todos")
+    calls = []
+    monkeypatch.setattr(
+        type(db.todos), "create_index", lambda *args, **kwargs: calls.append(args)
+    )
+
+    utils.get_collection("issues")
+    assert utils.ensure_indexes()
+
+    assert calls == []
+
+
+def test_connection_is_lazy(monkeypatch):
+    monkeypatch.setattr(utils, "mongo_conn", MongoConnection("mongodb://unused"))
+
+    assert utils.mongo_conn._client is None
+
+
+def test_ensure_indexes_reports_unreachable_server(monkeypatch):
+    monkeypatch.setattr(utils, "_indexes_created", False)
+    connection = MongoConnection()
+
+    def unreachable(db_name):
+        raise ConnectionFailure("unreachable")
+
+    monkeypatch.setattr(connection, "get_database", unreachable)
+    monkeypatch.setattr(utils, "mongo_conn", connection)
+
+    assert not utils.ensure_indexes()
+    assert not utils._indexes_created
@@ -5,4 +5,6 @@ app = create_app()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    # Debug mode's reloader would run a second copy of the task job pool
+    debug = os.environ.get("FLASK_DEBUG", "").lower() in ["1", "true"]
+    app.run(host="0.0.0.0", port=port, debug=debug, threaded=True)
@@ -0,0 +1,28 @@
+"""LLM client setup for the worker."""
+
+import importlib
+
+from prometheus_swarm.clients import setup_client as _setup_client
+from prometheus_swarm.clients.base_client import Client
+
+# Tool groups that act on the workflow's repository. The worker's copies
+# resolve paths against the repo_path in the workflow context instead of the
+# process working directory, so they replace the framework's versions.
+WORKSPACE_TOOL_GROUPS = ["execute_command", "file_operations", "git_operations"]
+
+
+def setup_client(client: str, model: str = None) -> Client:
+    """Configure and return an LLM client with the worker's tools.
+
+    Args:
+        client: The client type to use ("openai", "anthropic", "xai", etc.)
+        model: Optional model to use (overrides client's default model)
+
+    Returns:
+        Client: Configured client instance with tools loaded
+    """
+    client = _setup_client(client, model)
+    for group in WORKSPACE_TOOL_GROUPS:
+        definitions = importlib.import_module(f"src.tools.{group}.definitions")
+        client.tools.update(definitions.DEFINITIONS)
+    return client
@@ -1,11 +1,13 @@
 """Database package."""
 
-from .database import get_db, get_session, initialize_database
-from .models import Submission
+from .database import close_db, get_db, get_session, initialize_database
+from .models import Submission, TaskJob
 
 __all__ = [
+    "close_db",
     "get_db",
     "get_session",
     "initialize_database",
     "Submission",
+    "TaskJob",
 ]
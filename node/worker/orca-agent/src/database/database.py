@@ -34,6 +34,15 @@ def get_db():
     return Session()
 
 
+def close_db(exception=None):
+    """Close the Flask-managed session when the app context ends."""
+    from flask import g
+
+    db = g.pop("db", None)
+    if db is not None:
+        db.close()
+
+
 def initialize_database():
     """Initialize database tables if they don't exist."""
     inspector = inspect(engine)
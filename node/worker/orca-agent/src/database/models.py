@@ -1,7 +1,10 @@
 """Database models."""
 
+from datetime import datetime, timezone
+from sqlalchemy import UniqueConstraint
 from sqlmodel import SQLModel, Field
 from typing import Optional
+from uuid import uuid4
 
 
 class Submission(SQLModel, table=True):
@@ -16,3 +19,22 @@ class Submission(SQLModel, table=True):
     repo_name: str
     uuid: Optional[str] = None  # UUID of the issue/todo
     node_type: str = "worker"  # Either "worker" or "leader"
+
+
+class TaskJob(SQLModel, table=True):
+    """Queued run of a worker or leader task."""
+
+    __table_args__ = (UniqueConstraint("task_id", "round_number", "node_type"),)
+
+    id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
+    task_id: str
+    round_number: int
+    node_type: str = "worker"  # Either "worker" or "leader"
+    status: str = "queued"  # queued, running, completed or failed
+    payload: str  # JSON request body, needed to run the task
+    pr_url: Optional[str] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None  # HTTP status the task failed with
+    worker_pid: Optional[int] = None  # Process running the job
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -8,7 +8,8 @@ from prometheus_swarm.utils.logging import (
     log_key_value,
     log_value,
 )
-from src.database import initialize_database
+from src.database import close_db, initialize_database
+from src.server.services import job_service
 from colorama import Fore, Style
 import uuid
 import os
@@ -50,6 +51,8 @@ def create_app():
 
         return response
 
+    app.teardown_appcontext(close_db)
+
     # Register blueprints
     app.register_blueprint(healthz.bp)
     app.register_blueprint(task.bp)
@@ -62,6 +65,8 @@ def create_app():
         configure_logging()
         # Initialize database
         initialize_database()
+        # Pick up task jobs queued before a restart
+        job_service.resume_jobs(app)
         # Disable Flask's default logging
         app.logger.disabled = True
 
@@ -1,5 +1,9 @@
 from flask import Blueprint, jsonify
 from src.database import get_db
+from src.utils.github_cache import get_response_cache
+from src.utils.middle_server import get_middle_server
+from src.utils.signatures import signature_cache_info
+from src.workspace import get_dependency_cache, get_workspace_manager
 
 bp = Blueprint("healthz", __name__)
 
@@ -8,4 +12,13 @@ bp = Blueprint("healthz", __name__)
 def healthz():
     # Test database connection
     _ = get_db()
-    return jsonify({"status": "ok"})
+    return jsonify(
+        {
+            "status": "ok",
+            "github_cache": get_response_cache().stats(),
+            "middle_server": get_middle_server().stats(),
+            "signature_cache": signature_cache_info(),
+            "workspaces": get_workspace_manager().stats(),
+            "dependency_cache": get_dependency_cache().stats(),
+        }
+    )
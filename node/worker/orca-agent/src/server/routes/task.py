@@ -1,8 +1,8 @@
-from flask import Blueprint, jsonify, request
-from src.server.services import task_service
+from flask import Blueprint, current_app, jsonify, request
+from src.server.services import job_service, task_service
 from prometheus_swarm.utils.logging import logger
 import requests
-import os
+from src.utils.middle_server import get_middle_server
 
 bp = Blueprint("task", __name__)
 
@@ -58,11 +58,7 @@ def start_task(round_number, node_type, request):
     if node_type not in ["worker", "leader"]:
         return jsonify({"success": False, "message": "Invalid node type"}), 400
 
-    task_functions = {
-        "worker": task_service.complete_todo,
-        "leader": task_service.consolidate_prs,
-    }
-    logger.info(f"{node_type.capitalize()} task started for round: {round_number}")
+    logger.info(f"{node_type.capitalize()} task requested for round: {round_number}")
 
     request_data = request.get_json()
     logger.info(f"Task data: {request_data}")
@@ -86,45 +82,24 @@ def start_task(round_number, node_type, request):
             401,
         )
 
-    response = task_functions[node_type](
-        task_id=request_data["taskId"],
-        round_number=int(round_number),
-        staking_signature=request_data["stakingSignature"],
-        staking_key=request_data["stakingKey"],
-        public_signature=request_data["publicSignature"],
-        pub_key=request_data["pubKey"],
-    )
-    response_data = response.get("data", {})
-    if not response.get("success", False):
-        status = response.get("status", 500)
-        error = response.get("error", "Unknown error")
-        return jsonify({"success": False, "message": error}), status
-
-    logger.info(response_data["message"])
-
-    # Record PR for both worker and leader tasks, but only workers record remotely
-    response = task_service.record_pr(
-        round_number=int(round_number),
-        staking_signature=request_data["addPRSignature"],
-        staking_key=request_data["stakingKey"],
-        pub_key=request_data["pubKey"],
-        pr_url=response_data["pr_url"],
-        task_id=request_data["taskId"],
-        node_type=node_type,
-    )
-    response_data = response.get("data", {})
-    if not response.get("success", False):
-        status = response.get("status", 500)
-        error = response.get("error", "Unknown error")
-        return jsonify({"success": False, "message": error}), status
-
-    return jsonify(
-        {
-            "success": True,
-            "message": response_data["message"],
-            "pr_url": response_data["pr_url"],
-        }
+    # The task runs in the background; the node polls /task-job/<job_id>
+    job, queued = job_service.submit_task(
+        current_app._get_current_object(),
+        node_type,
+        int(round_number),
+        request_data,
     )
+    status_code = 200 if job["status"] in ["completed", "failed"] else 202
+    message = "Task queued" if queued else f"Task already {job['status']}"
+    return jsonify({"success": True, "message": message, **job}), status_code
+
+
+@bp.get("/task-job/<job_id>")
+def get_task_job(job_id):
+    job = job_service.get_job(job_id)
+    if not job:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+    return jsonify({"success": True, **job})
 
 
 @bp.post("/update-audit-result/<task_id>/<round_number>")
@@ -133,14 +108,7 @@ def update_audit_result(task_id, round_number):
         # Convert round_number to integer
         round_number = int(round_number)
 
-        response = requests.post(
-            os.environ["MIDDLE_SERVER_URL"] + "/api/builder/update-audit-result",
-            json={
-                "taskId": task_id,
-                "round": round_number,
-            },
-            headers={"Content-Type": "application/json"},
-        )
+        response = get_middle_server().update_audit_result(task_id, round_number)
         response.raise_for_status()
 
         result = response.json()
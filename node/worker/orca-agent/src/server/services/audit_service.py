@@ -1,19 +1,24 @@
 """Audit service module."""
 
-from prometheus_swarm.clients import setup_client
+from src.clients import setup_client
 from src.workflows.audit.workflow import AuditWorkflow
 from src.workflows.audit.prompts import PROMPTS as AUDIT_PROMPTS
 from prometheus_swarm.utils.logging import log_error
 import re
-import requests
-from github import Github
+from src.utils.github_client import get_github_client
+from src.utils.middle_server import get_middle_server
 import os
-from git import Repo
 from typing import Tuple, Dict
 from prometheus_swarm.tools.github_operations.parser import extract_section
 from src.workflows.utils import verify_pr_signatures
+from src.workspace import get_workspace_manager
+from src.utils.pull_requests import fetch_pull_requests
 import json
 
+MERGE_COMMIT_PR_PATTERN = (
+    r"Merged branch (pr-\d+[^\"]+) for PR (https://github\.com/[^/]+/[^/]+/pull/\d+)"
+)
+
 
 def verify_pr_ownership(
     pr_url: str,
@@ -43,11 +48,7 @@ def verify_pr_ownership(
         bool: True if PR ownership and signature are valid
     """
 
-    response = requests.get(
-        os.environ["MIDDLE_SERVER_URL"]
-        + f"/api/builder/get-source-repo/{node_type}/{uuid}",
-        headers={"Content-Type": "application/json"},
-    )
+    response = get_middle_server().get_source_repo(node_type, uuid)
 
     response_data = response.json()
     if not response_data.get("success"):
@@ -99,7 +100,7 @@ def verify_pr_ownership(
         print(f"Node action: {node_actions.get(node_type)}")
         print(f"Node endpoint: {node_endpoints.get(node_type)}")
 
-        gh = Github(os.environ.get("GITHUB_TOKEN"))
+        gh = get_github_client()
 
         # Parse PR URL
         match = re.match(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url)
@@ -177,17 +178,7 @@ def verify_pr_ownership(
         }
         print(f"Middleware payload: {json.dumps(middleware_payload, indent=2)}")
 
-        middleware_url = (
-            os.environ["MIDDLE_SERVER_URL"]
-            + f"/api/builder/{node_endpoints[node_type]}"
-        )
-        print(f"Middleware URL: {middleware_url}")
-
-        response = requests.post(
-            middleware_url,
-            json=middleware_payload,
-            headers={"Content-Type": "application/json"},
-        )
+        response = get_middle_server().check_pr(node_type, middleware_payload)
 
         response_data = response.json()
         print(f"Middleware response: {json.dumps(response_data, indent=2)}")
@@ -254,7 +245,8 @@ def validate_pr_list(
         print("\nStarting leader audit...", flush=True)
         print(f"PR URL: {pr_url}", flush=True)
 
-        gh = Github(os.environ["GITHUB_TOKEN"])
+        gh = get_github_client(os.environ["GITHUB_TOKEN"])
+        workspaces = get_workspace_manager()
 
         # Parse PR URL and get PR object
         match = re.match(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url)
@@ -298,32 +290,24 @@ def validate_pr_list(
                 f"PR owner mismatch - expected: {leader_username}, got: {pr.head.repo.owner.login}",
             )
 
-        # Clone the repository and analyze merge commits
-        clone_path = f"/tmp/audit-{repo_owner}-{repo_name}-{pr.head.ref}"
-        print(f"\nClone path: {clone_path}", flush=True)
-        if os.path.exists(clone_path):
-            print("Removing existing clone path", flush=True)
-            os.system(f"rm -rf {clone_path}")
-
-        # Clone using the token for auth
+        # Check out a workspace of the leader's fork and analyze merge commits
         clone_url = f"https://{os.environ['GITHUB_TOKEN']}@github.com/{pr.head.repo.full_name}.git"
-        print(f"\nCloning repository from {pr.head.repo.full_name}...", flush=True)
-        print(
-            f"Clone URL: {clone_url.replace(os.environ['GITHUB_TOKEN'], 'TOKEN')}",
-            flush=True,
-        )
-        repo = Repo.clone_from(clone_url, clone_path)
+        print(f"\nChecking out repository {pr.head.repo.full_name}...", flush=True)
 
-        # Checkout the -merged branch
+        # Check out the -merged branch
         source_branch = issue_uuid
         merged_branch = f"{source_branch}-merged"
         print(f"Source branch: {source_branch}", flush=True)
         print(f"Merged branch: {merged_branch}", flush=True)
         print(f"Checking out merged branch: {merged_branch}", flush=True)
-        repo.git.checkout(merged_branch)
+        repo = workspaces.acquire(
+            pr.head.repo.full_name, clone_url, ref=f"origin/{merged_branch}"
+        )
+        clone_path = repo.working_dir
+        print(f"\nClone path: {clone_path}", flush=True)
 
         # Get all commits in the PR
-        commits = list(repo.iter_commits(f"{pr.base.ref}..{merged_branch}"))
+        commits = list(repo.iter_commits(f"origin/{pr.base.ref}..HEAD"))
         print(f"\nFound {len(commits)} commits in PR", flush=True)
 
         # Get merge commits
@@ -344,6 +328,16 @@ def validate_pr_list(
         # Track used PR URLs to prevent duplicates
         used_pr_urls = set()
 
+        # Fetch all PRs referenced by merge commits in batched queries
+        worker_prs = fetch_pull_requests(
+            [
+                match.group(2)
+                for commit in merge_commits
+                if (match := re.search(MERGE_COMMIT_PR_PATTERN, commit.message))
+            ],
+            gh=gh,
+        )
+
         # Verify each merge commit corresponds to a PR from the PR list
         for commit in merge_commits:
             print(f"\nChecking commit: {commit.hexsha[:8]}", flush=True)
@@ -351,10 +345,7 @@ def validate_pr_list(
 
             # Extract branch name and PR URL from merge commit message
             try:
-                commit_match = re.search(
-                    r"Merged branch (pr-\d+[^\"]+) for PR (https://github\.com/[^/]+/[^/]+/pull/\d+)",
-                    commit.message,
-                )
+                commit_match = re.search(MERGE_COMMIT_PR_PATTERN, commit.message)
                 if not commit_match:
                     print(
                         f"Warning: No match found in commit message: {commit.message}"
@@ -378,12 +369,13 @@ def validate_pr_list(
 
                     pr_owner, pr_repo_name, pr_number = pr_match.groups()
 
-                    # Fetch the PR to extract the staking key from its description
-                    pr_repo = gh.get_repo(f"{pr_owner}/{pr_repo_name}")
-                    worker_pr = pr_repo.get_pull(int(pr_number))
+                    # Extract staking key from the PR's description
+                    worker_pr = worker_prs.get(merge_pr_url)
+                    if worker_pr is None:
+                        print(f"Warning: PR not found: {merge_pr_url}")
+                        continue
 
-                    # Extract staking key from PR body
-                    staking_section = extract_section(worker_pr.body, "STAKING_KEY")
+                    staking_section = extract_section(worker_pr["body"], "STAKING_KEY")
                     if not staking_section:
                         print(
                             f"Warning: No staking key section found in PR #{pr_number}"
@@ -463,5 +455,5 @@ def validate_pr_list(
 
     finally:
         # Cleanup
-        if "clone_path" in locals() and os.path.exists(clone_path):
-            os.system(f"rm -rf {clone_path}")
+        if "clone_path" in locals():
+            workspaces.release(clone_path)
@@ -0,0 +1,239 @@
+"""Background execution of worker and leader tasks.
+
+Task requests are stored as TaskJob rows and run by a bounded thread pool, so
+the HTTP request returns right away and the node can poll for the result.
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from prometheus_swarm.utils.logging import logger, log_error
+from src.database import get_db, TaskJob
+from src.server.services import task_service
+
+DEFAULT_JOB_WORKERS = 2
+
+TASK_FUNCTIONS = {
+    "worker": task_service.complete_todo,
+    "leader": task_service.consolidate_prs,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the process-wide job pool, sized by the TASK_JOB_WORKERS env var."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(
+                    os.environ.get("TASK_JOB_WORKERS", DEFAULT_JOB_WORKERS)
+                ),
+                thread_name_prefix="task-job",
+            )
+        return _executor
+
+
+def job_to_dict(job: TaskJob) -> dict:
+    """Serialize a job for API responses."""
+    return {
+        "job_id": job.id,
+        "task_id": job.task_id,
+        "round_number": job.round_number,
+        "node_type": job.node_type,
+        "status": job.status,
+        "pr_url": job.pr_url,
+        "error": job.error,
+        "error_status": job.error_status,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+
+
+def _find_job(db, task_id: str, round_number: int, node_type: str):
+    return (
+        db.query(TaskJob)
+        .filter(
+            TaskJob.task_id == task_id,
+            TaskJob.round_number == round_number,
+            TaskJob.node_type == node_type,
+        )
+        .first()
+    )
+
+
+def submit_task(
+    app, node_type: str, round_number: int, request_data: dict
+) -> Tuple[dict, bool]:
+    """Queue a task run, or return the existing job for the same task and round.
+
+    A failed job is queued again when it is resubmitted; queued, running and
+    completed jobs are returned as they are.
+
+    Args:
+        app: Flask app the job runs in
+        node_type: Either "worker" or "leader"
+        round_number: Round number
+        request_data: Validated task request body
+
+    Returns:
+        Tuple[dict, bool]: The job, and whether it was (re)queued by this call
+    """
+    db = get_db()
+    task_id = request_data["taskId"]
+    job = _find_job(db, task_id, round_number, node_type)
+
+    if job is None:
+        job = TaskJob(
+            task_id=task_id,
+            round_number=round_number,
+            node_type=node_type,
+            payload=json.dumps(request_data),
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request queued the same task first
+            db.rollback()
+            return job_to_dict(_find_job(db, task_id, round_number, node_type)), False
+    elif job.status == "failed":
+        job.status = "queued"
+        job.payload = json.dumps(request_data)
+        job.error = None
+        job.error_status = None
+        job.updated_at = datetime.now(timezone.utc)
+        db.commit()
+    else:
+        return job_to_dict(job), False
+
+    logger.info(f"Queued {node_type} task job {job.id} for round {round_number}")
+    _get_executor().submit(_run_job, app, job.id)
+    return job_to_dict(job), True
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """Get a job by ID."""
+    job = get_db().get(TaskJob, job_id)
+    return job_to_dict(job) if job else None
+
+
+def _claim_job(db, job_id: str) -> bool:
+    """Move a job from queued to running. Fails if another thread or process has it."""
+    claimed = (
+        db.query(TaskJob)
+        .filter(TaskJob.id == job_id, TaskJob.status == "queued")
+        .update(
+            {
+                "status": "running",
+                "worker_pid": os.getpid(),
+                "updated_at": datetime.now(timezone.utc),
+            }
+        )
+    )
+    db.commit()
+    return claimed == 1
+
+
+def _run_task(node_type: str, round_number: int, request_data: dict) -> dict:
+    """Run the task and record its PR."""
+    response = TASK_FUNCTIONS[node_type](
+        task_id=request_data["taskId"],
+        round_number=round_number,
+        staking_signature=request_data["stakingSignature"],
+        staking_key=request_data["stakingKey"],
+        public_signature=request_data["publicSignature"],
+        pub_key=request_data["pubKey"],
+    )
+    if not response.get("success", False):
+        return response
+
+    logger.info(response["data"]["message"])
+
+    # Record PR for both worker and leader tasks, but only workers record remotely
+    return task_service.record_pr(
+        round_number=round_number,
+        staking_signature=request_data["addPRSignature"],
+        staking_key=request_data["stakingKey"],
+        pub_key=request_data["pubKey"],
+        pr_url=response["data"]["pr_url"],
+        task_id=request_data["taskId"],
+        node_type=node_type,
+    )
+
+
+def _run_job(app, job_id: str):
+    """Run a queued job in the pool."""
+    with app.app_context():
+        db = get_db()
+        try:
+            if not _claim_job(db, job_id):
+                return
+            job = db.get(TaskJob, job_id)
+            logger.info(f"Running {job.node_type} task job {job_id}")
+
+            result = _run_task(job.node_type, job.round_number, json.loads(job.payload))
+            if result.get("success", False):
+                job.status = "completed"
+                job.pr_url = result["data"]["pr_url"]
+            else:
+                job.status = "failed"
+                job.error = result.get("error", "Unknown error")
+                job.error_status = result.get("status", 500)
+            job.updated_at = datetime.now(timezone.utc)
+            db.commit()
+        except Exception as e:
+            log_error(e, f"Task job {job_id} failed")
+            db.rollback()
+            job = db.get(TaskJob, job_id)
+            if job:
+                job.status = "failed"
+                job.error = str(e)
+                job.error_status = 500
+                job.updated_at = datetime.now(timezone.utc)
+                db.commit()
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid or pid == os.getpid():
+        # This process just started, so it can't be running the job
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def resume_jobs(app):
+    """Queue jobs left over from a previous run of the server.
+
+    Jobs that were running in a process that no longer exists are marked as
+    failed, so the node can resubmit them.
+    """
+    with app.app_context():
+        db = get_db()
+        for job in db.query(TaskJob).filter(TaskJob.status == "running"):
+            if not _process_alive(job.worker_pid):
+                job.status = "failed"
+                job.error = "Interrupted by a server restart"
+                job.error_status = 500
+                job.updated_at = datetime.now(timezone.utc)
+        db.commit()
+
+        queued = [
+            job.id for job in db.query(TaskJob).filter(TaskJob.status == "queued")
+        ]
+
+    for job_id in queued:
+        logger.info(f"Resuming task job {job_id}")
+        _get_executor().submit(_run_job, app, job_id)
@@ -2,9 +2,10 @@
 
 import requests
 import os
-from github import Github
+from src.utils.github_client import get_github_client
+from src.utils.middle_server import get_middle_server
 from src.database import get_db, Submission
-from prometheus_swarm.clients import setup_client
+from src.clients import setup_client
 from prometheus_swarm.utils.logging import logger, log_error
 from src.workflows.task.workflow import TaskWorkflow
 from src.workflows.mergeconflict.workflow import MergeConflictWorkflow
@@ -64,7 +65,7 @@ def complete_todo(
             }
 
         # Check if base branch exists in target repo
-        github = Github(os.environ["GITHUB_TOKEN"])
+        github = get_github_client(os.environ["GITHUB_TOKEN"])
         try:
             repo_url = f"{repo_owner}/{repo_name}"
             logger.info(f"Attempting to find repository: {repo_url}")
@@ -136,21 +137,16 @@ def complete_todo(
 def get_task_details(signature, staking_key, pub_key, task_type):
     """Get task details from middle server."""
 
-    tasks_urls = {
-        "worker": "/api/builder/fetch-to-do",
-        "leader": "/api/builder/fetch-issue",
-    }
     try:
         logger.info(f"Fetching {task_type} task")
 
-        response = requests.post(
-            os.environ["MIDDLE_SERVER_URL"] + tasks_urls[task_type],
-            json={
+        response = get_middle_server().fetch_task(
+            task_type,
+            {
                 "signature": signature,
                 "stakingKey": staking_key,
                 "pubKey": pub_key,
             },
-            headers={"Content-Type": "application/json"},
         )
         response.raise_for_status()
         result = response.json()
@@ -414,18 +410,14 @@ def _store_pr_remotely(
             logger.info(f"Including GitHub username in payload: {github_username}")
 
         logger.info(f"Sending payload to {endpoint}: {payload}")
-        response = requests.post(
-            os.environ["MIDDLE_SERVER_URL"] + endpoint,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-        )
+        response = get_middle_server().record_pr(node_type, payload)
         response.raise_for_status()
         return {
             "success": True,
             "data": {"message": "PR recorded remotely", "pr_url": pr_url},
         }
     except requests.exceptions.RequestException as e:
-        if not hasattr(e, "response"):
+        if not hasattr(e, "response") or e.response is None:
             return {
                 "success": False,
                 "status": 500,
@@ -692,7 +684,7 @@ def consolidate_prs(
             )
 
             # Get source fork
-            github = Github(os.environ["GITHUB_TOKEN"])
+            github = get_github_client(os.environ["GITHUB_TOKEN"])
             source_fork = github.get_repo(f"{repo_owner}/{repo_name}")
 
             # Verify this is a fork
@@ -782,7 +774,7 @@ def create_aggregator_repo(task_id):
     """
     try:
         # Initialize GitHub client with token
-        github = Github(os.environ["GITHUB_TOKEN"])
+        github = get_github_client(os.environ["GITHUB_TOKEN"])
         username = os.environ["GITHUB_USERNAME"]
 
         # Get issue UUID and repo info from assign_issue response
@@ -938,10 +930,8 @@ def assign_issue(task_id):
             f"Request payload: {{'taskId': {task_id}, 'githubUsername': {os.environ['GITHUB_USERNAME']}}}"
         )
 
-        response = requests.post(
-            os.environ["MIDDLE_SERVER_URL"] + "/api/builder/assign-issue",
-            json={"taskId": task_id, "githubUsername": os.environ["GITHUB_USERNAME"]},
-            headers={"Content-Type": "application/json"},
+        response = get_middle_server().assign_issue(
+            task_id, os.environ["GITHUB_USERNAME"]
         )
         logger.info(f"Response status code: {response.status_code}")
         logger.info(f"Response headers: {response.headers}")
@@ -1009,11 +999,7 @@ def add_aggregator_info(task_id, staking_key, pub_key, signature):
         }
 
         # Send the request to the middle server
-        response = requests.post(
-            os.environ["MIDDLE_SERVER_URL"] + "/api/builder/add-aggregator-info",
-            json=payload,
-            headers={"Content-Type": "application/json"},
-        )
+        response = get_middle_server().add_aggregator_info(payload)
         response.raise_for_status()
         result = response.json()
 
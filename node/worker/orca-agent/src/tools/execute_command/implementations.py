@@ -1,18 +1,32 @@
 import subprocess
 import os
+import sys
+from prometheus_swarm.utils.logging import log_error
+from src.tools.git_operations.implementations import workspace_root
 from src.types import ToolOutput
+from src.workspace.dependency_cache import (
+    ARTIFACTS,
+    VENV_DIR,
+    exclude_venv,
+    get_dependency_cache,
+)
 
 
 def execute_command(command: str, **kwargs) -> ToolOutput:
-    """Execute a shell command in the current working directory."""
+    """Execute a shell command in the workflow's repository.
+
+    Commands run in the repository's virtualenv, if setup_dependencies created
+    one, and package managers use the shared download caches.
+    """
     try:
-        cwd = os.getcwd()
+        cwd = workspace_root(kwargs.get("repo_path"))
         print(f"Executing command in {cwd}: {command}")
 
         result = subprocess.run(
             command,
             shell=True,
             cwd=cwd,
+            env=get_dependency_cache().env(cwd),
             capture_output=True,
             text=True,
             timeout=300,  # Add a 5-minute timeout to prevent hanging
@@ -82,7 +96,7 @@ def run_tests(
             "data": None,
         }
 
-    result = execute_command(command)
+    result = execute_command(command, repo_path=kwargs.get("repo_path"))
 
     # Check if the command execution failed (not the tests)
     if not result["success"]:
@@ -150,7 +164,6 @@ def install_dependency(
 
     Supports common package managers with appropriate flags to prevent hanging:
     - npm: Uses --no-fund --no-audit flags
-    - pip: Uses --no-cache-dir flag
     - yarn: Uses --non-interactive flag
     - pnpm: Uses --no-fund flag
 
@@ -173,8 +186,8 @@ def install_dependency(
             "dev": f"npm install --no-fund --no-audit --save-dev {package_spec}",
         },
         "pip": {
-            "prod": f"pip install --no-cache-dir {package_spec}",
-            "dev": f"pip install --no-cache-dir {package_spec}",  # pip doesn't have dev dependencies
+            "prod": f"pip install {package_spec}",
+            "dev": f"pip install {package_spec}",  # pip doesn't have dev dependencies
         },
         "yarn": {
             "prod": f"yarn add --non-interactive {package_spec}",
@@ -196,7 +209,7 @@ def install_dependency(
     dep_type = "dev" if is_dev_dependency else "prod"
     command = commands[package_manager][dep_type]
 
-    result = execute_command(command)
+    result = execute_command(command, repo_path=kwargs.get("repo_path"))
 
     # Check if the command execution failed
     if not result["success"]:
@@ -236,11 +249,25 @@ def install_dependency(
     }
 
 
+# Manifest each package manager installs from, and its install command
+INSTALLS = {
+    "pip": ("requirements.txt", "pip install -r requirements.txt"),
+    "npm": ("package.json", "npm install --no-fund --no-audit"),
+    "yarn": ("package.json", "yarn install --non-interactive"),
+    "pnpm": ("package.json", "pnpm install"),
+}
+
+
 def setup_dependencies(
     package_manager: str, repo_path: str = None, **kwargs
 ) -> ToolOutput:
     """Install dependencies from requirements.txt or package.json.
 
+    pip installs into a virtualenv in the repository's .venv directory, which
+    execute_command and run_tests then use, and which git is told to ignore.
+    Dependencies installed before for the same manifests and lockfile are
+    copied from the dependency cache instead of being installed again.
+
     Args:
         repo_path: Path to the repository root. If None, uses current directory.
 
@@ -248,52 +275,63 @@ def setup_dependencies(
         ToolOutput: Standardized tool output with installation status
     """
     try:
-        working_dir = repo_path or os.getcwd()
+        working_dir = workspace_root(repo_path)
         print(f"Installing dependencies in {working_dir}")
 
-        if package_manager == "pip":
-            requirements_path = os.path.join(working_dir, "requirements.txt")
-            if not os.path.exists(requirements_path):
-                return {
-                    "success": False,
-                    "message": "Requirements.txt not found",
-                    "data": None,
-                }
+        if package_manager not in INSTALLS:
+            return {
+                "success": False,
+                "message": f"Unsupported package manager: {package_manager}",
+                "data": None,
+            }
+        manifest, command = INSTALLS[package_manager]
+        if not os.path.exists(os.path.join(working_dir, manifest)):
+            return {
+                "success": False,
+                "message": f"{manifest} not found",
+                "data": None,
+            }
 
-            result = execute_command(
-                f"pip install --no-cache-dir -r {requirements_path}"
-            )
-        elif package_manager == "npm":
-            package_json_path = os.path.join(working_dir, "package.json")
-            if not os.path.exists(package_json_path):
-                return {
-                    "success": False,
-                    "message": "package.json not found",
-                    "data": None,
-                }
-            result = execute_command(
-                f"npm install --no-fund --no-audit -r {requirements_path}"
-            )
-        elif package_manager == "yarn":
-            package_json_path = os.path.join(working_dir, "package.json")
-            if not os.path.exists(package_json_path):
-                return {
-                    "success": False,
-                    "message": "package.json not found",
-                    "data": None,
-                }
-            result = execute_command(
-                f"yarn add --non-interactive -r {requirements_path}"
+        if package_manager == "pip":
+            exclude_venv(working_dir)
+
+        cache = get_dependency_cache()
+        key = cache.key(working_dir, package_manager)
+        if key and cache.restore(key, working_dir):
+            return {
+                "success": True,
+                "message": "Dependencies installed successfully (from cache)",
+                "data": {"stdout": "", "stderr": "", "returncode": 0, "cached": True},
+            }
+
+        if package_manager == "pip" and not os.path.exists(
+            os.path.join(working_dir, VENV_DIR)
+        ):
+            # System site-packages stay visible, as they were before installs
+            # went into a virtualenv
+            venv = execute_command(
+                f"{sys.executable} -m venv --system-site-packages {VENV_DIR}",
+                repo_path=working_dir,
             )
-        elif package_manager == "pnpm":
-            package_json_path = os.path.join(working_dir, "package.json")
-            if not os.path.exists(package_json_path):
+            if not venv["success"] or not venv["data"]["command_succeeded"]:
                 return {
                     "success": False,
-                    "message": "package.json not found",
-                    "data": None,
+                    "message": f"Failed to create virtualenv: {venv['message']}",
+                    "data": venv.get("data"),
                 }
-            result = execute_command(f"pnpm add --no-fund -r {requirements_path}")
+        elif package_manager == "npm" and any(
+            os.path.exists(os.path.join(working_dir, lockfile))
+            for lockfile in ("package-lock.json", "npm-shrinkwrap.json")
+        ):
+            command = "npm ci --no-fund --no-audit"
+
+        result = execute_command(command, repo_path=working_dir)
+        if not result["success"]:
+            return {
+                "success": False,
+                "message": f"Failed to install dependencies: {result['message']}",
+                "data": result.get("data", {}),
+            }
 
         success = result["data"]["command_succeeded"]
         stdout = result["data"]["stdout"]
@@ -302,6 +340,12 @@ def setup_dependencies(
 
         if success:
             message = "Dependencies installed successfully"
+            if key:
+                try:
+                    cache.store(key, working_dir, package_manager)
+                except Exception as e:
+                    # The installed dependencies work without the cache
+                    log_error(e, f"Failed to cache {ARTIFACTS[package_manager]}")
         else:
             message = "Failed to install dependencies"
 
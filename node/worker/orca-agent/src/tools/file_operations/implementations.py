@@ -3,7 +3,7 @@
 import os
 import shutil
 from pathlib import Path
-from src.tools.git_operations.implementations import commit_and_push
+from src.tools.git_operations.implementations import commit_and_push, workspace_root
 from git import Repo
 from src.types import ToolOutput
 
@@ -28,7 +28,7 @@ def read_file(file_path: str, **kwargs) -> ToolOutput:
     """
     try:
         file_path = _normalize_path(file_path)
-        full_path = Path(os.getcwd()) / file_path
+        full_path = Path(workspace_root(kwargs.get("repo_path"))) / file_path
         with open(full_path, "r") as f:
             content = f.read()
             return {
@@ -56,7 +56,7 @@ def write_file(
     """Write file with directory creation and optional commit"""
     try:
         file_path = _normalize_path(file_path)
-        full_path = Path(os.getcwd()) / file_path
+        full_path = Path(workspace_root(kwargs.get("repo_path"))) / file_path
         full_path.parent.mkdir(parents=True, exist_ok=True)
 
         with open(full_path, "w") as f:
@@ -64,7 +64,7 @@ def write_file(
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(commit_message, **kwargs)
             if not commit_result["success"]:
                 return commit_result
 
@@ -88,8 +88,8 @@ def copy_file(
     try:
         source = _normalize_path(source)
         destination = _normalize_path(destination)
-        source_path = Path(os.getcwd()) / source
-        dest_path = Path(os.getcwd()) / destination
+        source_path = Path(workspace_root(kwargs.get("repo_path"))) / source
+        dest_path = Path(workspace_root(kwargs.get("repo_path"))) / destination
 
         if not source_path.exists():
             return {
@@ -105,7 +105,7 @@ def copy_file(
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(commit_message, **kwargs)
             if not commit_result["success"]:
                 return commit_result
 
@@ -129,8 +129,8 @@ def move_file(
     try:
         source = _normalize_path(source)
         destination = _normalize_path(destination)
-        source_path = Path(os.getcwd()) / source
-        dest_path = Path(os.getcwd()) / destination
+        source_path = Path(workspace_root(kwargs.get("repo_path"))) / source
+        dest_path = Path(workspace_root(kwargs.get("repo_path"))) / destination
 
         if not source_path.exists():
             return {
@@ -146,7 +146,7 @@ def move_file(
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(commit_message, **kwargs)
             if not commit_result["success"]:
                 return commit_result
 
@@ -164,14 +164,14 @@ def move_file(
 
 
 def rename_file(
-    source: str, destination: str, commit_message: str = None
+    source: str, destination: str, commit_message: str = None, **kwargs
 ) -> ToolOutput:
     """Rename a file and optionally commit the change."""
     try:
         source = _normalize_path(source)
         destination = _normalize_path(destination)
-        source_path = Path(os.getcwd()) / source
-        dest_path = Path(os.getcwd()) / destination
+        source_path = Path(workspace_root(kwargs.get("repo_path"))) / source
+        dest_path = Path(workspace_root(kwargs.get("repo_path"))) / destination
 
         if not source_path.exists():
             return {
@@ -185,7 +185,7 @@ def rename_file(
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(commit_message, **kwargs)
             if not commit_result["success"]:
                 return commit_result
 
@@ -206,7 +206,7 @@ def delete_file(file_path: str, commit_message: str = None, **kwargs) -> ToolOut
     """Delete a file and optionally commit the change."""
     try:
         file_path = _normalize_path(file_path)
-        full_path = Path(os.getcwd()) / file_path
+        full_path = Path(workspace_root(kwargs.get("repo_path"))) / file_path
 
         if not full_path.exists():
             return {
@@ -219,7 +219,7 @@ def delete_file(file_path: str, commit_message: str = None, **kwargs) -> ToolOut
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(commit_message, **kwargs)
             if not commit_result["success"]:
                 return commit_result
 
@@ -252,7 +252,7 @@ def list_files(directory: str, **kwargs) -> ToolOutput:
     """
     try:
         directory = _normalize_path(directory)
-        directory = Path(os.getcwd()) / directory
+        directory = Path(workspace_root(kwargs.get("repo_path"))) / directory
 
         if not directory.exists():
             return {
@@ -327,7 +327,7 @@ def create_directory(path: str, **kwargs) -> ToolOutput:
     """
     try:
         path = _normalize_path(path)
-        full_path = Path(os.getcwd()) / path
+        full_path = Path(workspace_root(kwargs.get("repo_path"))) / path
         full_path.mkdir(parents=True, exist_ok=True)
         return {
             "success": True,
@@ -28,6 +28,23 @@ def _get_repo(repo_path: str) -> Repo:
     return Repo(repo_path)
 
 
+def workspace_root(repo_path: str = None) -> str:
+    """
+    Get the directory a tool operates in.
+
+    Workflows pass their repository as repo_path in the tool context, so tools
+    never depend on the process working directory. The working directory is
+    only used when no repository is given.
+
+    Args:
+        repo_path (str, optional): Path to the workflow's repository
+
+    Returns:
+        str: The directory to resolve paths against
+    """
+    return repo_path or os.getcwd()
+
+
 def init_repository(
     path: str, user_name: str = None, user_email: str = None, **kwargs
 ) -> ToolOutput:
@@ -212,7 +229,7 @@ def create_branch(branch_base: str, repo_path: str, **kwargs) -> ToolOutput:
 def checkout_branch(branch_name: str, **kwargs) -> ToolOutput:
     """Check out an existing branch in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         log_key_value("Checking out branch", branch_name)
         branch = repo.heads[branch_name]
@@ -235,7 +252,7 @@ def checkout_branch(branch_name: str, **kwargs) -> ToolOutput:
 def commit_and_push(message: str, **kwargs) -> ToolOutput:
     """Commit all changes and push to remote."""
     try:
-        repo = Repo(os.getcwd())
+        repo = Repo(workspace_root(kwargs.get("repo_path")))
         log_key_value("Committing changes", message)
 
         # Stage all changes
@@ -270,7 +287,7 @@ def commit_and_push(message: str, **kwargs) -> ToolOutput:
 def get_current_branch(**kwargs) -> ToolOutput:
     """Get the current branch name in the working directory"""
     try:
-        repo = Repo(os.getcwd())
+        repo = Repo(workspace_root(kwargs.get("repo_path")))
         branch = repo.active_branch.name
         log_key_value("Current branch", branch)
         return {
@@ -291,7 +308,7 @@ def get_current_branch(**kwargs) -> ToolOutput:
 def list_branches(**kwargs) -> ToolOutput:
     """List all branches in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         branches = [head.name for head in repo.heads]
         log_key_value("Branches", ", ".join(branches))
@@ -313,7 +330,7 @@ def list_branches(**kwargs) -> ToolOutput:
 def add_remote(name: str, url: str, **kwargs) -> ToolOutput:
     """Add a remote to the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         # Insert GitHub token authentication logic
         repo = _get_repo(repo_path)
         log_key_value("Adding remote", f"{name} -> {url}")
@@ -367,7 +384,7 @@ def pull_remote(
 ) -> ToolOutput:
     """Pull changes with explicit branch specification."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         branch = branch or repo.active_branch.name
         log_key_value("Pulling from remote", f"{remote_name}/{branch}")
@@ -402,7 +419,7 @@ def can_access_repository(repo_url: str, **kwargs) -> ToolOutput:
     try:
         log_key_value("Checking access to", repo_url)
         # Use GitPython to check remote URLs
-        repo = Repo(os.getcwd())
+        repo = Repo(workspace_root(kwargs.get("repo_path")))
         for remote in repo.remotes:
             if any(repo_url in url for url in remote.urls):
                 return {
@@ -426,7 +443,7 @@ def can_access_repository(repo_url: str, **kwargs) -> ToolOutput:
 def check_for_conflicts(**kwargs) -> ToolOutput:
     """Check for merge conflicts in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         unmerged = repo.index.unmerged_blobs()
         conflicting_files = sorted(list(unmerged.keys()))
@@ -455,7 +472,7 @@ def check_for_conflicts(**kwargs) -> ToolOutput:
 def get_conflict_info(**kwargs) -> ToolOutput:
     """Get details about current conflicts from Git's index in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         conflicts = {}
         unmerged = repo.index.unmerged_blobs()
@@ -490,7 +507,7 @@ def get_conflict_info(**kwargs) -> ToolOutput:
 def resolve_conflict(file_path: str, resolution: str, **kwargs) -> ToolOutput:
     """Resolve a conflict in a specific file and commit the resolution in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         log_key_value("Resolving conflict in", file_path)
         full_path = Path(repo.working_dir) / file_path
@@ -514,7 +531,7 @@ def resolve_conflict(file_path: str, resolution: str, **kwargs) -> ToolOutput:
 def create_merge_commit(message: str, **kwargs) -> ToolOutput:
     """Create a merge commit after resolving conflicts in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = workspace_root(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         log_key_value("Creating merge commit", message)
         if check_for_conflicts(**kwargs)["has_conflicts"]:
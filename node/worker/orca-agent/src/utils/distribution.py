@@ -1,12 +1,15 @@
 """Distribution list filtering utilities."""
 
 import re
-from typing import Dict, Tuple
-from github import Github
+from typing import Dict, Optional, Tuple
+from src.utils.github_client import get_github_client
 import os
-from src.workflows.utils import verify_pr_signatures
+from src.utils.pull_requests import fetch_pull_requests
+from src.utils.signatures import verify_many
 from src.tools.github_operations.parser import extract_section
 
+DEFAULT_PR_TIMEOUT = 10  # seconds per GitHub request
+
 
 def remove_leaders(
     distribution_list: Dict[str, Dict[str, str]],
@@ -20,7 +23,7 @@ def remove_leaders(
     filtered_distribution_list = {}
 
     # Get source repo and its upstream
-    gh = Github(os.environ.get("GITHUB_TOKEN"))
+    gh = get_github_client()
     target_repo = gh.get_repo(f"{repo_owner}/{repo_name}")
     # Get parent's owner if it exists (repo is a fork), otherwise use repo's owner
     upstream_owner = getattr(target_repo.parent, "owner", target_repo.owner).login
@@ -68,6 +71,60 @@ def remove_leaders(
     return filtered_distribution_list
 
 
+def _pr_signature(
+    node_key: str, node_data: Dict[str, str], pr: Optional[dict]
+) -> Optional[Tuple[str, str, Dict]]:
+    """Get the staking signature to verify for a distribution list entry.
+
+    Returns:
+        The (signature, staking_key, expected_values) to pass to verify_many,
+        or None if the PR has no signature for the node's staking key
+    """
+    try:
+        pr_url = node_data["prUrl"]
+        staking_key = node_data["stakingKey"]
+
+        print(f"\nValidating PR: {pr_url}")
+        print(f"Expected staking key: {staking_key}")
+
+        if pr is None:
+            print(f"PR not found or invalid PR URL: {pr_url}")
+            return None
+
+        # First extract the actual staking key from the PR
+        staking_section = extract_section(pr["body"], "STAKING_KEY")
+        if not staking_section:
+            print(f"No staking key section found in PR #{pr['number']}")
+            return None
+
+        staking_parts = staking_section.strip().split(":")
+        if len(staking_parts) != 2:
+            print(f"Invalid staking signature format in PR #{pr['number']}")
+            return None
+
+        pr_staking_key = staking_parts[0].strip()
+        print(f"Found staking key in PR: {pr_staking_key}")
+
+        # Verify the PR's staking key matches the one in distribution list
+        if pr_staking_key != staking_key:
+            print(
+                f"Staking key mismatch - PR: {pr_staking_key}, Expected: {staking_key}"
+            )
+            return None
+
+        expected_values = {
+            "taskId": node_data["taskId"],
+            "roundNumber": node_data["roundNumber"],
+            "stakingKey": staking_key,
+            "action": "task",
+        }
+        return staking_parts[1].strip(), staking_key, expected_values
+
+    except Exception as e:
+        print(f"Error validating PR for {node_key}: {str(e)}")
+        return None
+
+
 def validate_distribution_list(
     distribution_list: Dict[str, Dict[str, str]],
     repo_owner: str,
@@ -75,6 +132,12 @@ def validate_distribution_list(
 ) -> Tuple[Dict[str, Dict[str, str]], str]:
     """Validate and filter distribution list.
 
+    All PRs are fetched up front in batched GraphQL queries (see
+    fetch_pull_requests), each request timing out after
+    DISTRIBUTION_PR_TIMEOUT seconds. Their staking signatures are then
+    checked in one verify_many batch. The result keeps the order of the
+    input list.
+
     Args:
         distribution_list: Raw distribution list from request
         repo_owner: Owner of the repository
@@ -102,70 +165,33 @@ def validate_distribution_list(
             return None, "No eligible worker PRs after filtering leaders"
 
         # Now validate signatures in each PR
-        gh = Github(os.environ.get("GITHUB_TOKEN"))
-        validated_list = {}
+        # PyGithub only accepts whole seconds
+        pr_timeout = max(
+            1,
+            round(float(os.environ.get("DISTRIBUTION_PR_TIMEOUT", DEFAULT_PR_TIMEOUT))),
+        )
+        pulls = fetch_pull_requests(
+            [node_data["prUrl"] for node_data in filtered_list.values()],
+            gh=get_github_client(timeout=pr_timeout),
+        )
 
+        signatures = {}
         for node_key, node_data in filtered_list.items():
-            try:
-                pr_url = node_data["prUrl"]
-                task_id = node_data["taskId"]
-                round_number = node_data["roundNumber"]
-                staking_key = node_data["stakingKey"]
-
-                print(f"\nValidating PR: {pr_url}")
-                print(f"Expected staking key: {staking_key}")
-
-                # Parse PR URL and get PR
-                match = re.match(
-                    r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url
-                )
-                if not match:
-                    print(f"Invalid PR URL format: {pr_url}")
-                    continue
-
-                pr_owner, pr_repo, pr_number = match.groups()
-                repo = gh.get_repo(f"{pr_owner}/{pr_repo}")
-                pr = repo.get_pull(int(pr_number))
-
-                # First extract the actual staking key from the PR
-                staking_section = extract_section(pr.body, "STAKING_KEY")
-                if not staking_section:
-                    print(f"No staking key section found in PR #{pr_number}")
-                    continue
-
-                try:
-                    pr_staking_key = staking_section.split(":")[0].strip()
-                    print(f"Found staking key in PR: {pr_staking_key}")
-                except Exception as e:
-                    print(f"Error parsing staking key section: {str(e)}")
-                    continue
-
-                # Verify the PR's staking key matches the one in distribution list
-                if pr_staking_key != staking_key:
-                    print(
-                        f"Staking key mismatch - PR: {pr_staking_key}, Expected: {staking_key}"
-                    )
-                    continue
-
-                # Now verify the signature
-                print(f"Verifying signature for key: {staking_key}")
-                is_valid = verify_pr_signatures(
-                    pr.body,
-                    task_id,
-                    round_number,
-                    expected_staking_key=staking_key,
-                    expected_action="task",
-                )
-
-                if is_valid:
-                    print(f"✓ Valid signature found for {staking_key}")
-                    validated_list[staking_key] = node_data
-                else:
-                    print(f"✗ Invalid signature for {staking_key}")
-
-            except Exception as e:
-                print(f"Error validating PR for {node_key}: {str(e)}")
+            signature = _pr_signature(node_key, node_data, pulls[node_data["prUrl"]])
+            if signature:
+                signatures[node_key] = signature
+
+        # Then verify all signatures in one batch
+        print(f"\nVerifying {len(signatures)} signatures")
+        results = verify_many(signatures.values())
+
+        validated_list = {}
+        for (node_key, (_, staking_key, _)), result in zip(signatures.items(), results):
+            if result.get("error"):
+                print(f"✗ Invalid signature for {staking_key}: {result['error']}")
                 continue
+            print(f"✓ Valid signature found for {staking_key}")
+            validated_list[staking_key] = filtered_list[node_key]
 
         if not validated_list:
             return None, "No PRs with valid signatures found"
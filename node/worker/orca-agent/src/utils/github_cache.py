@@ -0,0 +1,294 @@
+"""On-disk conditional-request cache for GitHub REST reads."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+import requests.adapters
+from github.Requester import (
+    HTTPRequestsConnectionClass,
+    HTTPSRequestsConnectionClass,
+    Requester,
+)
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = "./.cache/github"
+DEFAULT_MAX_BYTES = 256 * 1024**2  # 256 MiB
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+# Headers that describe the current request rather than the cached content;
+# a 304 carries fresh values for these
+FRESH_HEADERS = [
+    "Date",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+    "X-RateLimit-Used",
+    "X-RateLimit-Resource",
+    "X-GitHub-Request-Id",
+]
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ResponseCache:
+    """GitHub GET responses stored on disk with their ETag/Last-Modified.
+
+    Cached responses are never served blindly: every read is revalidated with
+    If-None-Match/If-Modified-Since, and a 304 (which GitHub does not count
+    against the rate limit) is answered from the cache. Entries are keyed by
+    URL, Accept header and a hash of the Authorization header, so responses
+    are never shared between tokens.
+
+    Entries expire after a TTL and the least recently used ones are evicted
+    once the cache grows beyond its size limit.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cached responses. Defaults to GITHUB_CACHE_DIR env var.
+            max_bytes: Size limit for the cache. Defaults to GITHUB_CACHE_MAX_BYTES env var.
+            ttl: Seconds an entry is kept. Defaults to GITHUB_CACHE_TTL env var.
+        """
+        self.cache_dir = os.path.abspath(
+            cache_dir or os.environ.get("GITHUB_CACHE_DIR", DEFAULT_CACHE_DIR)
+        )
+        self.max_bytes = int(
+            max_bytes
+            if max_bytes is not None
+            else os.environ.get("GITHUB_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.ttl = float(
+            ttl if ttl is not None else os.environ.get("GITHUB_CACHE_TTL", DEFAULT_TTL)
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._size = sum(entry.stat().st_size for entry in os.scandir(self.cache_dir))
+
+    def key(self, request: requests.PreparedRequest) -> str:
+        """Get the cache key for a request."""
+        authorization = request.headers.get("Authorization", "")
+        parts = [
+            request.url,
+            request.headers.get("Accept", ""),
+            hashlib.sha256(authorization.encode()).hexdigest(),
+        ]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get a cached entry, or None if there is none or it has expired."""
+        meta_path, body_path = self._paths(key)
+        try:
+            if time.time() - os.path.getmtime(meta_path) > self.ttl:
+                self._remove(key)
+                return None
+            with open(meta_path) as f:
+                entry = json.load(f)
+            with open(body_path, "rb") as f:
+                entry["body"] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key: str, response: requests.Response):
+        """Store a response."""
+        headers = dict(response.headers)
+        meta = json.dumps(
+            {
+                "url": response.url,
+                "status": response.status_code,
+                "reason": response.reason,
+                "encoding": response.encoding,
+                "headers": headers,
+            }
+        ).encode()
+        meta_path, body_path = self._paths(key)
+        old_size = self._entry_size(key)
+        # Body first, so a meta file always has a complete body next to it
+        _write_atomic(body_path, response.content)
+        _write_atomic(meta_path, meta)
+
+        with self._lock:
+            self._counters["stores"] += 1
+            self._size += len(meta) + len(response.content) - old_size
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def touch(self, key: str):
+        """Mark an entry as used now, for TTL and LRU eviction."""
+        meta_path, _ = self._paths(key)
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in self._paths(key):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _remove(self, key: str):
+        size = self._entry_size(key)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._size -= size
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones until the
+        cache is down to 90% of its size limit."""
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.name[: -len(".json")]))
+                except OSError:
+                    continue
+        entries.sort()
+
+        target = self.max_bytes * 0.9
+        for mtime, key in entries:
+            if now - mtime <= self.ttl and self._size <= target:
+                break
+            self._remove(key)
+            with self._lock:
+                self._counters["evictions"] += 1
+
+    def record(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the current cache size."""
+        with self._lock:
+            return {**self._counters, "bytes": self._size}
+
+
+def _cached_response(
+    entry: Dict, fresh: requests.Response, request: requests.PreparedRequest
+) -> requests.Response:
+    """Build a response from a cache entry and the 304 that revalidated it."""
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = entry["reason"]
+    response.encoding = entry["encoding"]
+    response.url = entry["url"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    for header in FRESH_HEADERS:
+        if header in fresh.headers:
+            response.headers[header] = fresh.headers[header]
+    response._content = entry["body"]
+    response.request = request
+    response.connection = fresh.connection
+    response.elapsed = fresh.elapsed
+    return response
+
+
+class CachingHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTP adapter that revalidates GET requests against a ResponseCache."""
+
+    def __init__(self, cache: ResponseCache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        # Leave requests alone that already are conditional (PyGithub's
+        # GithubObject.update() sends its own If-None-Match)
+        if (
+            request.method != "GET"
+            or "If-None-Match" in request.headers
+            or "If-Modified-Since" in request.headers
+        ):
+            return super().send(request, **kwargs)
+
+        key = self.cache.key(request)
+        entry = self.cache.get(key)
+        if entry:
+            if entry["headers"].get("ETag"):
+                request.headers["If-None-Match"] = entry["headers"]["ETag"]
+            if entry["headers"].get("Last-Modified"):
+                request.headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.cache.record("hits")
+            self.cache.touch(key)
+            return _cached_response(entry, response, request)
+
+        self.cache.record("misses")
+        if response.status_code == 200 and (
+            "ETag" in response.headers or "Last-Modified" in response.headers
+        ):
+            self.cache.put(key, response)
+        return response
+
+
+class CachingHTTPSConnectionClass(HTTPSRequestsConnectionClass):
+    """PyGithub connection class that sends requests through the response cache."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.adapter = CachingHTTPAdapter(
+            get_response_cache(),
+            max_retries=self.retry,
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+        )
+        self.session.mount("https://", self.adapter)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_guard = threading.Lock()
+_installed = False
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide GitHub response cache."""
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def install_response_cache():
+    """Send all GitHub clients created from now on through the response cache."""
+    global _installed
+    with _cache_guard:
+        if not _installed:
+            Requester.injectConnectionClasses(
+                HTTPRequestsConnectionClass, CachingHTTPSConnectionClass
+            )
+            _installed = True
@@ -0,0 +1,131 @@
+"""Shared GitHub API clients."""
+
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from github import Auth, Github, GithubRetry
+from github.GithubException import RateLimitExceededExceedsMaxWait
+from prometheus_swarm.utils.logging import log_key_value
+from src.utils.github_cache import install_response_cache
+
+DEFAULT_TIMEOUT = 15  # seconds per request
+DEFAULT_POOL_SIZE = 32  # keep-alive connections per client
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_MAX_RATE_LIMIT_WAIT = 300  # seconds
+# PyGithub spaces writes out by default to avoid secondary rate limits; reads
+# are not spaced so concurrent callers are not serialized
+DEFAULT_SECONDS_BETWEEN_REQUESTS = 0.0
+DEFAULT_SECONDS_BETWEEN_WRITES = 1.0
+
+
+class RateLimitRetry(GithubRetry):
+    """Retry policy for GitHub requests.
+
+    On top of GithubRetry (Retry-After on 403s, rate limit messages in the
+    body), 429s are retried and an exhausted X-RateLimit-Remaining is waited
+    out until X-RateLimit-Reset even when the body has no rate limit message.
+    Server errors and connection errors back off exponentially.
+    """
+
+    def __init__(self, **kwargs):
+        status_forcelist = list(kwargs.get("status_forcelist", range(500, 600)))
+        if 429 not in status_forcelist:
+            status_forcelist.append(429)
+        kwargs["status_forcelist"] = status_forcelist
+        super().__init__(**kwargs)
+
+    def increment(self, method=None, url=None, response=None, error=None, **kwargs):
+        if (
+            response is not None
+            and response.status in (403, 429)
+            and "Retry-After" not in response.headers
+            and response.headers.get("X-RateLimit-Remaining") == "0"
+        ):
+            retry = super(GithubRetry, self).increment(
+                method, url, response, error, **kwargs
+            )
+            reset = response.headers.get("X-RateLimit-Reset", "")
+            backoff = retry.get_backoff_time()
+            if reset.isdigit():
+                backoff = max(
+                    backoff, int(reset) - datetime.now(timezone.utc).timestamp() + 1
+                )
+            if (
+                self.max_rate_limit_wait is not None
+                and backoff > self.max_rate_limit_wait
+            ):
+                raise RateLimitExceededExceedsMaxWait(
+                    response.status, response.reason, response.headers, wait=backoff
+                )
+            log_key_value("GitHub rate limit exhausted, retrying in", f"{backoff:.0f}s")
+            retry.get_backoff_time = lambda: backoff
+            return retry
+        return super().increment(method, url, response, error, **kwargs)
+
+
+_clients: Dict[Tuple[Optional[str], int], Github] = {}
+_clients_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def get_github_client(
+    token: Optional[str] = None, timeout: Optional[int] = None
+) -> Github:
+    """Get the shared GitHub client for a token.
+
+    Clients are created once per token and reused by every caller, so
+    requests share a keep-alive connection pool instead of opening a new
+    connection and TLS session each time. PyGithub clients are thread-safe.
+
+    Settings come from environment variables: GITHUB_TIMEOUT,
+    GITHUB_POOL_SIZE, GITHUB_MAX_RETRIES, GITHUB_MAX_RATE_LIMIT_WAIT,
+    GITHUB_SECONDS_BETWEEN_REQUESTS and GITHUB_SECONDS_BETWEEN_WRITES.
+    GET requests are revalidated against the on-disk response cache (see
+    src.utils.github_cache) unless GITHUB_CACHE_ENABLED is "false".
+
+    Args:
+        token: GitHub token. Defaults to the GITHUB_TOKEN env var; anonymous if unset.
+        timeout: Optional request timeout in seconds, overriding GITHUB_TIMEOUT
+
+    Returns:
+        Github: The shared client
+    """
+    if token is None:
+        token = os.environ.get("GITHUB_TOKEN")
+    if timeout is None:
+        # PyGithub only accepts whole seconds
+        timeout = max(1, round(_env_float("GITHUB_TIMEOUT", DEFAULT_TIMEOUT)))
+
+    key = (token, timeout)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if os.environ.get("GITHUB_CACHE_ENABLED", "true").lower() != "false":
+                install_response_cache()
+            client = Github(
+                auth=Auth.Token(token) if token else None,
+                timeout=timeout,
+                pool_size=int(os.environ.get("GITHUB_POOL_SIZE", DEFAULT_POOL_SIZE)),
+                retry=RateLimitRetry(
+                    total=int(
+                        os.environ.get("GITHUB_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+                    ),
+                    backoff_factor=1,
+                    max_rate_limit_wait=_env_float(
+                        "GITHUB_MAX_RATE_LIMIT_WAIT", DEFAULT_MAX_RATE_LIMIT_WAIT
+                    ),
+                ),
+                seconds_between_requests=_env_float(
+                    "GITHUB_SECONDS_BETWEEN_REQUESTS", DEFAULT_SECONDS_BETWEEN_REQUESTS
+                ),
+                seconds_between_writes=_env_float(
+                    "GITHUB_SECONDS_BETWEEN_WRITES", DEFAULT_SECONDS_BETWEEN_WRITES
+                ),
+            )
+            _clients[key] = client
+        return client
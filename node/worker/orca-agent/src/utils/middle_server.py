@@ -0,0 +1,247 @@
+"""Client for the middle server API."""
+
+import bisect
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+import requests.adapters
+from prometheus_swarm.utils.logging import log_key_value
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_CONNECT_TIMEOUT = 5  # seconds
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF = 0.5  # seconds, doubled on every retry
+MAX_BACKOFF = 10  # seconds
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf")]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    method: str
+    path: str
+    # Read timeout in seconds; the connect timeout is shared
+    timeout: float
+    # Safe to send again when the first attempt may have reached the server
+    idempotent: bool
+
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    "fetch-to-do": Endpoint("POST", "/api/builder/fetch-to-do", 30, False),
+    "fetch-issue": Endpoint("POST", "/api/builder/fetch-issue", 30, False),
+    "add-pr-to-to-do": Endpoint("POST", "/api/builder/add-pr-to-to-do", 15, True),
+    "add-issue-pr": Endpoint("POST", "/api/builder/add-issue-pr", 15, True),
+    "assign-issue": Endpoint("POST", "/api/builder/assign-issue", 30, False),
+    "add-aggregator-info": Endpoint(
+        "POST", "/api/builder/add-aggregator-info", 15, True
+    ),
+    # Merging and opening PRs happens inside this call
+    "update-audit-result": Endpoint(
+        "POST", "/api/builder/update-audit-result", 120, False
+    ),
+    "check-to-do": Endpoint("POST", "/api/builder/check-to-do", 30, True),
+    "check-issue": Endpoint("POST", "/api/builder/check-issue", 30, True),
+    "get-source-repo": Endpoint(
+        "GET", "/api/builder/get-source-repo/{node_type}/{uuid}", 10, True
+    ),
+}
+
+
+class LatencyHistogram:
+    """Request latencies in fixed buckets, plus error counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.retries = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        with self._lock:
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            if error:
+                self.errors += 1
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "retries": self.retries,
+                "total_seconds": round(self.total, 3),
+                "buckets": {
+                    ("+Inf" if bound == float("inf") else str(bound)): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.buckets)
+                },
+            }
+
+
+class MiddleServerClient:
+    """Middle server client sharing one pooled session between all callers.
+
+    Every endpoint has its own read timeout. Idempotent endpoints are retried
+    on connection errors, timeouts and 429/502/503/504 responses with
+    exponential backoff and full jitter; the others are sent exactly once.
+    Latencies are recorded per endpoint and reported by stats().
+
+    Methods return the requests.Response of the last attempt and raise
+    requests.exceptions.RequestException like requests does, so callers
+    handle errors as before.
+
+    Settings come from environment variables: MIDDLE_SERVER_URL,
+    MIDDLE_SERVER_POOL_SIZE, MIDDLE_SERVER_CONNECT_TIMEOUT and
+    MIDDLE_SERVER_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, base_url: Optional[str] = None):
+        """Initialize the client.
+
+        Args:
+            base_url: Middle server URL. Defaults to MIDDLE_SERVER_URL env var,
+                read on every request.
+        """
+        self._base_url = base_url
+        self.connect_timeout = float(
+            os.environ.get("MIDDLE_SERVER_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)
+        )
+        self.max_attempts = int(
+            os.environ.get("MIDDLE_SERVER_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+        )
+        pool_size = int(os.environ.get("MIDDLE_SERVER_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self.latencies = {name: LatencyHistogram() for name in ENDPOINTS}
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url or os.environ["MIDDLE_SERVER_URL"]
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(MAX_BACKOFF, DEFAULT_BACKOFF * 2**attempt))
+
+    def request(
+        self, name: str, json: Optional[dict] = None, **path_params
+    ) -> requests.Response:
+        """Send a request to a named endpoint.
+
+        Args:
+            name: Key in ENDPOINTS
+            json: Request body
+            **path_params: Values for the placeholders in the endpoint path
+
+        Returns:
+            requests.Response: Response of the last attempt
+        """
+        endpoint = ENDPOINTS[name]
+        url = self.base_url + endpoint.path.format(**path_params)
+        histogram = self.latencies[name]
+        attempts = self.max_attempts if endpoint.idempotent else 1
+
+        for attempt in range(attempts):
+            start = time.monotonic()
+            try:
+                response = self.session.request(
+                    endpoint.method,
+                    url,
+                    json=json,
+                    timeout=(self.connect_timeout, endpoint.timeout),
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                histogram.observe(time.monotonic() - start, error=True)
+                if attempt + 1 >= attempts:
+                    raise
+                reason = type(e).__name__
+            else:
+                histogram.observe(
+                    time.monotonic() - start, error=response.status_code >= 500
+                )
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt + 1 >= attempts
+                ):
+                    return response
+                reason = f"HTTP {response.status_code}"
+
+            histogram.retried()
+            backoff = self._backoff(attempt)
+            log_key_value(
+                "Retrying middle server request",
+                f"{name}: {reason}, attempt {attempt + 2}/{attempts} in {backoff:.1f}s",
+            )
+            time.sleep(backoff)
+
+    def fetch_task(self, task_type: str, payload: dict) -> requests.Response:
+        """Fetch a todo ("worker") or an issue ("leader") to work on."""
+        name = "fetch-to-do" if task_type == "worker" else "fetch-issue"
+        return self.request(name, json=payload)
+
+    def record_pr(self, node_type: str, payload: dict) -> requests.Response:
+        """Record a worker's todo PR or a leader's issue PR."""
+        name = "add-pr-to-to-do" if node_type == "worker" else "add-issue-pr"
+        return self.request(name, json=payload)
+
+    def assign_issue(self, task_id: str, github_username: str) -> requests.Response:
+        return self.request(
+            "assign-issue",
+            json={"taskId": task_id, "githubUsername": github_username},
+        )
+
+    def add_aggregator_info(self, payload: dict) -> requests.Response:
+        return self.request("add-aggregator-info", json=payload)
+
+    def update_audit_result(self, task_id: str, round_number: int) -> requests.Response:
+        return self.request(
+            "update-audit-result", json={"taskId": task_id, "round": round_number}
+        )
+
+    def check_pr(self, node_type: str, payload: dict) -> requests.Response:
+        """Check a worker's todo PR or a leader's issue PR."""
+        name = "check-to-do" if node_type == "worker" else "check-issue"
+        return self.request(name, json=payload)
+
+    def get_source_repo(self, node_type: str, uuid: str) -> requests.Response:
+        return self.request("get-source-repo", node_type=node_type, uuid=uuid)
+
+    def stats(self) -> Dict[str, dict]:
+        """Get the latency histogram of every endpoint that has been called."""
+        return {
+            name: histogram.to_dict()
+            for name, histogram in self.latencies.items()
+            if histogram.count
+        }
+
+
+_client: Optional[MiddleServerClient] = None
+_client_lock = threading.Lock()
+
+
+def get_middle_server() -> MiddleServerClient:
+    """Get the shared middle server client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MiddleServerClient()
+        return _client
@@ -0,0 +1,147 @@
+"""Batched pull request metadata lookups through the GitHub GraphQL API."""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from github import Github
+from github.GithubException import GithubException
+from src.utils.github_client import get_github_client
+
+DEFAULT_BATCH_SIZE = 50  # pull requests per GraphQL query
+
+# Matched as a prefix, so URLs like .../pull/1/files are accepted too
+PR_URL_PATTERN = re.compile(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)")
+
+PULL_REQUEST_FIELDS = """
+fragment PullRequestFields on PullRequest {
+  number
+  url
+  body
+  state
+  author { login }
+  headRefName
+  baseRefName
+  headRepository { name nameWithOwner owner { login } }
+  baseRepository { name nameWithOwner owner { login } }
+}
+"""
+
+
+def _pull_request_to_dict(pull: dict) -> dict:
+    head = pull.get("headRepository") or {}
+    base = pull.get("baseRepository") or {}
+    return {
+        "number": pull["number"],
+        "url": pull["url"],
+        "body": pull.get("body") or "",
+        "state": pull["state"],
+        "author": (pull.get("author") or {}).get("login"),
+        "head_owner": (head.get("owner") or {}).get("login"),
+        "head_repo": head.get("nameWithOwner"),
+        "head_ref": pull["headRefName"],
+        "base_owner": (base.get("owner") or {}).get("login"),
+        "base_repo": base.get("nameWithOwner"),
+        "base_ref": pull["baseRefName"],
+    }
+
+
+def _fetch_batch(gh: Github, pr_urls: List[str]) -> Dict[str, Optional[dict]]:
+    """Fetch up to one batch of PRs in a single GraphQL query.
+
+    Each PR gets its own aliased field, so a missing or inaccessible PR only
+    nulls its alias instead of failing the whole query.
+    """
+    declarations = []
+    fields = []
+    variables = {}
+    for i, pr_url in enumerate(pr_urls):
+        owner, repo, number = PR_URL_PATTERN.match(pr_url).groups()
+        declarations.append(f"$owner{i}: String!, $repo{i}: String!, $number{i}: Int!")
+        fields.append(
+            f"pr{i}: repository(owner: $owner{i}, name: $repo{i}) "
+            f"{{ pullRequest(number: $number{i}) {{ ...PullRequestFields }} }}"
+        )
+        variables.update(
+            {f"owner{i}": owner, f"repo{i}": repo, f"number{i}": int(number)}
+        )
+    query = (
+        f"query({', '.join(declarations)}) {{\n"
+        + "\n".join(fields)
+        + "\n}\n"
+        + PULL_REQUEST_FIELDS
+    )
+
+    requester = gh.requester
+    headers, data = requester.requestJsonAndCheck(
+        "POST",
+        requester.graphql_url,
+        input={"query": query, "variables": variables},
+    )
+    if not data.get("data"):
+        raise GithubException(400, data, headers)
+
+    results = {}
+    for i, pr_url in enumerate(pr_urls):
+        pull = (data["data"].get(f"pr{i}") or {}).get("pullRequest")
+        results[pr_url] = _pull_request_to_dict(pull) if pull else None
+    return results
+
+
+def _fetch_isolated(gh: Github, pr_urls: List[str]) -> Dict[str, Optional[dict]]:
+    """Fetch a batch of PRs, splitting it in half when its query fails.
+
+    A timeout or server error then only costs the PRs that keep failing on
+    their own, which map to None, instead of the whole batch.
+    """
+    try:
+        return _fetch_batch(gh, pr_urls)
+    except Exception as e:
+        if len(pr_urls) == 1:
+            print(f"Failed to fetch PR {pr_urls[0]}: {str(e)}")
+            return {pr_urls[0]: None}
+        print(f"Failed to fetch {len(pr_urls)} PRs, retrying in halves: {str(e)}")
+        half = len(pr_urls) // 2
+        return {
+            **_fetch_isolated(gh, pr_urls[:half]),
+            **_fetch_isolated(gh, pr_urls[half:]),
+        }
+
+
+def fetch_pull_requests(
+    pr_urls: List[str], gh: Optional[Github] = None
+) -> Dict[str, Optional[dict]]:
+    """Fetch metadata for many pull requests in a few GraphQL queries.
+
+    PRs are looked up GITHUB_GRAPHQL_BATCH_SIZE (default 50) at a time, so N
+    PRs cost about N/50 requests instead of a get_repo and get_pull each.
+
+    Args:
+        pr_urls: PR URLs (https://github.com/owner/repo/pull/number)
+        gh: GitHub client to use. Defaults to the shared client for GITHUB_TOKEN.
+
+    Returns:
+        Dict[str, Optional[dict]]: PR metadata by URL, as given. URLs that are
+        malformed, point to PRs that don't exist or aren't visible, or keep
+        failing to fetch map to None.
+        Metadata keys are number, url, body, state, author, head_owner,
+        head_repo, head_ref, base_owner, base_repo and base_ref.
+    """
+    if gh is None:
+        gh = get_github_client()
+    batch_size = int(os.environ.get("GITHUB_GRAPHQL_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+
+    results = {}
+    valid_urls = []
+    for pr_url in dict.fromkeys(pr_urls):
+        if PR_URL_PATTERN.match(pr_url.strip()):
+            valid_urls.append(pr_url)
+        else:
+            results[pr_url] = None
+
+    for start in range(0, len(valid_urls), batch_size):
+        batch = valid_urls[start : start + batch_size]
+        fetched = _fetch_isolated(gh, [pr_url.strip() for pr_url in batch])
+        for pr_url in batch:
+            results[pr_url] = fetched[pr_url.strip()]
+    return results
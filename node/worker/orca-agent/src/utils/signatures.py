@@ -3,15 +3,46 @@
 import base58
 import nacl.signing
 import json
-from typing import Dict, Optional, Any, Union
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Any, Tuple, Union
 from prometheus_swarm.utils.logging import log_error
 
+# Verified (signed message, staking key) pairs kept; the same staking
+# signatures are checked by several validation steps in a round
+SIGNATURE_CACHE_SIZE = int(os.environ.get("SIGNATURE_CACHE_SIZE", 4096))
+VERIFY_KEY_CACHE_SIZE = int(os.environ.get("VERIFY_KEY_CACHE_SIZE", 1024))
+
+
+@lru_cache(maxsize=VERIFY_KEY_CACHE_SIZE)
+def _verify_key(staking_key: str) -> nacl.signing.VerifyKey:
+    return nacl.signing.VerifyKey(base58.b58decode(staking_key))
+
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _verified_message(signed_message: str, staking_key: str) -> str:
+    # Failed verifications raise and are therefore never cached
+    message = _verify_key(staking_key).verify(base58.b58decode(signed_message))
+    return message.decode("utf-8")
+
+
+def signature_cache_info() -> Dict[str, Dict[str, int]]:
+    """Get hit/miss counters of the signature and verify key caches."""
+    return {
+        name: cache.cache_info()._asdict()
+        for name, cache in [
+            ("signatures", _verified_message),
+            ("verify_keys", _verify_key),
+        ]
+    }
+
 
 def verify_signature(signed_message: str, staking_key: str) -> Dict[str, Any]:
     """Verify a signature locally using PyNaCl.
 
     This function verifies signatures created by the Koii task node using nacl.sign().
-    The signatures are base58 encoded before being sent.
+    The signatures are base58 encoded before being sent. Successful
+    verifications are cached, so checking the same signature again is free.
 
     Args:
         signed_message (str): Base58 encoded signed message
@@ -23,19 +54,7 @@ def verify_signature(signed_message: str, staking_key: str) -> Dict[str, Any]:
             - error (str): Error message if verification fails
     """
     try:
-        # Decode base58 signature and public key
-        signed_bytes = base58.b58decode(signed_message)
-        pubkey_bytes = base58.b58decode(staking_key)
-
-        # Create verify key from public key
-        verify_key = nacl.signing.VerifyKey(pubkey_bytes)
-
-        # Verify and get message
-        message = verify_key.verify(signed_bytes)
-
-        # Decode message from bytes to string
-        decoded_message = message.decode("utf-8")
-        return {"data": decoded_message}
+        return {"data": _verified_message(signed_message, staking_key)}
     except Exception as e:
         return {"error": f"Verification failed: {str(e)}"}
 
@@ -92,3 +111,24 @@ def verify_and_parse_signature(
         return {"error": "Failed to parse signature payload as JSON"}
     except Exception as e:
         return {"error": f"Error validating signature payload: {str(e)}"}
+
+
+def verify_many(
+    signatures: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+) -> List[Dict[str, Union[Dict[str, Any], str]]]:
+    """Verify a batch of signatures, e.g. all submissions of a distribution list.
+
+    Identical (signed message, staking key) pairs are only verified once, and
+    each staking key is only decoded once.
+
+    Args:
+        signatures: (signed_message, staking_key, expected_values) tuples, as
+            passed to verify_and_parse_signature
+
+    Returns:
+        list: verify_and_parse_signature results, in input order
+    """
+    return [
+        verify_and_parse_signature(signed_message, staking_key, expected_values)
+        for signed_message, staking_key, expected_values in signatures
+    ]
@@ -1,10 +1,11 @@
 """Audit workflow implementation."""
 
 import os
-from github import Github
+import subprocess
+from src.utils.github_client import get_github_client
 from prometheus_swarm.workflows.base import Workflow
 from prometheus_swarm.utils.logging import log_section, log_key_value, log_error
-from prometheus_swarm.workflows.utils import (
+from src.workflows.utils import (
     check_required_env_vars,
     validate_github_auth,
     setup_repository,
@@ -59,7 +60,7 @@ class AuditWorkflow(Workflow):
 
         # Get PR info from GitHub
         try:
-            gh = Github(self.context["github_token"])
+            gh = get_github_client(self.context["github_token"])
             repo = gh.get_repo(
                 f"{self.context['repo_owner']}/{self.context['repo_name']}"
             )
@@ -77,10 +78,12 @@ class AuditWorkflow(Workflow):
         log_section("SETTING UP REPOSITORY")
         repo_url = f"https://github.com/{self.context['repo_owner']}/{self.context['repo_name']}"
 
+        # The audit only reads the PR, so upstream is cloned without a fork
         result = setup_repository(
             repo_url,
             github_token=self.context["github_token"],
             github_username=self.context["github_username"],
+            read_only=True,
         )
         if not result["success"]:
             raise Exception(result.get("error", "Repository setup failed"))
@@ -89,18 +92,32 @@ class AuditWorkflow(Workflow):
         self.context["repo_path"] = result["data"]["clone_path"]
         self.original_dir = result["data"]["original_dir"]
 
-        # Enter repo directory
-        os.chdir(self.context["repo_path"])
-
-        # Add remote for PR's repository and fetch the branch
-        os.system(
-            f"git remote add pr_source https://github.com/{pr.head.repo.full_name}"
-        )
-        os.system(f"git fetch pr_source {pr.head.ref}")
-        os.system("git checkout FETCH_HEAD")
+        # Fetch the PR branch by URL; a named remote would be shared with other
+        # workspaces of the same repository. The clone is upstream, so if this
+        # fails the audit must stop rather than audit the default branch.
+        for command in (
+            [
+                "git",
+                "fetch",
+                f"https://github.com/{pr.head.repo.full_name}",
+                pr.head.ref,
+            ],
+            ["git", "checkout", "FETCH_HEAD"],
+        ):
+            result = subprocess.run(
+                command,
+                cwd=self.context["repo_path"],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise Exception(
+                    f"Failed to check out the PR branch: {' '.join(command[:2])}: "
+                    f"{result.stderr.strip()}"
+                )
 
         # Get current files for context
-        self.context["current_files"] = get_current_files()
+        self.context["current_files"] = get_current_files(self.context["repo_path"])
 
     def cleanup(self):
         """Clean up repository."""
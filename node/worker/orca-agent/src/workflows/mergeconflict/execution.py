@@ -1,6 +1,6 @@
 """Merge conflict workflow execution."""
 
-from github import Github
+from src.utils.github_client import get_github_client
 from prometheus_swarm.workflows.base import WorkflowExecution
 from src.workflows.mergeconflict.workflow import MergeConflictWorkflow
 from src.workflows.mergeconflict.prompts import PROMPTS
@@ -53,7 +53,7 @@ class MergeConflictExecution(WorkflowExecution):
         source_owner, source_repo = self._parse_github_url(repo_url)
 
         # Get upstream repo info using original source fork
-        gh = Github(os.getenv(github_token_env_var))
+        gh = get_github_client(os.getenv(github_token_env_var))
         source_fork = gh.get_repo(f"{source_owner}/{source_repo}")
         if not source_fork.fork:
             raise Exception("Source repository is not a fork")
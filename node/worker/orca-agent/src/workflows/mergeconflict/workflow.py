@@ -1,12 +1,13 @@
 """Merge conflict resolver workflow implementation."""
 
 import os
-from github import Github
+import subprocess
+from src.utils.github_client import get_github_client
 from prometheus_swarm.workflows.base import Workflow
 from prometheus_swarm.utils.logging import log_section, log_key_value, log_error
 from prometheus_swarm.tools.github_operations.parser import extract_section
-from prometheus_swarm.utils.signatures import verify_and_parse_signature
-from prometheus_swarm.workflows.utils import (
+from src.utils.signatures import verify_and_parse_signature
+from src.workflows.utils import (
     check_required_env_vars,
     setup_repository,
     cleanup_repository,
@@ -87,7 +88,7 @@ class MergeConflictWorkflow(Workflow):
         )
 
         # Get upstream repo info and add to context
-        gh = Github(self.context["github_token"])
+        gh = get_github_client(self.context["github_token"])
         source_fork = gh.get_repo(f"{source_fork_owner}/{source_repo_name}")
         upstream = source_fork.parent
 
@@ -198,25 +199,25 @@ class MergeConflictWorkflow(Workflow):
             self.context["repo_owner"] = self.context["upstream"]["owner"]
             self.context["repo_name"] = self.context["upstream"]["name"]
 
-            # Change to repo directory
             self.context["repo_path"] = result["data"]["clone_path"]
-            os.chdir(self.context["repo_path"])
-
-            # Configure source remote if we don't own the source fork
-            if not self.is_source_fork_owner:
-                os.system(f"git remote add source {self.context['source_fork']['url']}")
-                os.system("git fetch source")
+            self.original_dir = result["data"]["original_dir"]
+
+            # Fetch from the source fork by URL if we don't own it; a named remote
+            # would be shared with other workspaces of the same repository
+            self.source_remote = (
+                "origin"
+                if self.is_source_fork_owner
+                else self.context["source_fork"]["url"]
+            )
 
             # Create merge branch from source branch
             source_branch = self.context["source_fork"]["branch"]
             head_branch = self.context["head_branch"]
 
             # Fetch source branch and create merge branch from it
-            os.system(
-                f"git fetch {'origin' if self.is_source_fork_owner else 'source'} {source_branch}"
-            )
-            os.system(f"git checkout -b {head_branch} FETCH_HEAD")
-            os.system(f"git push origin {head_branch}")
+            self._git(f"git fetch {self.source_remote} {source_branch}")
+            self._git(f"git checkout -B {head_branch} FETCH_HEAD")
+            self._git(f"git push origin {head_branch}")
 
             return True
 
@@ -224,6 +225,18 @@ class MergeConflictWorkflow(Workflow):
             log_error(e, "Failed to set up repository")
             return False
 
+    def _git(self, command):
+        """Run a git command in the workspace and return its combined output."""
+        result = subprocess.run(
+            command,
+            shell=True,
+            cwd=self.context["repo_path"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return result.stdout
+
     def merge_pr(self, pr_url, pr_title):
         """Merge a single PR into the head branch."""
         # Extract PR info from URL
@@ -234,7 +247,7 @@ class MergeConflictWorkflow(Workflow):
 
         try:
             # Get the actual PR author from the GitHub API
-            gh = Github(self.context["github_token"])
+            gh = get_github_client(self.context["github_token"])
             repo = gh.get_repo(f"{pr_repo_owner}/{pr_repo_name}")
             pr = repo.get_pull(pr_number)
             pr_author = pr.user.login  # Get the actual author's GitHub username
@@ -247,57 +260,49 @@ class MergeConflictWorkflow(Workflow):
                 f"Attempting to merge PR #{pr_number} from {pr_repo_owner}/{pr_repo_name}"
             )
             print(f"Creating branch: {pr_branch}")
-            print(f"Current directory: {os.getcwd()}")
+            print(f"Repository: {self.context['repo_path']}")
             print("Git remotes:")
-            remotes_output = os.popen("git remote -v 2>&1").read()
+            remotes_output = self._git("git remote -v")
             print(remotes_output)
 
             # Always create a new branch with PR contents, regardless of fork ownership
             if self.is_source_fork_owner:
                 # Even though we own the fork, create a new branch from the PR's HEAD
                 print("Fetching PR from origin (we own the fork)")
-                fetch_output = os.popen(
-                    f"git fetch origin pull/{pr_number}/head 2>&1"
-                ).read()
+                fetch_output = self._git(f"git fetch origin pull/{pr_number}/head")
                 print(f"Fetch output: {fetch_output}")
-                checkout_output = os.popen(
-                    f"git checkout -b {pr_branch} FETCH_HEAD 2>&1"
-                ).read()
+                checkout_output = self._git(f"git checkout -B {pr_branch} FETCH_HEAD")
                 print(f"Checkout output: {checkout_output}")
             else:
                 # Fetch PR from source fork into new branch
                 print("Fetching PR from source remote")
-                fetch_output = os.popen(
-                    f"git fetch source pull/{pr_number}/head 2>&1"
-                ).read()
+                fetch_output = self._git(
+                    f"git fetch {self.source_remote} pull/{pr_number}/head"
+                )
                 print(f"Fetch output: {fetch_output}")
-                checkout_output = os.popen(
-                    f"git checkout -b {pr_branch} FETCH_HEAD 2>&1"
-                ).read()
+                checkout_output = self._git(f"git checkout -B {pr_branch} FETCH_HEAD")
                 print(f"Checkout output: {checkout_output}")
 
             # Push PR branch to our fork for auditing
             print(f"Pushing branch {pr_branch} to origin")
-            push_output = os.popen(f"git push origin {pr_branch} 2>&1").read()
+            push_output = self._git(f"git push origin {pr_branch}")
             print(f"Push output: {push_output}")
 
             # Try to merge into head branch
             print(f"Checking out head branch: {self.context['head_branch']}")
-            checkout_output = os.popen(
-                f"git checkout {self.context['head_branch']} 2>&1"
-            ).read()
+            checkout_output = self._git(f"git checkout {self.context['head_branch']}")
             print(f"Checkout output: {checkout_output}")
 
             print(f"Attempting to merge {pr_branch}")
-            merge_output = os.popen(
-                f"git merge --no-commit --no-ff {pr_branch} 2>&1"
-            ).read()
+            merge_output = self._git(f"git merge --no-commit --no-ff {pr_branch}")
             print(f"Merge output: {merge_output}")
 
             # Handle conflicts through the ConflictResolutionPhase
             if "CONFLICT" in merge_output:
                 print("Merge conflicts detected, attempting resolution")
-                self.context["current_files"] = get_current_files()
+                self.context["current_files"] = get_current_files(
+                    self.context["repo_path"]
+                )
                 resolution_phase = ConflictResolutionPhase(
                     workflow=self,
                     conversation_id=getattr(
@@ -315,15 +320,13 @@ class MergeConflictWorkflow(Workflow):
 
             # Commit the merge with branch name and PR URL
             print("Committing merge")
-            commit_output = os.popen(
-                f'git commit -m "Merged branch {pr_branch} for PR {pr_url}" 2>&1'
-            ).read()
+            commit_output = self._git(
+                f'git commit -m "Merged branch {pr_branch} for PR {pr_url}"'
+            )
             print(f"Commit output: {commit_output}")
 
             print(f"Pushing merged changes to {self.context['head_branch']}")
-            push_output = os.popen(
-                f"git push origin {self.context['head_branch']} 2>&1"
-            ).read()
+            push_output = self._git(f"git push origin {self.context['head_branch']}")
             print(f"Push output: {push_output}")
 
             # Only track successfully merged PRs
@@ -341,15 +344,15 @@ class MergeConflictWorkflow(Workflow):
 
         except Exception as e:
             log_error(e, f"Failed to merge PR #{pr_number}")
-            print(f"Current directory: {os.getcwd()}")
+            print(f"Repository: {self.context['repo_path']}")
             print("Git status:")
-            status_output = os.popen("git status 2>&1").read()
+            status_output = self._git("git status")
             print(status_output)
             print("Git branch:")
-            branch_output = os.popen("git branch 2>&1").read()
+            branch_output = self._git("git branch")
             print(branch_output)
             print("Git log:")
-            log_output = os.popen("git log --oneline -n 5 2>&1").read()
+            log_output = self._git("git log --oneline -n 5")
             print(log_output)
             return {"success": False, "message": str(e)}
 
@@ -361,7 +364,7 @@ class MergeConflictWorkflow(Workflow):
                 return None
 
             # Get list of PRs to process
-            gh = Github(self.context["github_token"])
+            gh = get_github_client(self.context["github_token"])
             source_fork = gh.get_repo(
                 f"{self.source_fork_owner}/{self.context['source_fork']['name']}"
             )
@@ -415,7 +418,7 @@ class MergeConflictWorkflow(Workflow):
 
             # Run tests and fix any issues
             print("\nRunning test verification phase")
-            self.context["current_files"] = get_current_files()
+            self.context["current_files"] = get_current_files(self.context["repo_path"])
             test_phase = TestVerificationPhase(
                 workflow=self, conversation_id=self.conversation_id
             )
@@ -3,12 +3,13 @@
 import os
 import csv
 from pathlib import Path
-from github import Github, GithubException
+from github import GithubException
 from prometheus_swarm.workflows.base import WorkflowExecution
 from prometheus_swarm.workflows.utils import create_remote_branch
 from prometheus_swarm.utils.logging import log_key_value, log_section
 from src.workflows.task.workflow import TaskWorkflow
 from src.workflows.task.prompts import PROMPTS
+from src.utils.github_client import get_github_client
 
 from typing import List, Optional, Dict
 
@@ -84,7 +85,7 @@ class TaskExecution(WorkflowExecution):
 
         # Set up leader's fork
         self.leader_token = os.getenv(leader_token_env_var)
-        leader_gh = Github(self.leader_token)
+        leader_gh = get_github_client(self.leader_token)
         source = leader_gh.get_repo(f"{self.source_owner}/{self.source_repo}")
         self.leader_user = leader_gh.get_user()
 
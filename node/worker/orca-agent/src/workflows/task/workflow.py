@@ -2,7 +2,7 @@
 
 import os
 import time
-from github import Github
+from src.utils.github_client import get_github_client
 from git import Repo
 from prometheus_swarm.workflows.base import Workflow
 from prometheus_swarm.utils.logging import (
@@ -11,7 +11,7 @@ from prometheus_swarm.utils.logging import (
     log_error,
     log_value,
 )
-from prometheus_swarm.workflows.utils import (
+from src.workflows.utils import (
     check_required_env_vars,
     validate_github_auth,
     setup_repository,
@@ -76,7 +76,7 @@ class TaskWorkflow(Workflow):
         log_section("SETTING UP REPOSITORY")
 
         # Initialize GitHub client
-        gh = Github(self.context["github_token"])
+        gh = get_github_client(self.context["github_token"])
 
         # Always fork from the aggregator repo first
         repo_url = f"https://github.com/{self.context['repo_owner']}/{self.context['repo_name']}"
@@ -94,9 +94,6 @@ class TaskWorkflow(Workflow):
         self.context["repo_path"] = result["data"]["clone_path"]
         self.original_dir = result["data"]["original_dir"]
 
-        # Enter repo directory
-        os.chdir(self.context["repo_path"])
-
         # If we have dependencies, merge them in
         if self.context["dependency_pr_urls"]:
             log_section("HANDLING DEPENDENCIES")
@@ -121,15 +118,13 @@ class TaskWorkflow(Workflow):
                     )
                     log_key_value("Head ref", pr.head.ref)
 
-                    # Add remote for the PR's repository
+                    # Fetch the specific branch from the PR's repository by URL,
+                    # since remotes are shared with other workspaces
                     remote_name = f"dependency_{pr.head.sha[:7]}"
                     remote_url = pr.head.repo.clone_url
-                    repo.create_remote(remote_name, remote_url)
-
-                    # Fetch the specific branch
                     repo.git.fetch(
-                        remote_name,
-                        f"{pr.head.ref}:refs/remotes/{remote_name}/{pr.head.ref}",
+                        remote_url,
+                        f"+{pr.head.ref}:refs/remotes/{remote_name}/{pr.head.ref}",
                     )
 
                     # Merge the dependency branch
@@ -147,7 +142,7 @@ class TaskWorkflow(Workflow):
                     raise
 
         # Get current files for context
-        self.context["current_files"] = get_current_files()
+        self.context["current_files"] = get_current_files(self.context["repo_path"])
 
     def cleanup(self):
         """Clean up repository."""
@@ -175,7 +170,9 @@ class TaskWorkflow(Workflow):
                 )
 
                 # Get current files
-                self.context["current_files"] = get_current_files()
+                self.context["current_files"] = get_current_files(
+                    self.context["repo_path"]
+                )
 
                 # Run implementation
                 phase_class = (
@@ -225,7 +222,7 @@ class TaskWorkflow(Workflow):
                 time.sleep(5)  # Brief pause before retry
 
             # Create PR
-            self.context["current_files"] = get_current_files()
+            self.context["current_files"] = get_current_files(self.context["repo_path"])
 
             # Base was already set in setup()
             log_value(
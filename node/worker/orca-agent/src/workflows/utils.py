@@ -2,14 +2,23 @@
 
 import os
 import shutil
+import time
+from datetime import datetime, timezone
 from github import Github
 from git import Repo
 from prometheus_swarm.utils.logging import log_key_value, log_error
 from src.tools.file_operations.implementations import list_files
 from src.tools.github_operations.parser import extract_section
+from src.utils.github_client import get_github_client
 from src.utils.signatures import verify_and_parse_signature
+from src.workspace import get_workspace_manager
 from typing import Optional, Tuple
 
+# How long a new fork may take to get its commits, and the polling backoff
+FORK_READY_TIMEOUT = 60  # seconds
+FORK_READY_FIRST_DELAY = 0.5  # seconds
+FORK_READY_MAX_DELAY = 8  # seconds
+
 
 def get_fork_name(
     source_owner: str, source_repo_url: str, github_token: str | None = None
@@ -26,7 +35,7 @@ def get_fork_name(
     """
     # Set up GitHub client
     if isinstance(github_token, str):
-        gh = Github(github_token)
+        gh = get_github_client(github_token)
     elif isinstance(github_token, Github):
         gh = github_token
     else:
@@ -63,7 +72,7 @@ def check_required_env_vars(env_vars: list[str]):
 def validate_github_auth(github_token: str, github_username: str):
     """Validate GitHub authentication."""
     try:
-        gh = Github(github_token)
+        gh = get_github_client(github_token)
         user = gh.get_user()
         username = user.login
         if username != github_username:
@@ -97,6 +106,7 @@ def setup_repository(
     github_token: str = None,
     github_username: str = None,
     skip_fork: bool = False,
+    read_only: bool = False,
 ) -> dict:
     """Set up a repository by cloning and configuring it.
 
@@ -105,10 +115,13 @@ def setup_repository(
         github_token: Optional GitHub token for authentication
         github_username: Optional GitHub username for Git config
         skip_fork: Optional flag to skip forking and clone directly
+        read_only: Optional flag for workflows that never push, such as
+            audits. The repository is cloned directly, without a fork.
 
     Returns:
         dict: Result with success status, repository details, and paths
     """
+    skip_fork = skip_fork or read_only
     try:
         # Extract owner/repo from URL
         parts = repo_url.strip("/").split("/")
@@ -128,24 +141,9 @@ def setup_repository(
             fork_owner = repo_owner
             fork_name = repo_name
 
-        # Generate sequential repo path
-        base_dir = os.path.abspath("./repos")
-        os.makedirs(base_dir, exist_ok=True)
-
-        counter = 0
-        while True:
-            candidate_path = os.path.join(base_dir, f"repo_{counter}")
-            if not os.path.exists(candidate_path):
-                repo_path = candidate_path
-                break
-            counter += 1
-
-        # Clean existing repository
-        if os.path.exists(repo_path):
-            shutil.rmtree(repo_path)
-
-        # Create parent directory
-        os.makedirs(os.path.dirname(repo_path), exist_ok=True)
+        # Reserve a workspace directory
+        workspaces = get_workspace_manager()
+        repo_path = workspaces.allocate_path()
 
         # Save original directory
         original_dir = os.getcwd()
@@ -156,19 +154,30 @@ def setup_repository(
         else:
             auth_url = clone_url
 
-        # Clone the repository
+        # Check out a worktree of the cached mirror, falling back to a network clone
         log_key_value("Cloning repository", clone_url)
         log_key_value("Clone path", repo_path)
 
-        repo = Repo.clone_from(auth_url, repo_path)
+        try:
+            repo = workspaces.acquire(
+                f"{fork_owner}/{fork_name}", auth_url, path=repo_path
+            )
+        except Exception as e:
+            log_error(e, "Workspace checkout failed, cloning directly")
+            shutil.rmtree(repo_path, ignore_errors=True)
+            repo = Repo.clone_from(auth_url, repo_path)
 
         # Configure Git user info if username provided
         if github_username:
             _setup_git_user_config(repo, github_username)
 
         # Add upstream remote if this is a fork
+        # (workspaces share remotes through their mirror, so it may already exist)
         if not skip_fork:
-            repo.create_remote("upstream", repo_url)
+            if "upstream" in [remote.name for remote in repo.remotes]:
+                repo.remote("upstream").set_url(repo_url)
+            else:
+                repo.create_remote("upstream", repo_url)
 
         return {
             "success": True,
@@ -195,26 +204,68 @@ def setup_repository(
 
 
 def cleanup_repository(original_dir: str, repo_path: str):
-    """Clean up repository directory and return to original directory.
+    """Clean up repository directory.
+
+    Workflows no longer change into their repository, but callers that still do
+    are moved back to the original directory before it is removed.
 
     Args:
         original_dir: Original directory to return to
         repo_path: Repository path to clean up
     """
-    os.chdir(original_dir)
-    if os.path.exists(repo_path):
-        shutil.rmtree(repo_path)
+    repo_dir = os.path.abspath(repo_path)
+    cwd = os.getcwd()
+    if cwd == repo_dir or cwd.startswith(repo_dir + os.sep):
+        os.chdir(original_dir)
+    workspaces = get_workspace_manager()
+    if workspaces.release(repo_path):
+        return
+    try:
+        # Deleted in the background, see Trash
+        workspaces.trash.discard(repo_path)
+    finally:
+        # A direct clone into an allocated directory
+        workspaces.allocator.release(repo_path)
+
 
+def get_current_files(repo_path: str = None):
+    """Get current files in repository.
 
-def get_current_files():
-    """Get current files in repository."""
-    files_result = list_files(".")
+    Args:
+        repo_path: Repository to list. Defaults to the current directory.
+    """
+    files_result = list_files(".", repo_path=repo_path)
     if not files_result["success"]:
         raise Exception(f"Failed to get file list: {files_result['message']}")
 
     return files_result["data"]["files"]
 
 
+def _wait_for_fork(fork, timeout: float) -> bool:
+    """Wait until a new fork has its default branch.
+
+    GitHub creates forks in the background. The fork is polled with an
+    exponential backoff, so a fork that is ready quickly is used quickly.
+
+    Returns:
+        bool: Whether the fork became ready before the timeout
+    """
+    log_key_value("Waiting for fork to be ready", fork.full_name)
+    deadline = time.monotonic() + timeout
+    delay = FORK_READY_FIRST_DELAY
+    while True:
+        try:
+            fork.get_branch(fork.default_branch)
+            return True
+        except Exception:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                log_key_value("Fork not ready, continuing", fork.full_name)
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, FORK_READY_MAX_DELAY)
+
+
 def _fork_repository(
     repo_full_name: str,
     github_token: Optional[str] = None,
@@ -232,7 +283,7 @@ def _fork_repository(
     """
     try:
         token = github_token or os.environ["GITHUB_TOKEN"]
-        gh = Github(token)
+        gh = get_github_client(token)
         source_repo = gh.get_repo(repo_full_name)
 
         # Get authenticated user
@@ -246,22 +297,22 @@ def _fork_repository(
         try:
             fork = gh.get_repo(f"{username}/{repo_name}")
             log_key_value("Using existing fork", fork.html_url)
+            created = False
         except Exception:
             # Create fork if it doesn't exist
             fork = user.create_fork(source_repo, name=repo_name)
             log_key_value("Created new fork", fork.html_url)
-
-        # Wait for fork to be ready
-        log_key_value("Waiting for fork to be ready", "")
-        max_retries = 10
-        for _ in range(max_retries):
-            try:
-                fork.get_commits().get_page(0)
-                break
-            except Exception:
-                import time
-
-                time.sleep(1)
+            created = True
+
+        # Existing forks are ready, unless another process only just created one
+        age = 0
+        if not created:
+            created_at = fork.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            age = (datetime.now(timezone.utc) - created_at).total_seconds()
+        if age < FORK_READY_TIMEOUT:
+            _wait_for_fork(fork, FORK_READY_TIMEOUT - age)
 
         return {
             "success": True,
@@ -387,7 +438,7 @@ def create_remote_branch(
     """
     try:
         token = github_token or os.environ["GITHUB_TOKEN"]
-        gh = Github(token)
+        gh = get_github_client(token)
         repo = gh.get_repo(f"{repo_owner}/{repo_name}")
 
         # Get the base branch's latest commit
@@ -0,0 +1,19 @@
+"""Workspace package."""
+
+from .mirror_cache import RepoMirrorCache, get_mirror_cache
+from .leases import WorkspaceAllocator, WorkspaceQuotaExceeded
+from .trash import Trash
+from .manager import WorkspaceManager, get_workspace_manager
+from .dependency_cache import DependencyCache, get_dependency_cache
+
+__all__ = [
+    "RepoMirrorCache",
+    "get_mirror_cache",
+    "WorkspaceAllocator",
+    "WorkspaceQuotaExceeded",
+    "Trash",
+    "WorkspaceManager",
+    "get_workspace_manager",
+    "DependencyCache",
+    "get_dependency_cache",
+]
@@ -0,0 +1,363 @@
+"""Installed dependencies shared between task workspaces."""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+from .manager import get_workspace_manager
+from .mirror_cache import USED_MARKER, _dir_size, _mtime, _touch
+
+DEFAULT_CACHE_DIR = "./repos/.deps"
+DEFAULT_MAX_BYTES = 10 * 1024**3  # 10 GiB
+
+# Directory of a workspace holding what each package manager installs
+VENV_DIR = ".venv"
+ARTIFACTS = {
+    "pip": VENV_DIR,
+    "npm": "node_modules",
+    "yarn": "node_modules",
+    "pnpm": "node_modules",
+}
+
+# Files that decide what gets installed, hashed into the cache key
+MANIFESTS = {
+    "pip": ["requirements.txt"],
+    "npm": ["package.json", "package-lock.json", "npm-shrinkwrap.json", ".npmrc"],
+    "yarn": ["package.json", "yarn.lock", ".yarnrc", ".yarnrc.yml", ".npmrc"],
+    "pnpm": ["package.json", "pnpm-lock.yaml", "pnpm-workspace.yaml", ".npmrc"],
+}
+
+# Requirements that point into the checkout (editable installs, includes,
+# local paths) can't be reused by another checkout
+LOCAL_REQUIREMENT = re.compile(
+    r"^\s*(-e|--editable|-r|--requirement|-c|--constraint|\.|/|file:)|@\s*file:",
+    re.M,
+)
+LOCAL_PACKAGE = re.compile(r'"(file|link|workspace):|"workspaces"\s*:')
+
+META_FILE = "meta.json"
+DOWNLOAD_CACHES = ["pip", "npm", "yarn", "pnpm-store"]
+
+
+def _link_or_copy(src: str, dst: str):
+    """Hard-link a file, copying it across filesystems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _link_tree(src: str, dst: str):
+    """Recreate a directory tree with hard links to its files."""
+    shutil.copytree(src, dst, symlinks=True, copy_function=_link_or_copy)
+
+
+def _relocate_venv(venv_path: str, old_prefix: str):
+    """Point the scripts of a copied virtualenv at its new location.
+
+    Console scripts have the absolute path of the venv's interpreter in their
+    shebang, and the activate scripts set VIRTUAL_ENV. They are rewritten as
+    new files, leaving the cached ones they were linked to unchanged.
+    """
+    old = old_prefix.encode()
+    new = os.path.abspath(venv_path).encode()
+    bin_dir = os.path.join(venv_path, "bin")
+    for name in os.listdir(bin_dir):
+        path = os.path.join(bin_dir, name)
+        if os.path.islink(path) or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            content = f.read()
+        if old not in content:
+            continue
+        mode = os.stat(path).st_mode
+        os.unlink(path)
+        with open(path, "wb") as f:
+            f.write(content.replace(old, new))
+        os.chmod(path, mode)
+
+
+def exclude_venv(working_dir: str):
+    """Keep a checkout's virtualenv out of git.
+
+    The venv is added to the repository's info/exclude (shared by the
+    worktrees of a mirror), so `git add -A` and the file listings that go
+    into prompts leave it out, whether or not the project ignores it.
+    """
+    try:
+        exclude_path = subprocess.run(
+            [
+                "git",
+                "-C",
+                working_dir,
+                "rev-parse",
+                "--path-format=absolute",
+                "--git-path",
+                "info/exclude",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        # Not a git checkout
+        return
+    pattern = f"/{VENV_DIR}/"
+    try:
+        with open(exclude_path) as f:
+            if pattern in f.read().splitlines():
+                return
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(exclude_path), exist_ok=True)
+    with open(exclude_path, "a") as f:
+        f.write(f"\n{pattern}\n")
+
+
+def _node_version() -> str:
+    try:
+        return subprocess.run(
+            ["node", "--version"], capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+class DependencyCache:
+    """Installed dependencies of task workspaces, keyed by their manifests.
+
+    setup_dependencies installs into the workspace (a virtualenv in .venv for
+    pip, node_modules otherwise), and the result is stored here under a hash
+    of the requirements or package.json and lockfile, the package manager and
+    the interpreter version. The next workspace with the same manifests gets
+    a copy made of hard links to the stored files instead of an install, so
+    only directory entries are written. Package managers replace files
+    rather than writing them in place, so later installs into a workspace
+    don't change the cache.
+
+    Installs also share package download caches (pip wheels, npm, yarn and
+    pnpm stores), so a miss that only changes a few packages downloads just
+    those.
+
+    Environments are evicted least-recently-used first once the cache grows
+    beyond its size limit, and the download caches after them.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        remove: Optional[Callable[[str], None]] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache. Defaults to DEPENDENCY_CACHE_DIR env var.
+            max_bytes: Size limit for the cache. Defaults to DEPENDENCY_CACHE_MAX_BYTES env var.
+            remove: Deletes an evicted directory, e.g. Trash.discard. Deletes
+                it right away by default.
+        """
+        self.cache_dir = os.path.abspath(
+            cache_dir or os.environ.get("DEPENDENCY_CACHE_DIR", DEFAULT_CACHE_DIR)
+        )
+        self.max_bytes = int(
+            max_bytes
+            if max_bytes is not None
+            else os.environ.get("DEPENDENCY_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.remove = remove or (lambda path: shutil.rmtree(path, ignore_errors=True))
+        self.envs_dir = os.path.join(self.cache_dir, "envs")
+        self.downloads_dir = os.path.join(self.cache_dir, "downloads")
+        os.makedirs(self.envs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evicted": 0, "bytes": 0}
+
+    def env(self, working_dir: str) -> Dict[str, str]:
+        """Get the environment for commands run in a workspace.
+
+        Package managers use the shared download caches, and the workspace's
+        virtualenv comes first on PATH if it has one.
+        """
+        env = dict(os.environ)
+        env["PIP_CACHE_DIR"] = os.path.join(self.downloads_dir, "pip")
+        env["npm_config_cache"] = os.path.join(self.downloads_dir, "npm")
+        env["YARN_CACHE_FOLDER"] = os.path.join(self.downloads_dir, "yarn")
+        env["npm_config_store_dir"] = os.path.join(self.downloads_dir, "pnpm-store")
+
+        venv_path = os.path.join(working_dir, VENV_DIR)
+        if os.path.isfile(os.path.join(venv_path, "pyvenv.cfg")):
+            env["VIRTUAL_ENV"] = os.path.abspath(venv_path)
+            env["PATH"] = os.pathsep.join(
+                [os.path.join(env["VIRTUAL_ENV"], "bin"), env.get("PATH", "")]
+            )
+            env.pop("PYTHONHOME", None)
+        return env
+
+    def key(self, working_dir: str, package_manager: str) -> Optional[str]:
+        """Get the cache key of a workspace's dependencies.
+
+        Returns:
+            Optional[str]: The key, or None if the dependencies can't be
+            shared with other workspaces
+        """
+        digest = hashlib.sha256(package_manager.encode())
+        if package_manager == "pip":
+            digest.update(sys.version.encode())
+        else:
+            digest.update(_node_version().encode())
+        for name in MANIFESTS[package_manager]:
+            path = os.path.join(working_dir, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                content = f.read()
+            text = content.decode("utf-8", "replace")
+            if name == "requirements.txt" and LOCAL_REQUIREMENT.search(text):
+                return None
+            if name == "package.json" and LOCAL_PACKAGE.search(text):
+                return None
+            digest.update(name.encode() + b"\0" + content + b"\0")
+        return f"{package_manager}-{digest.hexdigest()[:32]}"
+
+    def restore(self, key: str, working_dir: str) -> bool:
+        """Copy cached dependencies into a workspace.
+
+        Returns:
+            bool: True on a hit, False if the workspace must install them
+        """
+        entry = os.path.join(self.envs_dir, key)
+        try:
+            with open(os.path.join(entry, META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self._stats["misses"] += 1
+            return False
+
+        target = os.path.join(working_dir, meta["artifact"])
+        if os.path.lexists(target):
+            return False
+        try:
+            _link_tree(os.path.join(entry, "tree"), target)
+            if meta["artifact"] == VENV_DIR:
+                _relocate_venv(target, meta["prefix"])
+        except Exception as e:
+            log_error(e, "Failed to restore cached dependencies, installing")
+            shutil.rmtree(target, ignore_errors=True)
+            return False
+        _touch(os.path.join(entry, USED_MARKER))
+        log_key_value("Dependency cache hit", key)
+        with self._lock:
+            self._stats["hits"] += 1
+        return True
+
+    def store(self, key: str, working_dir: str, package_manager: str):
+        """Store the dependencies just installed in a workspace."""
+        artifact = ARTIFACTS[package_manager]
+        source = os.path.join(working_dir, artifact)
+        entry = os.path.join(self.envs_dir, key)
+        if os.path.exists(entry) or not os.path.isdir(source):
+            return
+
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.envs_dir)
+        try:
+            _link_tree(source, os.path.join(staging, "tree"))
+            with open(os.path.join(staging, META_FILE), "w") as f:
+                json.dump(
+                    {
+                        "package_manager": package_manager,
+                        "artifact": artifact,
+                        "prefix": os.path.abspath(source),
+                        "created": time.time(),
+                    },
+                    f,
+                )
+            _touch(os.path.join(staging, USED_MARKER))
+            # Another workspace may have stored the same key meanwhile
+            os.rename(staging, entry)
+            log_key_value("Stored dependencies in cache", key)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.exists(entry):
+                raise
+        self.evict(keep=[entry])
+
+    def _entries(self) -> List[str]:
+        return [
+            os.path.join(self.envs_dir, name)
+            for name in os.listdir(self.envs_dir)
+            if not name.startswith(".")
+        ]
+
+    def evict(self, keep: Optional[List[str]] = None) -> int:
+        """Remove least recently used environments, then the download caches,
+        until the cache fits its size limit.
+
+        Args:
+            keep: Entry paths that must not be evicted
+
+        Returns:
+            int: Number of bytes freed
+        """
+        keep = set(keep or [])
+        sizes = {path: _dir_size(path) for path in self._entries()}
+        downloads = [
+            os.path.join(self.downloads_dir, name)
+            for name in DOWNLOAD_CACHES
+            if os.path.isdir(os.path.join(self.downloads_dir, name))
+        ]
+        sizes.update({path: _dir_size(path) for path in downloads})
+        total = sum(sizes.values())
+
+        freed = 0
+        by_last_use = sorted(
+            (path for path in sizes if path not in downloads),
+            key=lambda path: _mtime(os.path.join(path, USED_MARKER)),
+        )
+        for path in by_last_use + downloads:
+            if total - freed <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            log_key_value("Evicting cached dependencies", path)
+            try:
+                self.remove(path)
+            except OSError as e:
+                log_error(e, f"Failed to evict {path}")
+                continue
+            freed += sizes[path]
+            with self._lock:
+                self._stats["evicted"] += 1
+
+        with self._lock:
+            self._stats["bytes"] = total - freed
+        return freed
+
+    def stats(self) -> Dict[str, int]:
+        """Get hits, misses and evictions, and the cache size as of the last
+        store."""
+        with self._lock:
+            return {**self._stats, "max_bytes": self.max_bytes}
+
+
+_cache: Optional[DependencyCache] = None
+_cache_guard = threading.Lock()
+
+
+def get_dependency_cache() -> DependencyCache:
+    """Get the process-wide dependency cache, evicting through the workspace
+    trash."""
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = DependencyCache(remove=get_workspace_manager().trash.discard)
+        return _cache
@@ -0,0 +1,269 @@
+"""Leased workspace directories, reaped when their process dies."""
+
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, IO, Optional
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+from .mirror_cache import _dir_size
+
+LEASE_DIR = ".leases"
+WORKSPACE_PREFIX = "repo_"
+
+DEFAULT_MAX_BYTES = 0  # no limit
+DEFAULT_REAP_INTERVAL = 60  # seconds
+# Workspace directories without a lease (from before leases, or from a crash
+# between allocation steps) are removed once they are this old
+DEFAULT_ORPHAN_SECONDS = 3600
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """The workspaces use more disk than WORKSPACE_MAX_BYTES."""
+
+
+class WorkspaceAllocator:
+    """Hands out uniquely named workspace directories under a lease.
+
+    Each workspace has a lease file in <workspace_dir>/.leases, holding the
+    PID, host and creation time of its process. The process keeps the file
+    locked (flock) until the workspace is released, and the kernel drops the
+    lock when the process dies. So a lease whose lock can be taken belongs
+    to a dead process, and a background reaper removes its workspace.
+
+    Allocation is refused while the workspaces use more than their disk
+    quota, after reaping what can be reaped.
+    """
+
+    def __init__(
+        self,
+        workspace_dir: str,
+        remove: Callable[[str], None],
+        max_bytes: Optional[int] = None,
+        reap_interval: Optional[float] = None,
+        orphan_seconds: Optional[float] = None,
+    ):
+        """Initialize the allocator.
+
+        Args:
+            workspace_dir: Directory for workspaces
+            remove: Deletes the workspace at a path, for the reaper
+            max_bytes: Disk quota for all workspaces, 0 for none. Defaults to
+                WORKSPACE_MAX_BYTES env var.
+            reap_interval: Seconds between reaper runs. Defaults to
+                WORKSPACE_REAP_INTERVAL env var.
+            orphan_seconds: Age at which workspaces without a lease are
+                removed. Defaults to WORKSPACE_ORPHAN_SECONDS env var.
+        """
+        self.workspace_dir = workspace_dir
+        self.lease_dir = os.path.join(workspace_dir, LEASE_DIR)
+        self.remove = remove
+        self.max_bytes = int(
+            max_bytes
+            if max_bytes is not None
+            else os.environ.get("WORKSPACE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.reap_interval = float(
+            reap_interval
+            if reap_interval is not None
+            else os.environ.get("WORKSPACE_REAP_INTERVAL", DEFAULT_REAP_INTERVAL)
+        )
+        self.orphan_seconds = float(
+            orphan_seconds
+            if orphan_seconds is not None
+            else os.environ.get("WORKSPACE_ORPHAN_SECONDS", DEFAULT_ORPHAN_SECONDS)
+        )
+
+        # Lease files of this process's workspaces, kept open and locked
+        self._leases: Dict[str, IO] = {}
+        self._lock = threading.Lock()
+        self._reap_lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+        self._stats = {"workspaces": 0, "bytes": 0, "reaped": 0}
+        self._measured = False
+
+    def _lease_path(self, path: str) -> str:
+        return os.path.join(self.lease_dir, f"{os.path.basename(path)}.lease")
+
+    def allocate(self) -> str:
+        """Create a new workspace directory and lease it to this process.
+
+        Raises:
+            WorkspaceQuotaExceeded: If the workspaces are over their disk quota
+        """
+        self.start_reaper()
+        if self.max_bytes:
+            if not self._measured or self._stats["bytes"] >= self.max_bytes:
+                self.reap()
+            if self._stats["bytes"] >= self.max_bytes:
+                raise WorkspaceQuotaExceeded(
+                    f"Workspaces use {self._stats['bytes']} bytes, "
+                    f"over the limit of {self.max_bytes}"
+                )
+
+        os.makedirs(self.lease_dir, exist_ok=True)
+        path = os.path.join(self.workspace_dir, f"{WORKSPACE_PREFIX}{uuid.uuid4().hex}")
+        lease_path = self._lease_path(path)
+
+        # Lock the lease under a temporary name and move it into place, so
+        # the reaper never sees it unlocked
+        tmp_path = f"{lease_path}.tmp"
+        lease = open(tmp_path, "w")
+        try:
+            fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            json.dump(
+                {
+                    "pid": os.getpid(),
+                    "host": socket.gethostname(),
+                    "created": time.time(),
+                },
+                lease,
+            )
+            lease.flush()
+            os.rename(tmp_path, lease_path)
+            os.mkdir(path)
+        except Exception:
+            lease.close()
+            for leftover in (tmp_path, lease_path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            raise
+
+        with self._lock:
+            self._leases[path] = lease
+        return path
+
+    def release(self, path: str):
+        """Give up the lease of a workspace once it has been removed.
+
+        Paths that aren't leased by this process are ignored.
+        """
+        with self._lock:
+            lease = self._leases.pop(os.path.abspath(path), None)
+        if lease is None:
+            return
+        try:
+            os.remove(self._lease_path(path))
+        except FileNotFoundError:
+            pass
+        lease.close()
+
+    def _reap_lease(self, lease_name: str) -> bool:
+        """Remove the workspace of a lease if its process died."""
+        lease_path = os.path.join(self.lease_dir, lease_name)
+        path = os.path.join(self.workspace_dir, lease_name[: -len(".lease")])
+        with self._lock:
+            if path in self._leases:
+                return False
+        try:
+            lease = open(lease_path, "r+")
+        except FileNotFoundError:
+            return False
+        with lease:
+            try:
+                fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Still held by a live process
+                return False
+            try:
+                owner = json.load(lease)
+            except ValueError:
+                owner = {}
+            log_key_value(
+                "Reaping workspace",
+                f"{path} (pid {owner.get('pid')} on {owner.get('host')})",
+            )
+            if os.path.exists(path):
+                self.remove(path)
+            try:
+                os.remove(lease_path)
+            except FileNotFoundError:
+                pass
+        return True
+
+    def reap(self) -> int:
+        """Remove workspaces of dead processes and old unleased ones, and
+        measure what is left.
+
+        Returns:
+            int: Number of workspaces removed
+        """
+        with self._reap_lock:
+            reaped = 0
+            now = time.time()
+            if os.path.isdir(self.lease_dir):
+                for name in os.listdir(self.lease_dir):
+                    if name.endswith(".lease"):
+                        try:
+                            reaped += self._reap_lease(name)
+                        except Exception as e:
+                            log_error(e, f"Failed to reap workspace lease {name}")
+                    elif name.endswith(".tmp"):
+                        tmp_path = os.path.join(self.lease_dir, name)
+                        try:
+                            if now - os.path.getmtime(tmp_path) > self.orphan_seconds:
+                                os.remove(tmp_path)
+                        except OSError:
+                            pass
+
+            workspaces = 0
+            total = 0
+            for name in os.listdir(self.workspace_dir):
+                path = os.path.join(self.workspace_dir, name)
+                if not name.startswith(WORKSPACE_PREFIX) or not os.path.isdir(path):
+                    continue
+                if not os.path.exists(self._lease_path(path)):
+                    try:
+                        age = now - os.path.getmtime(path)
+                    except OSError:
+                        continue
+                    if age > self.orphan_seconds:
+                        log_key_value("Removing unleased workspace", path)
+                        try:
+                            self.remove(path)
+                            reaped += 1
+                            continue
+                        except Exception as e:
+                            log_error(e, f"Failed to remove workspace {path}")
+                workspaces += 1
+                total += _dir_size(path)
+
+            with self._lock:
+                self._stats["workspaces"] = workspaces
+                self._stats["bytes"] = total
+                self._stats["reaped"] += reaped
+                self._measured = True
+            return reaped
+
+    def _reap_forever(self):
+        while True:
+            time.sleep(self.reap_interval)
+            try:
+                self.reap()
+            except Exception as e:
+                log_error(e, "Workspace reaper failed")
+
+    def start_reaper(self):
+        """Start the background reaper, once per allocator."""
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_forever, name="workspace-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the workspace count and bytes on disk as of the last reaper
+        run, the leases held by this process and the workspaces reaped."""
+        with self._lock:
+            return {
+                **self._stats,
+                "leased": len(self._leases),
+                "max_bytes": self.max_bytes,
+            }
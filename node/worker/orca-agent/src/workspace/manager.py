@@ -0,0 +1,221 @@
+"""Git worktree workspaces backed by the repository mirror cache."""
+
+import os
+import re
+import threading
+from typing import Optional, Set
+
+from git import Git, Repo
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+from .leases import WorkspaceAllocator
+from .mirror_cache import DEFAULT_REF, RepoMirrorCache, auth_header, get_mirror_cache
+from .trash import TRASH_DIR, Trash
+
+DEFAULT_WORKSPACE_DIR = "./repos"
+
+
+def _created_branches(workspace_path: str) -> Set[str]:
+    """Get the branches a workspace has checked out, from its HEAD reflog."""
+    repo = Repo(workspace_path)
+    try:
+        reflog = repo.git.reflog("--format=%gs", "HEAD", with_exceptions=False)
+    finally:
+        repo.close()
+    return set(re.findall(r"^checkout: moving from \S+ to (\S+)$", reflog, re.M))
+
+
+def _checked_out_branches(mirror: Repo) -> Set[str]:
+    """Get the branches currently checked out in any worktree of a mirror."""
+    porcelain = mirror.git.worktree("list", "--porcelain")
+    return set(re.findall(r"^branch refs/heads/(\S+)$", porcelain, re.M))
+
+
+class WorkspaceManager:
+    """Hands out git worktrees of cached mirrors as task workspaces.
+
+    Starting a task costs a worktree checkout off the long-lived mirror for
+    its repository instead of a network clone, and cleanup is a
+    `git worktree remove`. Worktrees start on a detached HEAD at the remote's
+    default branch (or the requested ref), so several can be checked out from
+    one mirror at the same time.
+
+    Branches live in the mirror and are shared by all of its worktrees, so
+    branches a workspace checked out are deleted again when it is released.
+
+    Workspace directories are leased from a WorkspaceAllocator, which
+    removes the workspaces of processes that died without releasing them.
+
+    Removed workspaces and evicted mirrors go to a Trash in the workspace
+    directory, which deletes them in the background, so releasing a
+    workspace doesn't wait for its files to be deleted.
+    """
+
+    def __init__(
+        self,
+        workspace_dir: Optional[str] = None,
+        cache: Optional[RepoMirrorCache] = None,
+    ):
+        """Initialize the manager.
+
+        Args:
+            workspace_dir: Directory for workspaces. Defaults to WORKSPACE_DIR env var.
+            cache: Mirror cache to check out from. Defaults to the shared cache.
+        """
+        self.workspace_dir = os.path.abspath(
+            workspace_dir or os.environ.get("WORKSPACE_DIR", DEFAULT_WORKSPACE_DIR)
+        )
+        self.cache = cache or get_mirror_cache()
+        self.trash = Trash(os.path.join(self.workspace_dir, TRASH_DIR))
+        self.trash.empty_later()
+        self.allocator = WorkspaceAllocator(self.workspace_dir, remove=self._discard)
+
+    def allocate_path(self) -> str:
+        """Reserve a new, empty directory for a workspace.
+
+        Raises:
+            WorkspaceQuotaExceeded: If the workspaces are over their disk quota
+        """
+        return self.allocator.allocate()
+
+    def _discard(self, path: str):
+        """Remove a workspace, checked out or not, e.g. one left behind by
+        another process."""
+        if not self.release(path):
+            self.trash.discard(path)
+
+    def stats(self) -> dict:
+        """Get workspace counts and bytes on disk, and the bytes still to
+        be deleted."""
+        return {**self.allocator.stats(), "trash": self.trash.stats()}
+
+    def acquire(
+        self,
+        repo_full_name: str,
+        remote_url: str,
+        path: Optional[str] = None,
+        ref: Optional[str] = None,
+    ) -> Repo:
+        """Check out a workspace for a repository.
+
+        Args:
+            repo_full_name: Full name of the repository (owner/repo)
+            remote_url: URL of the repository, including credentials if needed
+            path: Optional empty directory for the workspace. Allocated if not given.
+            ref: Optional ref to check out (e.g. origin/my-branch). Defaults to
+                the remote's default branch.
+
+        Returns:
+            Repo: The workspace, with origin pointing at remote_url without
+            its credentials, which the workspace sends as an HTTP header
+        """
+        mirror_path = self.cache.mirror_path(repo_full_name)
+        allocated = path is None
+        path = path or self.allocate_path()
+        ref = ref or DEFAULT_REF
+
+        try:
+            with self.cache.lock(mirror_path):
+                self.cache.update(mirror_path, remote_url)
+                if not self.cache.has_ref(mirror_path, ref):
+                    # Pushed since the last fetch, which is still fresh
+                    self.cache.update(mirror_path, remote_url, force=True)
+                self.cache.mark_used(mirror_path)
+
+                log_key_value("Checking out workspace", path)
+                mirror = Repo(mirror_path)
+                try:
+                    mirror.git.worktree("add", "--detach", path, ref)
+                finally:
+                    mirror.close()
+                # With worktree configs on, worktrees read the mirror's
+                # core.bare too, so each one needs its own
+                Git(path).config("--worktree", "core.bare", "false")
+
+            workspace = Repo(path)
+            header = auth_header(remote_url)
+            if header:
+                # Only this worktree pushes and fetches with the credentials, and
+                # they go away with it
+                workspace.git.config("--worktree", "http.extraHeader", header)
+        except Exception:
+            # Callers only clean up paths they passed in, so don't leave a
+            # lease held by this live process that the reaper would never free
+            if allocated:
+                self._discard(path)
+                self.allocator.release(path)
+            raise
+
+        try:
+            self.cache.evict(keep=[mirror_path], remove=self.trash.discard)
+        except Exception as e:
+            log_error(e, "Repository cache eviction failed")
+
+        return workspace
+
+    def _mirror_for(self, path: str) -> Optional[str]:
+        """Get the mirror a workspace belongs to, or None if it is not a managed worktree."""
+        git_file = os.path.join(path, ".git")
+        if not os.path.isfile(git_file):
+            return None
+        with open(git_file) as f:
+            content = f.read().strip()
+        if not content.startswith("gitdir:"):
+            return None
+
+        # A worktree's gitdir is <mirror>/worktrees/<name>
+        gitdir = os.path.join(path, content[len("gitdir:") :].strip())
+        mirror_path = os.path.dirname(os.path.dirname(os.path.abspath(gitdir)))
+        if not mirror_path.startswith(self.cache.cache_dir + os.sep):
+            return None
+        return mirror_path
+
+    def release(self, path: str) -> bool:
+        """Remove a workspace and the branches it created.
+
+        Args:
+            path: Path of the workspace
+
+        Returns:
+            bool: True if the path was a managed workspace, False otherwise
+        """
+        mirror_path = self._mirror_for(path)
+        if not mirror_path:
+            return False
+
+        try:
+            self._remove_worktree(mirror_path, path)
+        finally:
+            self.allocator.release(path)
+        log_key_value("Released workspace", path)
+        return True
+
+    def _remove_worktree(self, mirror_path: str, path: str):
+        """Remove a worktree from its mirror, with the branches it created."""
+        branches = _created_branches(path)
+
+        with self.cache.lock(mirror_path):
+            mirror = Repo(mirror_path)
+            try:
+                # Trashing the directory leaves the worktree missing, and
+                # prune then drops it from the mirror
+                self.trash.discard(path)
+                mirror.git.worktree("prune")
+
+                for branch in branches - _checked_out_branches(mirror):
+                    mirror.git.branch("-D", branch, with_exceptions=False)
+            finally:
+                mirror.close()
+
+
+_manager: Optional[WorkspaceManager] = None
+_manager_guard = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    """Get the process-wide workspace manager."""
+    global _manager
+    with _manager_guard:
+        if _manager is None:
+            _manager = WorkspaceManager()
+        return _manager
@@ -0,0 +1,341 @@
+"""Persistent bare-mirror cache for upstream repositories."""
+
+import base64
+import fcntl
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from urllib.parse import unquote
+
+from git import Repo
+from prometheus_swarm.utils.logging import log_key_value
+
+DEFAULT_CACHE_DIR = "./repos/.mirrors"
+DEFAULT_MAX_BYTES = 20 * 1024**3  # 20 GiB
+DEFAULT_FETCH_INTERVAL = 30  # seconds
+
+# Only branches and tags are mirrored; GitHub's refs/pull/* would bloat the cache.
+# Branches land in refs/remotes/origin so that fetching never touches a branch
+# checked out in one of the mirror's worktrees.
+FETCH_REFSPECS = ["+refs/heads/*:refs/remotes/origin/*", "+refs/tags/*:refs/tags/*"]
+DEFAULT_REF = "refs/remotes/origin/HEAD"
+
+# Marker files kept inside each mirror
+FETCHED_MARKER = "cache-fetched"
+USED_MARKER = "cache-used"
+
+
+def _strip_credentials(url: str) -> str:
+    """Remove any user/token prefix from an https URL."""
+    return re.sub(r"^https://[^@/]+@", "https://", url)
+
+
+def auth_header(url: str) -> Optional[str]:
+    """Get an HTTP Authorization header for the credentials of an https URL.
+
+    Git is given the header instead of the URL with credentials, so tokens
+    are never written to a repository's config.
+
+    Returns:
+        Optional[str]: The header, or None if the URL has no credentials
+    """
+    match = re.match(r"^https://([^@/]+)@", url)
+    if not match:
+        return None
+    userinfo = unquote(match.group(1))
+    if ":" not in userinfo:
+        # A bare token, as in https://<token>@github.com/...
+        userinfo = f"x-access-token:{userinfo}"
+    return "Authorization: Basic " + base64.b64encode(userinfo.encode()).decode()
+
+
+def _auth_env(header: Optional[str]) -> Dict[str, str]:
+    """Get environment variables that make git send an HTTP header.
+
+    Unlike `git -c`, these don't show up in the process list.
+    """
+    if not header:
+        return {}
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": header,
+    }
+
+
+def _dir_size(path: str) -> int:
+    """Get the total size in bytes of all files below a directory."""
+    total = 0
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(root, filename)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _touch(path: str):
+    """Create a file or update its modification time."""
+    with open(path, "a"):
+        os.utime(path, None)
+
+
+def _has_worktrees(mirror_path: str) -> bool:
+    """Check whether a mirror still has worktrees checked out."""
+    mirror = Repo(mirror_path)
+    try:
+        mirror.git.worktree("prune")
+    finally:
+        mirror.close()
+    worktrees_dir = os.path.join(mirror_path, "worktrees")
+    return os.path.isdir(worktrees_dir) and bool(os.listdir(worktrees_dir))
+
+
+def _mtime(path: str) -> float:
+    """Get a file's modification time, or 0 if it does not exist."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+class RepoMirrorCache:
+    """Local bare mirrors of remote repositories, keyed by full name.
+
+    Each repository is cloned over the network once and refreshed with an
+    incremental fetch. Task workspaces are worktrees of the mirror (see
+    WorkspaceManager), so they share its objects instead of downloading them
+    again.
+
+    The mirror's origin URL has no credentials. They are passed to each
+    fetch as an HTTP header instead, and worktrees get their own copy in
+    their per-worktree config, which is deleted with them.
+
+    A per-repository lock (thread lock plus file lock, so it also holds across
+    gunicorn workers) makes concurrent tasks share a single fetch: whoever gets
+    the lock first refreshes the mirror, the rest see a fresh fetch marker and
+    skip the fetch.
+
+    Mirrors are evicted least-recently-used first once the cache grows beyond
+    its size limit. Mirrors that still have worktrees are never evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        fetch_interval: Optional[float] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the mirrors. Defaults to REPO_CACHE_DIR env var.
+            max_bytes: Size limit for the cache. Defaults to REPO_CACHE_MAX_BYTES env var.
+            fetch_interval: Seconds a fetch stays fresh. Defaults to REPO_CACHE_FETCH_INTERVAL env var.
+        """
+        self.cache_dir = os.path.abspath(
+            cache_dir or os.environ.get("REPO_CACHE_DIR", DEFAULT_CACHE_DIR)
+        )
+        self.max_bytes = int(
+            max_bytes
+            if max_bytes is not None
+            else os.environ.get("REPO_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.fetch_interval = float(
+            fetch_interval
+            if fetch_interval is not None
+            else os.environ.get("REPO_CACHE_FETCH_INTERVAL", DEFAULT_FETCH_INTERVAL)
+        )
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def mirror_path(self, repo_full_name: str) -> str:
+        """Get the mirror directory for a repository (owner/repo)."""
+        owner, name = repo_full_name.lower().strip("/").split("/")[-2:]
+        return os.path.join(self.cache_dir, owner, f"{name}.git")
+
+    def _thread_lock(self, mirror_path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(mirror_path, threading.Lock())
+
+    @contextmanager
+    def lock(self, mirror_path: str, blocking: bool = True):
+        """Hold the lock for a mirror.
+
+        Yields True if the lock was acquired. With blocking=False, yields False
+        instead of waiting when the mirror is busy.
+        """
+        thread_lock = self._thread_lock(mirror_path)
+        if not thread_lock.acquire(blocking):
+            yield False
+            return
+        try:
+            os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+            with open(f"{mirror_path}.lock", "w") as lock_file:
+                flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                try:
+                    fcntl.flock(lock_file, flags)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+    def _create(self, mirror_path: str, remote_url: str):
+        """Clone a new mirror over the network."""
+        log_key_value("Creating repository mirror", _strip_credentials(remote_url))
+        auth = _auth_env(auth_header(remote_url))
+        # Build the mirror next to the final path and rename, so a crash never
+        # leaves a half-written mirror behind
+        tmp_path = f"{mirror_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        try:
+            mirror = Repo.init(tmp_path, bare=True)
+            try:
+                mirror.create_remote("origin", _strip_credentials(remote_url))
+                with mirror.config_writer() as config:
+                    config.set_value('remote "origin"', "fetch", FETCH_REFSPECS[0])
+                    config.add_value('remote "origin"', "fetch", FETCH_REFSPECS[1])
+                    # Lets worktrees keep their credentials to themselves.
+                    # They then also read core.bare from here, so each one
+                    # sets its own (see WorkspaceManager.acquire).
+                    config.set_value("extensions", "worktreeConfig", "true")
+                with mirror.git.custom_environment(**auth):
+                    mirror.git.fetch("origin")
+
+                    # Record the remote's default branch as origin/HEAD, like a
+                    # regular clone does
+                    head = mirror.git.ls_remote("--symref", "origin", "HEAD")
+                match = re.search(r"^ref: refs/heads/(\S+)\s+HEAD", head, re.M)
+                if match:
+                    mirror.git.symbolic_ref(
+                        DEFAULT_REF, f"refs/remotes/origin/{match.group(1)}"
+                    )
+            finally:
+                mirror.close()
+            _touch(os.path.join(tmp_path, FETCHED_MARKER))
+            os.rename(tmp_path, mirror_path)
+        finally:
+            if os.path.exists(tmp_path):
+                shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def update(self, mirror_path: str, remote_url: str, force: bool = False):
+        """Create the mirror or bring it up to date. Caller must hold the lock.
+
+        Args:
+            mirror_path: Path of the mirror, from mirror_path()
+            remote_url: URL to fetch from, including credentials if needed
+            force: Fetch even if the last fetch is still fresh
+        """
+        fetched_marker = os.path.join(mirror_path, FETCHED_MARKER)
+
+        if not os.path.exists(mirror_path):
+            self._create(mirror_path, remote_url)
+            return
+
+        if not force and time.time() - _mtime(fetched_marker) < self.fetch_interval:
+            log_key_value("Repository mirror is fresh", mirror_path)
+            return
+
+        log_key_value("Updating repository mirror", _strip_credentials(remote_url))
+        mirror = Repo(mirror_path)
+        try:
+            with mirror.git.custom_environment(**_auth_env(auth_header(remote_url))):
+                mirror.git.fetch("--prune", "origin")
+        finally:
+            mirror.close()
+        _touch(fetched_marker)
+
+    def has_ref(self, mirror_path: str, ref: str) -> bool:
+        """Check whether a mirror has a commit for a ref."""
+        mirror = Repo(mirror_path)
+        try:
+            return bool(
+                mirror.git.rev_parse(
+                    "--verify", "--quiet", f"{ref}^{{commit}}", with_exceptions=False
+                )
+            )
+        finally:
+            mirror.close()
+
+    def mark_used(self, mirror_path: str):
+        """Record that a mirror was just used, for LRU eviction."""
+        _touch(os.path.join(mirror_path, USED_MARKER))
+
+    def _mirror_paths(self) -> List[str]:
+        """List all mirrors currently in the cache."""
+        paths = []
+        for owner in os.listdir(self.cache_dir):
+            owner_dir = os.path.join(self.cache_dir, owner)
+            if not os.path.isdir(owner_dir):
+                continue
+            for name in os.listdir(owner_dir):
+                if name.endswith(".git"):
+                    paths.append(os.path.join(owner_dir, name))
+        return paths
+
+    def evict(
+        self,
+        keep: Optional[List[str]] = None,
+        remove: Optional[Callable[[str], None]] = None,
+    ) -> int:
+        """Remove least recently used mirrors until the cache fits its size limit.
+
+        Args:
+            keep: Mirror paths that must not be evicted
+            remove: Deletes a mirror directory, e.g. Trash.discard. Deletes it
+                right away by default.
+
+        Returns:
+            int: Number of bytes freed
+        """
+        keep = set(keep or [])
+        sizes = {path: _dir_size(path) for path in self._mirror_paths()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return 0
+
+        freed = 0
+        by_last_use = sorted(
+            sizes, key=lambda path: _mtime(os.path.join(path, USED_MARKER))
+        )
+        for path in by_last_use:
+            if total - freed <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            # Skip mirrors that are being fetched right now or still have worktrees
+            with self.lock(path, blocking=False) as acquired:
+                if not acquired or _has_worktrees(path):
+                    continue
+                log_key_value("Evicting repository mirror", path)
+                if remove:
+                    remove(path)
+                else:
+                    shutil.rmtree(path, ignore_errors=True)
+                freed += sizes[path]
+        return freed
+
+
+_cache: Optional[RepoMirrorCache] = None
+_cache_guard = threading.Lock()
+
+
+def get_mirror_cache() -> RepoMirrorCache:
+    """Get the process-wide repository mirror cache."""
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = RepoMirrorCache()
+        return _cache
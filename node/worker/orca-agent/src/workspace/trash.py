@@ -0,0 +1,212 @@
+"""Deferred deletion of workspaces and mirrors."""
+
+import errno
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+from .mirror_cache import _dir_size
+
+TRASH_DIR = ".trash"
+DEFAULT_FILES_PER_SECOND = 2000
+# Files deleted between throttling pauses
+BATCH_SIZE = 200
+# Niceness of the deleting thread; Linux also derives its I/O priority from it
+NICENESS = 19
+
+
+class Trash:
+    """Deletes directories in the background instead of in the request path.
+
+    discard() renames a directory into the trash directory, which is atomic
+    and instant on the same filesystem, so the directory is gone for callers
+    right away. A background thread running at the lowest priority then
+    deletes the trash a batch of files at a time, throttled to a number of
+    files per second so that reclaiming a large node_modules tree doesn't
+    starve running tasks of disk I/O. Trash left behind by a previous
+    process is deleted too.
+
+    Directories on another filesystem than the trash can't be renamed into
+    it and are deleted right away.
+    """
+
+    def __init__(self, trash_dir: str, files_per_second: Optional[float] = None):
+        """Initialize the trash.
+
+        Args:
+            trash_dir: Directory for trashed directories, on the same
+                filesystem as them
+            files_per_second: Deletion rate limit, 0 for none. Defaults to
+                WORKSPACE_TRASH_FILES_PER_SECOND env var.
+        """
+        self.trash_dir = os.path.abspath(trash_dir)
+        self.files_per_second = float(
+            files_per_second
+            if files_per_second is not None
+            else os.environ.get(
+                "WORKSPACE_TRASH_FILES_PER_SECOND", DEFAULT_FILES_PER_SECOND
+            )
+        )
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Bytes left to delete of each trashed directory, by name
+        self._pending: Dict[str, int] = {}
+        # Trashed directories that could not be deleted
+        self._failed: Set[str] = set()
+        self._stats = {"reclaimed": 0, "reclaimed_bytes": 0}
+
+    def discard(self, path: str):
+        """Move a directory into the trash, to be deleted in the background."""
+        if not os.path.lexists(path):
+            return
+        os.makedirs(self.trash_dir, exist_ok=True)
+        name = f"{uuid.uuid4().hex}-{os.path.basename(path.rstrip(os.sep))}"
+        try:
+            os.rename(path, os.path.join(self.trash_dir, name))
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            log_key_value("Deleting directory outside the trash filesystem", path)
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        self._start()
+        self._wake.set()
+
+    def _start(self):
+        """Start the background deleter, once per trash."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._empty_forever, name="workspace-trash", daemon=True
+            )
+            self._thread.start()
+
+    def _empty_forever(self):
+        try:
+            # A thread's native ID is its Linux PID, so this only lowers the
+            # priority of this thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), NICENESS)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self.empty()
+            except Exception as e:
+                log_error(e, "Emptying workspace trash failed")
+
+    def _measure(self) -> List[str]:
+        """Measure the directories trashed since the last call.
+
+        Returns:
+            List[str]: Names of the trashed directories, oldest first
+        """
+        try:
+            names = os.listdir(self.trash_dir)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if name not in self._pending and name not in self._failed:
+                size = _dir_size(os.path.join(self.trash_dir, name))
+                with self._lock:
+                    self._pending[name] = size
+
+        def mtime(name):
+            try:
+                return os.lstat(os.path.join(self.trash_dir, name)).st_mtime
+            except OSError:
+                return 0.0
+
+        return sorted((n for n in names if n not in self._failed), key=mtime)
+
+    def empty(self):
+        """Delete everything in the trash, oldest first, throttled."""
+        while True:
+            # Listed again after each directory so that newly trashed ones
+            # are counted as pending without waiting for the rest
+            names = self._measure()
+            if not names:
+                return
+            self._delete(names[0])
+
+    def _delete(self, name: str):
+        """Delete one trashed directory."""
+        path = os.path.join(self.trash_dir, name)
+        batch_start = time.monotonic()
+        batch = 0
+        if os.path.isdir(path) and not os.path.islink(path):
+            for root, dirs, filenames in os.walk(path, topdown=False):
+                for filename in filenames:
+                    self._unlink(name, os.path.join(root, filename))
+                    batch += 1
+                    if batch >= BATCH_SIZE:
+                        self._throttle(batch, batch_start)
+                        batch_start = time.monotonic()
+                        batch = 0
+                for dirname in dirs:
+                    entry = os.path.join(root, dirname)
+                    if os.path.islink(entry):
+                        self._unlink(name, entry)
+                    else:
+                        try:
+                            os.rmdir(entry)
+                        except OSError:
+                            pass
+        # Whatever is left, e.g. read-only directories or the trashed path
+        # itself
+        shutil.rmtree(path, ignore_errors=True)
+        if os.path.lexists(path) and not os.path.isdir(path):
+            self._unlink(name, path)
+
+        with self._lock:
+            left = self._pending.pop(name, 0)
+            if os.path.lexists(path):
+                self._failed.add(name)
+                log_key_value("Could not delete trashed directory", path)
+                return
+            self._stats["reclaimed"] += 1
+            self._stats["reclaimed_bytes"] += left
+
+    def _unlink(self, name: str, path: str):
+        try:
+            size = os.lstat(path).st_size
+            os.unlink(path)
+        except OSError:
+            return
+        with self._lock:
+            if name in self._pending:
+                self._pending[name] -= size
+            self._stats["reclaimed_bytes"] += size
+
+    def _throttle(self, files: int, started: float):
+        if self.files_per_second <= 0:
+            return
+        delay = files / self.files_per_second - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+
+    def empty_later(self):
+        """Delete trash left behind by a previous process in the background."""
+        if os.path.isdir(self.trash_dir) and os.listdir(self.trash_dir):
+            self._start()
+            self._wake.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the directories and bytes waiting to be deleted, and those
+        deleted so far. Bytes are counted once the deleter has measured a
+        directory."""
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "pending_bytes": max(0, sum(self._pending.values())),
+                "failed": len(self._failed),
+                **self._stats,
+            }
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Benchmark distribution list validation against a stubbed GitHub.
+
+Each stubbed GitHub request sleeps for a fixed latency and is counted, so
+the output shows how many requests validation makes and how the wall time
+scales with the number of submissions. PRs are fetched through the batched
+GraphQL lookup; the REST column is the get_repo and get_pull per PR it
+replaces. Signatures are real Ed25519 signatures and go through the normal
+verification.
+
+Run from the orca-agent directory:
+
+    python -m testing.benchmark_distribution --sizes 10 50 100 200 --latency 0.02
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+
+import base58
+import nacl.signing
+
+from src.utils import distribution
+
+TASK_ID = "benchmark-task"
+ROUND_NUMBER = 1
+UPSTREAM_OWNER = "upstream"
+
+
+class StubUser:
+    def __init__(self, login):
+        self.login = login
+
+
+class StubRepo:
+    def __init__(self, owner):
+        self.owner = StubUser(owner)
+        self.parent = None
+
+
+class StubRequester:
+    graphql_url = "https://api.github.com/graphql"
+
+    def __init__(self, github):
+        self.github = github
+
+    def requestJsonAndCheck(self, verb, url, input=None):
+        self.github.request()
+        variables = input["variables"]
+        data = {}
+        for name, number in variables.items():
+            if not name.startswith("number"):
+                continue
+            i = name[len("number") :]
+            owner = variables[f"owner{i}"]
+            repo = f"{owner}/{variables[f'repo{i}']}"
+            data[f"pr{i}"] = {
+                "pullRequest": {
+                    "number": number,
+                    "url": f"https://github.com/{repo}/pull/{number}",
+                    "body": self.github.bodies[number],
+                    "state": "OPEN",
+                    "author": {"login": owner},
+                    "headRefName": "main",
+                    "baseRefName": "main",
+                    "headRepository": None,
+                    "baseRepository": None,
+                }
+            }
+        return {}, {"data": data}
+
+
+class StubGithub:
+    """Stands in for the GitHub client; every request sleeps for the latency."""
+
+    bodies = {}
+    latency = 0.0
+    requests = 0
+
+    def __init__(self, *args, **kwargs):
+        self.requester = StubRequester(self)
+
+    def request(self):
+        StubGithub.requests += 1
+        time.sleep(self.latency)
+
+    def get_repo(self, full_name):
+        self.request()
+        return StubRepo(full_name.split("/")[0])
+
+
+def make_distribution_list(size):
+    """Build a distribution list of signed worker PRs."""
+    distribution_list = {}
+    bodies = {}
+    for number in range(1, size + 1):
+        signing_key = nacl.signing.SigningKey.generate()
+        staking_key = base58.b58encode(bytes(signing_key.verify_key)).decode()
+        payload = {
+            "taskId": TASK_ID,
+            "roundNumber": ROUND_NUMBER,
+            "stakingKey": staking_key,
+            "action": "task",
+        }
+        signature = base58.b58encode(
+            signing_key.sign(json.dumps(payload).encode())
+        ).decode()
+        bodies[number] = (
+            f"<!-- BEGIN_STAKING_KEY -->{staking_key}:{signature}"
+            "<!-- END_STAKING_KEY -->"
+        )
+        distribution_list[staking_key] = {
+            "prUrl": f"https://github.com/worker{number}/repo/pull/{number}",
+            "taskId": TASK_ID,
+            "roundNumber": ROUND_NUMBER,
+            "stakingKey": staking_key,
+        }
+    return distribution_list, bodies
+
+
+def run(size):
+    distribution_list, bodies = make_distribution_list(size)
+    StubGithub.bodies = bodies
+    StubGithub.requests = 0
+
+    start = time.perf_counter()
+    validated, error = distribution.validate_distribution_list(
+        distribution_list, UPSTREAM_OWNER, "repo"
+    )
+    elapsed = time.perf_counter() - start
+
+    if error or list(validated) != list(distribution_list):
+        raise RuntimeError(f"Validation failed: {error}")
+    return StubGithub.requests, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Seconds per GitHub request"
+    )
+    args = parser.parse_args()
+
+    distribution.get_github_client = StubGithub
+    StubGithub.latency = args.latency
+
+    results = []
+    for size in args.sizes:
+        # Validation output is very verbose; keep only the timings
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                requests, elapsed = run(size)
+        results.append((size, requests, elapsed))
+
+    print(f"{'PRs':>6} {'REST requests':>14} {'requests':>9} {'time (s)':>9}")
+    for size, requests, elapsed in results:
+        print(f"{size:>6} {2 * size + 1:>14} {requests:>9} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark staking signature verification with and without the caches.
+
+A round verifies the same staking signatures several times (distribution
+list, leader audit, merge validation). This times verifying every signature
+of a distribution list a number of times, first with the caches cleared
+before every call and then with the caches warm, and a verify_many batch.
+
+Run from the orca-agent directory:
+
+    python -m testing.benchmark_signatures --sizes 10 100 1000 --passes 3
+"""
+
+import argparse
+import json
+import time
+
+import base58
+import nacl.signing
+
+from src.utils import signatures
+
+TASK_ID = "benchmark-task"
+ROUND_NUMBER = 1
+
+
+def make_signatures(size):
+    """Build (signature, staking_key, expected_values) tuples for size nodes."""
+    result = []
+    for _ in range(size):
+        signing_key = nacl.signing.SigningKey.generate()
+        staking_key = base58.b58encode(bytes(signing_key.verify_key)).decode()
+        payload = {
+            "taskId": TASK_ID,
+            "roundNumber": ROUND_NUMBER,
+            "stakingKey": staking_key,
+            "action": "task",
+        }
+        signature = base58.b58encode(
+            signing_key.sign(json.dumps(payload).encode())
+        ).decode()
+        result.append((signature, staking_key, payload))
+    return result
+
+
+def clear_caches():
+    signatures._verified_message.cache_clear()
+    signatures._verify_key.cache_clear()
+
+
+def uncached(checks, passes):
+    start = time.perf_counter()
+    for _ in range(passes):
+        for signature, staking_key, expected_values in checks:
+            clear_caches()
+            result = signatures.verify_and_parse_signature(
+                signature, staking_key, expected_values
+            )
+            assert "data" in result, result
+    return time.perf_counter() - start
+
+
+def cached(checks, passes):
+    clear_caches()
+    start = time.perf_counter()
+    for _ in range(passes):
+        for signature, staking_key, expected_values in checks:
+            result = signatures.verify_and_parse_signature(
+                signature, staking_key, expected_values
+            )
+            assert "data" in result, result
+    return time.perf_counter() - start
+
+
+def batched(checks, passes):
+    clear_caches()
+    start = time.perf_counter()
+    for _ in range(passes):
+        results = signatures.verify_many(checks)
+        assert all("data" in result for result in results), results
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument(
+        "--passes", type=int, default=3, help="Times each signature is verified"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'sigs':>6} {'uncached (ms)':>14} {'cached (ms)':>12} "
+        f"{'verify_many (ms)':>17} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        checks = make_signatures(size)
+        cold = uncached(checks, args.passes)
+        warm = cached(checks, args.passes)
+        batch = batched(checks, args.passes)
+        print(
+            f"{size:>6} {cold * 1000:>14.1f} {warm * 1000:>12.1f} "
+            f"{batch * 1000:>17.1f} {cold / warm:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
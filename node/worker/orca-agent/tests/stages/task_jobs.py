@@ -0,0 +1,37 @@
+"""Helpers for polling background task jobs."""
+
+import time
+
+import requests
+
+POLL_INTERVAL = 5  # seconds
+TIMEOUT = 60 * 60  # seconds
+
+
+def wait_for_task_job(worker_url, response):
+    """Wait for a queued task job and return its result like a synchronous call.
+
+    Args:
+        worker_url: Base URL of the worker
+        response: Response from the worker-task or leader-task endpoint
+
+    Returns:
+        Tuple[int, dict]: Status code and result of the task
+    """
+    result = response.json()
+    if "job_id" not in result:
+        return response.status_code, result
+
+    deadline = time.time() + TIMEOUT
+    while result.get("status") not in ["completed", "failed"]:
+        if time.time() > deadline:
+            return 504, {"success": False, "message": "Timed out waiting for task"}
+        time.sleep(POLL_INTERVAL)
+        result = requests.get(f"{worker_url}/task-job/{result['job_id']}").json()
+
+    if result["status"] == "failed":
+        return result.get("error_status") or 500, {
+            "success": False,
+            "message": result.get("error"),
+        }
+    return 200, result
@@ -2,6 +2,7 @@
 
 import requests
 from prometheus_test.utils import create_signature
+from .task_jobs import wait_for_task_job
 
 
 def prepare(runner, worker):
@@ -45,10 +46,10 @@ def execute(runner, worker, data):
     """Execute worker task step"""
     url = f"{worker.get('url')}/worker-task/{data['roundNumber']}"
     response = requests.post(url, json=data)
-    result = response.json()
+    status_code, result = wait_for_task_job(worker.get("url"), response)
 
     # Handle 409 gracefully - no eligible todos is an expected case
-    if response.status_code in [401, 409]:
+    if status_code in [401, 409]:
         print(
             f"✓ {result.get('message', 'No eligible todos')} for {worker.get('name')} - continuing"
         )
@@ -0,0 +1,92 @@
+"""Tests for WorkspaceManager against a local bare remote.
+
+Run from the orca-agent directory:
+
+    python -m pytest tests/test_workspace_manager.py
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from src.workspace.manager import WorkspaceManager
+from src.workspace.mirror_cache import RepoMirrorCache
+
+REPO = "owner/repo"
+AUTHOR = ["-c", "user.name=Test", "-c", "user.email=test@example.com"]
+
+
+def git(path, *args):
+    return subprocess.run(
+        ["git", "-C", str(path), *args], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """A bare repository with one commit on main."""
+    remote = tmp_path / "remote.git"
+    git(tmp_path, "init", "-q", "--bare", str(remote))
+    seed = tmp_path / "seed"
+    git(tmp_path, "clone", "-q", str(remote), str(seed))
+    (seed / "README.md").write_text("# Repo\n")
+    git(seed, "add", "README.md")
+    git(seed, *AUTHOR, "commit", "-q", "-m", "Initial commit")
+    git(seed, "push", "-q", "origin", "HEAD:refs/heads/main")
+    git(remote, "symbolic-ref", "HEAD", "refs/heads/main")
+    return remote
+
+
+@pytest.fixture
+def manager(tmp_path):
+    cache = RepoMirrorCache(cache_dir=str(tmp_path / "mirrors"), fetch_interval=0)
+    return WorkspaceManager(workspace_dir=str(tmp_path / "workspaces"), cache=cache)
+
+
+def test_workspace_is_a_work_tree(manager, remote):
+    workspace = manager.acquire(REPO, str(remote))
+    path = workspace.working_tree_dir
+
+    assert not workspace.bare
+    assert git(path, "rev-parse", "--is-inside-work-tree") == "true"
+    assert git(path, "status", "--porcelain") == ""
+
+    git(path, "checkout", "-q", "-b", "feature")
+    with open(os.path.join(path, "feature.txt"), "w") as f:
+        f.write("Feature\n")
+    git(path, "add", "-A")
+    git(path, *AUTHOR, "commit", "-q", "-m", "Add feature")
+
+    assert git(path, "log", "-1", "--format=%s") == "Add feature"
+    assert git(path, "status", "--porcelain") == ""
+
+
+def test_mirror_stays_bare(manager, remote):
+    manager.acquire(REPO, str(remote))
+
+    mirror_path = manager.cache.mirror_path(REPO)
+    assert git(mirror_path, "rev-parse", "--is-bare-repository") == "true"
+
+
+def test_each_workspace_is_a_work_tree(manager, remote):
+    first = manager.acquire(REPO, str(remote))
+    second = manager.acquire(REPO, str(remote))
+
+    assert first.working_tree_dir != second.working_tree_dir
+    for workspace in (first, second):
+        path = workspace.working_tree_dir
+        assert git(path, "rev-parse", "--is-inside-work-tree") == "true"
+
+
+def test_release_removes_the_workspace(manager, remote):
+    workspace = manager.acquire(REPO, str(remote))
+    path = workspace.working_tree_dir
+    git(path, "checkout", "-q", "-b", "feature")
+    workspace.close()
+
+    assert manager.release(path)
+
+    assert not os.path.exists(path)
+    mirror_path = manager.cache.mirror_path(REPO)
+    assert "feature" not in git(mirror_path, "branch", "--list")
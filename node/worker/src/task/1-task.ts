@@ -4,6 +4,9 @@ import { triggerAuditUpdate } from "../utils/auditUpdate";
 import { createAggregatorRepo } from "../utils/aggregatorRepo";
 import "dotenv/config";
 
+const TASK_JOB_POLL_INTERVAL_MS = 15 * 1000;
+const TASK_JOB_TIMEOUT_MS = 60 * 60 * 1000;
+
 interface PodCallBody {
   taskId: string;
   roundNumber: number;
@@ -126,10 +129,13 @@ async function runTask(
       body: JSON.stringify(podCallBody),
     });
 
-    if (response?.data?.success) {
-      return response.data.pr_url;
+    // The task runs in the background on the pod; wait for its job to finish
+    const job = response?.data?.job_id ? await waitForTaskJob(orcaClient, response.data.job_id) : response?.data;
+
+    if (job?.status === "completed") {
+      return job.pr_url;
     } else {
-      console.error(`${taskType} task failed:`, response?.data?.error || "Unknown error");
+      console.error(`${taskType} task failed:`, job?.error || job?.message || "Unknown error");
       return null;
     }
   } catch (error) {
@@ -137,3 +143,20 @@ async function runTask(
     return null;
   }
 }
+
+async function waitForTaskJob(orcaClient: any, jobId: string) {
+  const deadline = Date.now() + TASK_JOB_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    try {
+      const response = await orcaClient.podCall(`task-job/${jobId}`);
+      const job = response?.data;
+      if (job?.status === "completed" || job?.status === "failed") {
+        return job;
+      }
+    } catch (error) {
+      console.error(`Failed to poll task job ${jobId}:`, error);
+    }
+    await new Promise((resolve) => setTimeout(resolve, TASK_JOB_POLL_INTERVAL_MS));
+  }
+  return { status: "failed", error: `Timed out waiting for task job ${jobId}` };
+}